@@ -1,19 +1,34 @@
 from flask import Flask
 from flask_cors import CORS
 from config import Config
-from app.database import close_db
-from app.routes import transaction_routes, ocr_routes
+from app.database import close_db, get_client
+from app.indexes import ensure_indexes
+from app.commands import register_commands
+from app.routes.health_routes import bp as health_bp
+from app.routes.metrics_routes import bp as metrics_bp
+from app.routes.ocr_routes import bp as ocr_bp
+from app.routes.transaction_routes import bp as transactions_bp
+from app.utils.serialization import OrjsonProvider
 
-def create_app(config_class=Config):
+
+def create_app(config_class: type = Config) -> Flask:
     app = Flask(__name__)
     app.config.from_object(config_class)
+    app.json = OrjsonProvider(app)
     CORS(app)
 
     # Register blueprints
-    app.register_blueprint(transaction_routes.bp, url_prefix='/api/transactions')
-    app.register_blueprint(ocr_routes.bp, url_prefix='/api/ocr')
+    app.register_blueprint(transactions_bp, url_prefix='/api/transactions')
+    app.register_blueprint(ocr_bp, url_prefix='/api/ocr')
+    app.register_blueprint(health_bp, url_prefix='/api/health')
+    app.register_blueprint(metrics_bp)
 
-    # Register database connection close
+    # Release the request's database handle (the pooled client is shared)
     app.teardown_appcontext(close_db)
 
-    return app
\ No newline at end of file
+    register_commands(app)
+
+    if app.config.get('MONGO_CREATE_INDEXES'):
+        ensure_indexes(get_client(app.config)[app.config['DATABASE_NAME']])
+
+    return app
@@ -0,0 +1,15 @@
+from typing import Any
+from fastapi.responses import JSONResponse
+from app.utils.serialization import dumps
+
+
+class OrjsonResponse(JSONResponse):
+    """JSON response encoded with orjson (datetimes as ISO 8601, ObjectId as str)
+
+    Used as the app's default response class. Routes that return it
+    directly also skip FastAPI's `jsonable_encoder` pass, which dominates
+    the cost of large list responses.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,85 @@
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from app.models.user import AccessToken, UserCreate, UserDB, UserLogin, UserPublic
+from app.services.token_service import TokenService, get_token_service
+from app.services.user_service import (
+    EmailTakenError,
+    UserService,
+    get_password_executor,
+)
+from app.core.config import settings
+from app.core.database import get_database
+
+router = APIRouter()
+bearer = HTTPBearer(auto_error=False)
+
+
+def get_user_service(db: Any = Depends(get_database)) -> UserService:
+    return UserService(db, get_password_executor(settings.AUTH_HASH_WORKERS))
+
+
+def get_tokens() -> TokenService:
+    return get_token_service(
+        settings.SECRET_KEY,
+        settings.JWT_ALGORITHM,
+        settings.ACCESS_TOKEN_EXPIRE_MINUTES,
+        settings.AUTH_TOKEN_CACHE_SIZE,
+    )
+
+
+def unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=401, detail=detail, headers={"WWW-Authenticate": "Bearer"}
+    )
+
+
+def access_token(user: UserDB, tokens: TokenService) -> AccessToken:
+    return AccessToken(
+        access_token=tokens.issue(user),
+        expires_in=tokens.expire_seconds,
+        user=UserPublic(id=user.id, email=user.email, full_name=user.full_name),
+    )
+
+
+def get_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer),
+    tokens: TokenService = Depends(get_tokens),
+) -> UserPublic:
+    """The user a bearer token was issued to, from its (cached) claims alone"""
+    if credentials is None:
+        raise unauthorized("Not authenticated")
+    claims = tokens.verify(credentials.credentials)
+    if claims is None:
+        raise unauthorized("Invalid or expired token")
+    return UserPublic(id=claims["sub"], email=claims["email"], full_name=claims["name"])
+
+
+@router.post("/signup", response_model=AccessToken, status_code=201)
+async def signup(
+    user: UserCreate,
+    user_service: UserService = Depends(get_user_service),
+    tokens: TokenService = Depends(get_tokens),
+) -> AccessToken:
+    try:
+        created = await user_service.create_user(user)
+    except EmailTakenError:
+        raise HTTPException(status_code=409, detail="Email is already registered")
+    return access_token(created, tokens)
+
+
+@router.post("/login", response_model=AccessToken)
+async def login(
+    credentials: UserLogin,
+    user_service: UserService = Depends(get_user_service),
+    tokens: TokenService = Depends(get_tokens),
+) -> AccessToken:
+    user = await user_service.authenticate(credentials.email, credentials.password)
+    if user is None:
+        raise unauthorized("Incorrect email or password")
+    return access_token(user, tokens)
+
+
+@router.get("/me", response_model=UserPublic)
+async def me(user: UserPublic = Depends(get_current_user)) -> UserPublic:
+    return user
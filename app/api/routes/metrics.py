@@ -0,0 +1,55 @@
+import time
+from typing import Awaitable, Callable, Optional
+from fastapi import APIRouter, Request
+from fastapi.responses import Response
+from app import metrics
+from app.core.config import settings
+
+router = APIRouter()
+
+
+def _route_template(request: Request) -> str:
+    """Matched route template with its router prefix.
+
+    e.g. /api/transactions/{transaction_id}
+    """
+    route = request.scope.get('route')
+    template: Optional[str] = getattr(route, 'path', None)
+    if template is None:
+        return 'unmatched'
+    # Some FastAPI versions match included routes without their prefix;
+    # take it from the leading path segments the template does not cover
+    segments = request.url.path.split('/')
+    prefix = '/'.join(segments[: len(segments) - len(template.split('/')) + 1])
+    return prefix + template
+
+
+async def metrics_middleware(
+    request: Request, call_next: Callable[[Request], Awaitable[Response]]
+) -> Response:
+    """Record each request's latency by route template (and log slow ones)"""
+    started = time.perf_counter()
+    token = metrics.start_trace() if settings.SLOW_REQUEST_MS else None
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        path = request.url.path + (f'?{request.url.query}' if request.url.query else '')
+        metrics.record_request(
+            'fastapi',
+            request.method,
+            _route_template(request),
+            status,
+            started,
+            metrics.end_trace(token) if token else None,
+            settings.SLOW_REQUEST_MS,
+            path,
+        )
+
+
+@router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics() -> Response:
+    """Route, MongoDB command and OCR stage latencies for this worker"""
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
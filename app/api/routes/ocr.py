@@ -1,37 +1,242 @@
-from fastapi import APIRouter, HTTPException, Depends, File, UploadFile
-from app.services.ocr_service import OCRService
+import asyncio
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
+from app.services.image_store import InvalidImageError, decode_data_url
+from app.services.ocr_service import OCRService, ocr_settings_fingerprint
+from app.services.ocr_engine import (
+    OCREngine,
+    OCRSaturatedError,
+    get_ocr_engine,
+    job_status,
+)
+from app.services.ocr_cache import OCRResultCache, cache_key, get_ocr_cache
+from app.services.ocr_batch import (
+    ZIP_TYPES,
+    ImageSource,
+    batch_sources,
+    run_batch_async,
+    zip_images,
+)
+from app.services.ocr_settings import pipeline_settings
+from app.services.category_classifier import (
+    CategoryClassifier,
+    get_classifier_registry,
+)
+from app.utils.uploads import (
+    MULTIPART_OVERHEAD,
+    UploadTooLargeError,
+    is_raw_image,
+    read_upload,
+    spool_chunks_async,
+)
+from app.core.config import settings
 from app.core.database import get_database
-from typing import Dict
-import base64
+from typing import Any, Dict, List, Union
 
 router = APIRouter()
 
+
+def get_engine() -> OCREngine:
+    return get_ocr_engine(
+        settings.OCR_MAX_WORKERS,
+        settings.OCR_MAX_QUEUE,
+        settings.OCR_JOB_TTL,
+        pipeline_settings(
+            max_side=settings.OCR_MAX_SIDE,
+            threshold=settings.OCR_THRESHOLD,
+            deskew=settings.OCR_DESKEW,
+            crop=settings.OCR_CROP,
+        ),
+    )
+
+
+def get_cache() -> OCRResultCache:
+    return get_ocr_cache(
+        settings.OCR_CACHE_MAX_BYTES, settings.OCR_CACHE_TTL, settings.OCR_CACHE_PERSIST
+    )
+
+
+async def get_classifier(db: Any = Depends(get_database)) -> CategoryClassifier:
+    registry = get_classifier_registry(
+        settings.CATEGORY_RELOAD_INTERVAL,
+        settings.CATEGORY_LEARNED,
+        settings.CATEGORY_MODEL_TTL,
+        settings.CATEGORY_MODEL_SAMPLE,
+    )
+    return await registry.refresh_async(db)
+
+
+def saturated(e: OCRSaturatedError) -> HTTPException:
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+
+def too_large(request: Request, limit: int) -> bool:
+    length = request.headers.get("content-length")
+    return bool(length and length.isdigit() and int(length) > limit)
+
+
+async def uploaded_image(request: Request) -> Union[bytes, str]:
+    """Image bytes from a multipart `image` file, a raw body or a JSON base64 string"""
+    max_bytes = settings.UPLOAD_MAX_BYTES
+    content_type = (
+        request.headers.get("content-type", "").split(";", 1)[0].strip().lower()
+    )
+    image = None
+    try:
+        if content_type == "multipart/form-data":
+            if too_large(request, max_bytes + MULTIPART_OVERHEAD):
+                raise UploadTooLargeError(f"Upload exceeds {max_bytes} bytes")
+            upload = (await request.form()).get("image")
+            if upload is not None and not isinstance(upload, str):
+                if upload.size is not None and upload.size > max_bytes:
+                    raise UploadTooLargeError(f"Upload exceeds {max_bytes} bytes")
+                image = await upload.read()
+        elif is_raw_image(content_type):
+            if too_large(request, max_bytes):
+                raise UploadTooLargeError(f"Upload exceeds {max_bytes} bytes")
+            with await spool_chunks_async(request.stream(), max_bytes) as spool:
+                image = read_upload(spool)
+        else:
+            try:
+                payload = await request.json()
+            except ValueError:
+                payload = None
+            if isinstance(payload, dict):
+                image = payload.get("image")
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    if not image:
+        raise HTTPException(status_code=400, detail="No image data provided")
+    return image
+
+
 @router.post("/analyze-bill")
 async def analyze_bill(
-    image_data: Dict[str, str],
-    db = Depends(get_database)
+    image: Union[bytes, str] = Depends(uploaded_image),
+    db=Depends(get_database),
+    classifier=Depends(get_classifier),
 ):
     """Analyze bill image and suggest category and amount"""
-    ocr_service = OCRService(db)
-    
+    ocr_service = OCRService(db, classifier)
+
     try:
-        # Extract text from image
-        text = ocr_service.extract_text(image_data["image"])
-        
-        if not text:
-            raise HTTPException(status_code=400, detail="Could not extract text from image")
-        
-        # Get suggested category and confidence
-        category, confidence = await ocr_service.suggest_category(text)
-        
-        # Extract amount
-        amount = ocr_service.extract_amount(text)
-        
-        return {
-            "extracted_text": text,
-            "suggested_category": category,
-            "confidence": confidence,
-            "suggested_amount": amount
-        }
+        image_bytes = image if isinstance(image, bytes) else decode_data_url(image)[0]
+        key = cache_key(image_bytes, ocr_settings_fingerprint(get_engine().pipeline))
+        cached = await get_cache().get_async(key, db)
+        if cached is not None:
+            # Re-classify so taxonomy edits apply to previously seen images
+            return ocr_service.analyze_text(cached["extracted_text"])
+
+        # Extract text in the OCR process pool without blocking the event loop
+        text = await get_engine().extract_text_async(image_bytes, settings.OCR_TIMEOUT)
+    except InvalidImageError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except OCRSaturatedError as e:
+        raise saturated(e)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="OCR timed out")
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if not text:
+        raise HTTPException(status_code=400, detail="Could not extract text from image")
+
+    result = ocr_service.analyze_text(text)
+    await get_cache().put_async(key, result, db)
+    return result
+
+
+async def batch_images(request: Request) -> List[ImageSource]:
+    """Images of a batch upload: multipart `images` files (zips expanded) or zip body"""
+    max_bytes = settings.UPLOAD_MAX_BYTES
+    batch_max_bytes = settings.OCR_BATCH_MAX_BYTES
+    content_type = (
+        request.headers.get("content-type", "").split(";", 1)[0].strip().lower()
+    )
+    try:
+        if too_large(request, batch_max_bytes):
+            raise UploadTooLargeError(f"Upload exceeds {batch_max_bytes} bytes")
+        if content_type == "multipart/form-data":
+            form = await request.form(max_files=settings.OCR_BATCH_MAX_IMAGES)
+            files = [f for f in form.getlist("images") if not isinstance(f, str)]
+            sources = batch_sources(
+                ((f.filename, f.content_type, f.file) for f in files), max_bytes
+            )
+        elif content_type in ZIP_TYPES:
+            sources = zip_images(
+                await spool_chunks_async(request.stream(), batch_max_bytes), max_bytes
+            )
+        else:
+            sources = []
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not sources:
+        raise HTTPException(
+            status_code=400,
+            detail="Upload images as multipart `images` files or a zip archive",
+        )
+    if len(sources) > settings.OCR_BATCH_MAX_IMAGES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.OCR_BATCH_MAX_IMAGES} images per batch",
+        )
+    return sources
+
+
+@router.post("/batch")
+async def analyze_batch(
+    sources: List[ImageSource] = Depends(batch_images),
+    db: Any = Depends(get_database),
+    classifier: CategoryClassifier = Depends(get_classifier),
+) -> StreamingResponse:
+    """OCR many bill images; streams one NDJSON line per image, then a summary"""
+    engine = get_engine()
+    body = run_batch_async(
+        sources,
+        engine,
+        OCRService(db, classifier).analyze_text,
+        get_cache(),
+        db,
+        min(settings.OCR_BATCH_CONCURRENCY or engine.max_workers, engine.capacity),
+        settings.OCR_TIMEOUT,
+    )
+    return StreamingResponse(body, media_type="application/x-ndjson")
+
+
+@router.post("/jobs", status_code=202)
+async def submit_job(
+    image: Union[bytes, str] = Depends(uploaded_image),
+) -> Dict[str, str]:
+    """Queue a bill image for OCR and return a job id to poll"""
+    try:
+        job_id = get_engine().submit_job(image)
+    except OCRSaturatedError as e:
+        raise saturated(e)
+    return {"job_id": job_id, "status": "queued"}
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(
+    job_id: str,
+    wait: float = 0,
+    db: Any = Depends(get_database),
+    classifier: CategoryClassifier = Depends(get_classifier),
+) -> Dict[str, Any]:
+    """Poll an OCR job; `wait` seconds blocks until it finishes or times out"""
+    future = get_engine().get_job(job_id)
+    if future is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    wait = min(wait, settings.OCR_TIMEOUT)
+    if wait > 0:
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), wait)
+        except Exception:
+            pass
+
+    status = job_status(future)
+    if "text" in status:
+        status.update(OCRService(db, classifier).analyze_text(status.pop("text")))
+    return {"job_id": job_id, **status}
@@ -1,27 +1,40 @@
-from fastapi import APIRouter, HTTPException, Depends
-from app.models.thresholds import BalanceThreshold, ThresholdUpdate
-from app.services.threshold_service import ThresholdService
+from typing import Any, List
+from fastapi import APIRouter, Depends
+from app.models.thresholds import BalanceThreshold, PersonBalanceStatus, ThresholdUpdate
+from app.services.threshold_service import ThresholdService, get_threshold_cache
+from app.core.config import settings
 from app.core.database import get_database
 
 router = APIRouter()
 
+
+def get_threshold_service(db: Any = Depends(get_database)) -> ThresholdService:
+    return ThresholdService(db, get_threshold_cache(settings.THRESHOLD_CACHE_TTL))
+
+
+@router.get("/", response_model=List[PersonBalanceStatus])
+async def get_balance_statuses(
+    threshold_service: ThresholdService = Depends(get_threshold_service),
+) -> List[dict]:
+    """Every person's balance, thresholds and low/medium/good status"""
+    return await threshold_service.get_statuses()
+
+
 @router.get("/{person}", response_model=BalanceThreshold)
 async def get_person_threshold(
-    person: str,
-    db = Depends(get_database)
+    person: str, threshold_service: ThresholdService = Depends(get_threshold_service)
 ):
-    threshold_service = ThresholdService(db)
     threshold = await threshold_service.get_threshold(person)
     if not threshold:
         # Return default thresholds if not set
         return BalanceThreshold(person=person)
     return threshold
 
+
 @router.put("/{person}", response_model=BalanceThreshold)
 async def update_person_threshold(
     person: str,
     threshold: ThresholdUpdate,
-    db = Depends(get_database)
+    threshold_service: ThresholdService = Depends(get_threshold_service),
 ):
-    threshold_service = ThresholdService(db)
-    return await threshold_service.update_threshold(person, threshold)
\ No newline at end of file
+    return await threshold_service.update_threshold(person, threshold)
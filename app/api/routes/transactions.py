@@ -1,17 +1,48 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Union
 from datetime import datetime
-from app.models.transaction import TransactionCreate, TransactionDB, TransactionUpdate
+from app.models.transaction import (
+    BulkRecategorize,
+    BulkSelection,
+    TransactionCreate,
+    TransactionDB,
+    TransactionUpdate,
+)
 from app.models.filters import TransactionFilter
-from app.services.transaction_service import TransactionService
+from app.models.pagination import CursorPage, TransactionEnvelope
+from app.api.responses import OrjsonResponse
+from app.services.image_store import InvalidImageError
+from app.services.transaction_filters import TransactionFilterBuilder
+from app.services.transaction_repository import TransactionRepository
+from app.services.transaction_service import bulk_selector
+from app.services.query_cache import get_query_cache
+from app.core.config import settings
 from app.core.database import get_database
+from app.utils.cursor import SORTABLE_FIELDS, InvalidCursorError
 
 router = APIRouter()
 
-@router.get("/", response_model=List[TransactionDB])
+
+def get_repository(db: Any = Depends(get_database)) -> TransactionRepository:
+    cache = None
+    if settings.QUERY_CACHE:
+        cache = get_query_cache(
+            settings.QUERY_CACHE_MAX_BYTES,
+            settings.QUERY_CACHE_TTL,
+            settings.QUERY_CACHE_PERSIST,
+        )
+    return TransactionRepository(db, cache)
+
+
+@router.get(
+    "/", response_model=Union[List[TransactionDB], CursorPage, TransactionEnvelope]
+)
 async def get_transactions(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(
+        None, description="Keyset cursor; empty for the first page"
+    ),
     search: Optional[str] = None,
     type: Optional[str] = None,
     person: Optional[str] = None,
@@ -21,7 +52,11 @@ async def get_transactions(
     end_date: Optional[datetime] = None,
     sort_field: Optional[str] = None,
     sort_direction: Optional[str] = "desc",
-    db = Depends(get_database)
+    include_image: bool = False,
+    envelope: bool = Query(
+        False, description="Wrap the page with total count and sums"
+    ),
+    repository: TransactionRepository = Depends(get_repository),
 ):
     filters = TransactionFilter(
         search=search,
@@ -32,53 +67,149 @@ async def get_transactions(
         start_date=start_date,
         end_date=end_date,
         sort_field=sort_field,
-        sort_direction=sort_direction
+        sort_direction=sort_direction,
     )
-    
-    transaction_service = TransactionService(db)
-    return await transaction_service.get_transactions(skip, limit, filters)
+
+    if cursor is not None:
+        sort_field = filters.sort_field or "date"
+        if sort_field not in SORTABLE_FIELDS:
+            raise HTTPException(
+                status_code=400, detail=f"Cannot paginate by {sort_field}"
+            )
+        try:
+            items, next_cursor = await repository.get_transactions_page(
+                limit, filters, cursor, include_image
+            )
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return OrjsonResponse({"items": items, "next_cursor": next_cursor})
+
+    if envelope:
+        return OrjsonResponse(
+            await repository.get_transactions_envelope(
+                skip, limit, filters, include_image
+            )
+        )
+
+    return OrjsonResponse(
+        await repository.get_transactions(skip, limit, filters, include_image)
+    )
+
+
+@router.get("/balances")
+async def get_person_balances(
+    repository: TransactionRepository = Depends(get_repository),
+) -> OrjsonResponse:
+    return OrjsonResponse(await repository.get_person_balances())
+
+
+@router.get("/report")
+async def get_report(
+    group_by: str = Query(
+        "", description="Comma-separated: category, project, person, type"
+    ),
+    granularity: str = Query("month", pattern="^(day|week|month)$"),
+    type: Optional[str] = None,
+    person: Optional[str] = None,
+    project: Optional[str] = None,
+    category: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    repository: TransactionRepository = Depends(get_repository),
+) -> OrjsonResponse:
+    dimensions = {
+        "type": type,
+        "person": person,
+        "project": project,
+        "category": category,
+    }
+    filters = {name: value for name, value in dimensions.items() if value}
+    try:
+        rows = await repository.get_report(
+            [d for d in group_by.split(",") if d],
+            granularity,
+            start_date,
+            end_date,
+            filters,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return OrjsonResponse(rows)
+
+
+def _bulk_selector(selection: BulkSelection) -> dict:
+    filters = (
+        TransactionFilterBuilder.build_query(selection.filter)
+        if selection.filter
+        else None
+    )
+    try:
+        return bulk_selector(selection.ids, filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/bulk/recategorize")
+async def recategorize_transactions(
+    body: BulkRecategorize, repository: TransactionRepository = Depends(get_repository)
+) -> Dict[str, int]:
+    return await repository.recategorize_transactions(
+        _bulk_selector(body), body.category, settings.BULK_BATCH_SIZE
+    )
+
+
+@router.post("/bulk/delete")
+async def delete_transactions(
+    body: BulkSelection, repository: TransactionRepository = Depends(get_repository)
+) -> Dict[str, int]:
+    return await repository.delete_transactions(
+        _bulk_selector(body), settings.BULK_BATCH_SIZE
+    )
+
 
 @router.post("/", response_model=TransactionDB)
 async def create_transaction(
     transaction: TransactionCreate,
-    db = Depends(get_database)
+    repository: TransactionRepository = Depends(get_repository),
 ):
-    transaction_service = TransactionService(db)
-    return await transaction_service.create_transaction(transaction)
+    try:
+        return await repository.create_transaction(transaction)
+    except InvalidImageError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 
 @router.get("/{transaction_id}", response_model=TransactionDB)
 async def get_transaction(
-    transaction_id: str,
-    db = Depends(get_database)
+    transaction_id: str, repository: TransactionRepository = Depends(get_repository)
 ):
-    transaction_service = TransactionService(db)
-    transaction = await transaction_service.get_transaction(transaction_id)
+    transaction = await repository.get_transaction(transaction_id)
     if not transaction:
         raise HTTPException(status_code=404, detail="Transaction not found")
     return transaction
 
+
 @router.put("/{transaction_id}", response_model=TransactionDB)
 async def update_transaction(
     transaction_id: str,
     transaction: TransactionUpdate,
-    db = Depends(get_database)
+    repository: TransactionRepository = Depends(get_repository),
 ):
-    transaction_service = TransactionService(db)
-    updated_transaction = await transaction_service.update_transaction(
-        transaction_id,
-        transaction
-    )
+    try:
+        updated_transaction = await repository.update_transaction(
+            transaction_id, transaction
+        )
+    except InvalidImageError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not updated_transaction:
         raise HTTPException(status_code=404, detail="Transaction not found")
     return updated_transaction
 
+
 @router.delete("/{transaction_id}")
 async def delete_transaction(
-    transaction_id: str,
-    db = Depends(get_database)
+    transaction_id: str, repository: TransactionRepository = Depends(get_repository)
 ):
-    transaction_service = TransactionService(db)
-    success = await transaction_service.delete_transaction(transaction_id)
+    success = await repository.delete_transaction(transaction_id)
     if not success:
         raise HTTPException(status_code=404, detail="Transaction not found")
-    return {"message": "Transaction deleted successfully"}
\ No newline at end of file
+    return {"message": "Transaction deleted successfully"}
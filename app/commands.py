@@ -0,0 +1,127 @@
+from datetime import datetime, timedelta, timezone
+import click
+from flask import Flask
+from flask.cli import with_appcontext
+from pymongo import UpdateOne
+from app.database import get_db
+from app.indexes import INDEXES, ensure_indexes, load_index_modules
+from app.services.balance_service import BalanceLedger
+from app.services.image_store import ImageStore
+from app.services.query_cache import bump_version
+from app.services.rollup_service import REBUILD_BATCH_SIZE, PeriodRollups
+
+
+@click.command('rebuild-balances')
+@click.option('--verify-only', is_flag=True, help='Report drift without rebuilding.')
+@with_appcontext
+def rebuild_balances(verify_only: bool) -> None:
+    """Recompute the balances ledger from all transactions"""
+    ledger = BalanceLedger(get_db())
+    drift = ledger.verify()
+    for row in drift:
+        click.echo(
+            f"{row['person']}: {row['field']} expected {row['expected']:.2f}, "
+            f"ledger has {row['actual']:.2f}"
+        )
+    click.echo(f'{len(drift)} drifted value(s)')
+
+    if not verify_only:
+        count = ledger.rebuild()
+        bump_version(get_db(), 'transactions')
+        click.echo(f'Rebuilt balances for {count} people')
+
+
+@click.command('rebuild-rollups')
+@click.option(
+    '--start', type=click.DateTime(['%Y-%m-%d']), help='First day to rebuild.'
+)
+@click.option('--end', type=click.DateTime(['%Y-%m-%d']), help='Last day to rebuild.')
+@click.option(
+    '--batch-size',
+    default=REBUILD_BATCH_SIZE,
+    show_default=True,
+    help='Rollup upserts per batch.',
+)
+@with_appcontext
+def rebuild_rollups(start: datetime, end: datetime, batch_size: int) -> None:
+    """Recompute the period rollups for a date range (default: all)"""
+    count = PeriodRollups(get_db()).rebuild(start, end, batch_size)
+    click.echo(f'Rebuilt rollups from {count} transaction(s)')
+
+
+@click.command('migrate-bill-images')
+@click.option(
+    '--batch-size', default=100, show_default=True, help='Documents per batch.'
+)
+@with_appcontext
+def migrate_bill_images(batch_size: int) -> None:
+    """Move inline base64 bill images into the GridFS image store"""
+    db = get_db()
+    store = ImageStore(db)
+    migrated = failed = 0
+    while True:
+        batch = list(
+            db.transactions.find(
+                {'bill_image': {'$type': 'string'}}, {'bill_image': 1}
+            ).limit(batch_size)
+        )
+        if not batch:
+            break
+
+        operations = []
+        for doc in batch:
+            try:
+                image_id = store.put_base64(doc['bill_image'])
+            except ValueError as e:
+                # Undecodable data: keep the text under another key, stop retrying
+                click.echo(f"{doc['_id']}: {e}", err=True)
+                operations.append(
+                    UpdateOne(
+                        {'_id': doc['_id']},
+                        {'$rename': {'bill_image': 'bill_image_invalid'}},
+                    )
+                )
+                failed += 1
+                continue
+            operations.append(
+                UpdateOne(
+                    {'_id': doc['_id']},
+                    {'$set': {'bill_image_id': image_id}, '$unset': {'bill_image': ''}},
+                )
+            )
+            migrated += 1
+        db.transactions.bulk_write(operations, ordered=False)
+        bump_version(db, 'transactions')
+        click.echo(f'Migrated {migrated} image(s), {failed} failed')
+
+
+@click.command('sweep-bill-images')
+@click.option(
+    '--min-age',
+    default=24,
+    show_default=True,
+    help='Only delete images uploaded at least this many hours ago.',
+)
+@with_appcontext
+def sweep_bill_images(min_age: int) -> None:
+    """Delete stored bill images that no transaction references"""
+    uploaded_before = datetime.now(timezone.utc) - timedelta(hours=min_age)
+    count = ImageStore(get_db()).sweep(uploaded_before)
+    click.echo(f'Deleted {count} unreferenced image(s)')
+
+
+@click.command('ensure-indexes')
+@with_appcontext
+def ensure_indexes_command() -> None:
+    """Create every registered index (run on deploy, not in each worker)"""
+    load_index_modules()
+    ensure_indexes(get_db())
+    click.echo(f'Ensured indexes on {len(INDEXES)} collection(s)')
+
+
+def register_commands(app: Flask) -> None:
+    app.cli.add_command(rebuild_balances)
+    app.cli.add_command(rebuild_rollups)
+    app.cli.add_command(migrate_bill_images)
+    app.cli.add_command(sweep_bill_images)
+    app.cli.add_command(ensure_indexes_command)
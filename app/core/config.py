@@ -1,16 +1,55 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
+
 
 class Settings(BaseSettings):
     MONGODB_URL: str
     DATABASE_NAME: str
     SECRET_KEY: str
+    JWT_ALGORITHM: str = "HS256"
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    AUTH_HASH_WORKERS: int = 4
+    AUTH_TOKEN_CACHE_SIZE: int = 1024
+    MONGO_MAX_POOL_SIZE: int = 50
+    MONGO_MIN_POOL_SIZE: int = 0
+    MONGO_MAX_IDLE_TIME_MS: int = 300000
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = 5000
+    MONGO_CREATE_INDEXES: bool = False
+    SLOW_REQUEST_MS: float = 0.0
+    BULK_BATCH_SIZE: int = 500
+    UPLOAD_MAX_BYTES: int = 10 * 1024 * 1024
+    QUERY_CACHE: bool = True
+    QUERY_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    QUERY_CACHE_PERSIST: bool = False
+    QUERY_CACHE_TTL: int = 600
+    OCR_MAX_WORKERS: Optional[int] = None
+    OCR_MAX_QUEUE: int = 16
+    OCR_TIMEOUT: float = 60.0
+    OCR_JOB_TTL: float = 600.0
+    OCR_BATCH_CONCURRENCY: Optional[int] = None
+    OCR_BATCH_MAX_IMAGES: int = 200
+    OCR_BATCH_MAX_BYTES: int = 256 * 1024 * 1024
+    OCR_MAX_SIDE: int = 2000
+    OCR_THRESHOLD: str = "adaptive"
+    OCR_DESKEW: bool = True
+    OCR_CROP: bool = True
+    OCR_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    OCR_CACHE_PERSIST: bool = False
+    OCR_CACHE_TTL: int = 30 * 24 * 3600
+    THRESHOLD_CACHE_TTL: float = 60.0
+    CATEGORY_RELOAD_INTERVAL: float = 30.0
+    CATEGORY_LEARNED: bool = False
+    CATEGORY_MODEL_TTL: float = 3600.0
+    CATEGORY_MODEL_SAMPLE: int = 50000
 
     class Config:
         env_file = ".env"
 
+
 @lru_cache()
 def get_settings():
     return Settings()
 
-settings = get_settings()
\ No newline at end of file
+
+settings = get_settings()
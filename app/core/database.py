@@ -1,16 +1,29 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from app.core.config import settings
+from app.metrics import command_metrics
+
 
 class Database:
     client: AsyncIOMotorClient = None
 
+
 db = Database()
 
+
 async def get_database() -> AsyncIOMotorClient:
     return db.client[settings.DATABASE_NAME]
 
+
 async def connect_to_mongodb():
-    db.client = AsyncIOMotorClient(settings.MONGODB_URL)
+    db.client = AsyncIOMotorClient(
+        settings.MONGODB_URL,
+        maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+        minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+        maxIdleTimeMS=settings.MONGO_MAX_IDLE_TIME_MS,
+        waitQueueTimeoutMS=settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        event_listeners=[command_metrics],
+    )
+
 
 async def close_mongodb_connection():
-    db.client.close()
\ No newline at end of file
+    db.client.close()
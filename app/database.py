@@ -1,17 +1,202 @@
-from pymongo import MongoClient
+import os
+import threading
+import time
+from typing import Any, Dict, Mapping, Optional, Tuple
+from pymongo import MongoClient, monitoring
+from pymongo.database import Database
 from flask import current_app, g
-from typing import Optional
+from app.metrics import command_metrics
 
-def get_db() -> MongoClient:
+# Pooled clients of this process, one per (URI, pool options); see get_client
+_clients: Dict[Tuple[Any, ...], MongoClient] = {}
+_client_pid: Optional[int] = None
+# A client installed with set_client, used for every config
+_installed: Optional[MongoClient] = None
+_client_lock = threading.Lock()
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Collect connection checkout wait times for pool sizing"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pending = threading.local()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.failures = 0
+            self.total_wait_ms = 0.0
+            self.max_wait_ms = 0.0
+            self.connections_created = 0
+            self.connections_closed = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            avg = self.total_wait_ms / self.checkouts if self.checkouts else 0.0
+            return {
+                'checkouts': self.checkouts,
+                'checkout_failures': self.failures,
+                'avg_wait_ms': round(avg, 3),
+                'max_wait_ms': round(self.max_wait_ms, 3),
+                'total_wait_ms': round(self.total_wait_ms, 3),
+                'connections_created': self.connections_created,
+                'connections_closed': self.connections_closed,
+            }
+
+    def _wait_ms(self) -> float:
+        started: Optional[float] = getattr(self._pending, 'started', None)
+        self._pending.started = None
+        if started is None:
+            return 0.0
+        return (time.perf_counter() - started) * 1000
+
+    # Checkout started/finished events fire on the requesting thread
+    def connection_check_out_started(
+        self, event: monitoring.ConnectionCheckOutStartedEvent
+    ) -> None:
+        self._pending.started = time.perf_counter()
+
+    def connection_checked_out(
+        self, event: monitoring.ConnectionCheckedOutEvent
+    ) -> None:
+        wait = self._wait_ms()
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_ms += wait
+            self.max_wait_ms = max(self.max_wait_ms, wait)
+
+    def connection_check_out_failed(
+        self, event: monitoring.ConnectionCheckOutFailedEvent
+    ) -> None:
+        self._wait_ms()
+        with self._lock:
+            self.failures += 1
+
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent) -> None:
+        with self._lock:
+            self.connections_created += 1
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:
+        with self._lock:
+            self.connections_closed += 1
+
+    def pool_created(self, event: monitoring.PoolCreatedEvent) -> None:
+        pass
+
+    def pool_ready(self, event: monitoring.PoolReadyEvent) -> None:
+        pass
+
+    def pool_cleared(self, event: monitoring.PoolClearedEvent) -> None:
+        pass
+
+    def pool_closed(self, event: monitoring.PoolClosedEvent) -> None:
+        pass
+
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent) -> None:
+        pass
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:
+        pass
+
+
+pool_stats = PoolStats()
+
+
+def _reset_after_fork() -> None:
+    """Drop the parent's clients in a forked worker; they must not be reused"""
+    global _client_pid, _installed
+    _clients.clear()
+    _client_pid = None
+    _installed = None
+    pool_stats.reset()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _client_key(config: Mapping[str, Any]) -> Tuple[Any, ...]:
+    return (
+        config['MONGODB_URL'],
+        config.get('MONGO_MAX_POOL_SIZE', 100),
+        config.get('MONGO_MIN_POOL_SIZE', 0),
+        config.get('MONGO_MAX_IDLE_TIME_MS'),
+        config.get('MONGO_WAIT_QUEUE_TIMEOUT_MS'),
+    )
+
+
+def get_client(config: Optional[Mapping[str, Any]] = None) -> MongoClient:
+    """Get the process-wide pooled MongoClient for `config`, creating it on first use
+
+    Apps whose configs share the URI and pool options share one client;
+    any other config gets a client (and pool) of its own.
+    """
+    global _client_pid
+    config = config if config is not None else current_app.config
+    key = _client_key(config)
+    pid = os.getpid()
+    if _client_pid == pid:
+        client = _installed or _clients.get(key)
+        if client is not None:
+            return client
+
+    with _client_lock:
+        if _client_pid != pid:
+            _clients.clear()
+            _client_pid = pid
+        if _installed is not None:
+            return _installed
+        if key not in _clients:
+            url, max_pool, min_pool, max_idle, wait_queue = key
+            _clients[key] = MongoClient(
+                url,
+                maxPoolSize=max_pool,
+                minPoolSize=min_pool,
+                maxIdleTimeMS=max_idle,
+                waitQueueTimeoutMS=wait_queue,
+                event_listeners=[pool_stats, command_metrics],
+                connect=False,
+            )
+        return _clients[key]
+
+
+def set_client(client: MongoClient) -> None:
+    """Install a pre-built client as this process's client (benchmarks, tools)"""
+    global _client_pid, _installed
+    with _client_lock:
+        _installed = client
+        _client_pid = os.getpid()
+
+
+def close_client() -> None:
+    """Close the process-wide clients (shutdown and tests)"""
+    global _client_pid, _installed
+    with _client_lock:
+        if _client_pid == os.getpid():
+            for client in [*_clients.values(), *filter(None, [_installed])]:
+                client.close()
+        _clients.clear()
+        _client_pid = None
+        _installed = None
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Get connection pool checkout statistics for this worker"""
+    stats = pool_stats.snapshot()
+    stats['pid'] = os.getpid()
+    return stats
+
+
+def get_db() -> Database:
     """Get database connection"""
     if 'db' not in g:
-        g.db = MongoClient(current_app.config['MONGODB_URL'])[
-            current_app.config['DATABASE_NAME']
-        ]
-    return g.db
+        g.db = get_client()[current_app.config['DATABASE_NAME']]
+    db: Database = g.db
+    return db
+
 
 def close_db(e: Optional[BaseException] = None) -> None:
-    """Close database connection"""
-    db = g.pop('db', None)
-    if db is not None:
-        db.client.close()
\ No newline at end of file
+    """Release the request's database handle; the pooled client stays open"""
+    g.pop('db', None)
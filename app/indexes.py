@@ -0,0 +1,171 @@
+import logging
+from importlib import import_module
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.collection import Collection
+from pymongo.database import Database
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# collection name -> indexes that must exist on it
+INDEXES: Dict[str, List[IndexModel]] = {}
+
+
+def register_index(
+    collection: str, keys: Sequence[Tuple[str, int]], **options: Any
+) -> None:
+    """Declare an index to be created by ensure_indexes"""
+    INDEXES.setdefault(collection, []).append(IndexModel(list(keys), **options))
+
+
+# Transaction listings: equality filters first, then the sort/range field,
+# then _id as the keyset tiebreaker (see app.utils.cursor)
+register_index(
+    'transactions', [('date', DESCENDING), ('_id', DESCENDING)], name='date_id'
+)
+register_index(
+    'transactions', [('amount', DESCENDING), ('_id', DESCENDING)], name='amount_id'
+)
+register_index(
+    'transactions',
+    [('description', ASCENDING), ('_id', ASCENDING)],
+    name='description_id',
+)
+for _field in ('person', 'project', 'category', 'type'):
+    register_index(
+        'transactions',
+        [(_field, ASCENDING), ('date', DESCENDING), ('_id', DESCENDING)],
+        name=f'{_field}_date_id',
+    )
+# Bill image garbage collection looks up references by image id
+register_index(
+    'transactions', [('bill_image_id', ASCENDING)], name='bill_image_id', sparse=True
+)
+
+# Period rollups: one row per day and dimension values (upsert key, day ranges)
+register_index(
+    'rollups',
+    [
+        ('day', ASCENDING),
+        ('category', ASCENDING),
+        ('project', ASCENDING),
+        ('person', ASCENDING),
+        ('type', ASCENDING),
+    ],
+    name='rollup_key',
+    unique=True,
+)
+
+
+# Modules that register indexes when imported; some are only imported by the
+# FastAPI app, so the ensure-indexes command loads them all first
+INDEX_MODULES = (
+    'app.services.ocr_cache',
+    'app.services.query_cache',
+    'app.services.threshold_service',
+    'app.services.user_service',
+)
+
+
+def load_index_modules() -> None:
+    for module in INDEX_MODULES:
+        try:
+            import_module(module)
+        except ImportError as e:
+            # FastAPI-only modules need its extra dependencies
+            logger.warning('Skipping indexes of %s: %s', module, e)
+
+
+def ensure_indexes(db: Database) -> None:
+    """Create every registered index (pymongo database)"""
+    for name, indexes in INDEXES.items():
+        try:
+            db[name].create_indexes(indexes)
+        except PyMongoError as e:
+            logger.warning('Could not create indexes on %s: %s', name, e)
+
+
+async def ensure_indexes_async(db: Any) -> None:
+    """Create every registered index (Motor database)"""
+    for name, indexes in INDEXES.items():
+        try:
+            await db[name].create_indexes(indexes)
+        except PyMongoError as e:
+            logger.warning('Could not create indexes on %s: %s', name, e)
+
+
+class SlowQueryError(RuntimeError):
+    """Raised by the query guard in strict mode"""
+
+
+def _plan_stages(plan: Any) -> Iterator[str]:
+    if isinstance(plan, dict):
+        if 'stage' in plan:
+            yield plan['stage']
+        for value in plan.values():
+            yield from _plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _plan_stages(item)
+
+
+def explain_query(
+    collection: Collection,
+    query: Dict[str, Any],
+    sort: Optional[List[Tuple[str, int]]] = None,
+) -> Dict[str, Any]:
+    """Summarize the winning plan of a find: stages and documents examined"""
+    cursor = collection.find(query)
+    if sort:
+        cursor = cursor.sort(sort)
+    explain = cursor.explain()
+    stages = set(_plan_stages(explain.get('queryPlanner', {}).get('winningPlan', {})))
+    stats = explain.get('executionStats', {})
+    return {
+        'stages': stages,
+        'collscan': 'COLLSCAN' in stages,
+        'in_memory_sort': 'SORT' in stages,
+        'docs_examined': stats.get('totalDocsExamined', 0),
+    }
+
+
+def guard_query(
+    collection: Collection,
+    query: Dict[str, Any],
+    sort: Optional[List[Tuple[str, int]]] = None,
+    min_docs: int = 1000,
+    strict: bool = False,
+) -> Optional[Dict[str, Any]]:
+    """Flag a query that scans the collection or sorts in memory
+
+    Only plans that examine at least `min_docs` documents are reported so
+    small dev/test collections don't trip the guard.
+    """
+    try:
+        summary = explain_query(collection, query, sort)
+    except (PyMongoError, NotImplementedError) as e:
+        logger.debug('explain failed for %s: %s', collection.name, e)
+        return None
+
+    if not (summary['collscan'] or summary['in_memory_sort']):
+        return None
+    if summary['docs_examined'] < min_docs:
+        return None
+
+    problems = [
+        p
+        for p, hit in (
+            ('COLLSCAN', summary['collscan']),
+            ('in-memory SORT', summary['in_memory_sort']),
+        )
+        if hit
+    ]
+    message = (
+        f"{' and '.join(problems)} on {collection.name} examined "
+        f"{summary['docs_examined']} documents: query={query!r} sort={sort!r}"
+    )
+    if strict:
+        raise SlowQueryError(message)
+    logger.warning(message)
+    return summary
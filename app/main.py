@@ -1,10 +1,14 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.core.database import connect_to_mongodb, close_mongodb_connection
-from app.api.routes import transactions, thresholds, ocr
+from app.core.database import connect_to_mongodb, close_mongodb_connection, get_database
+from app.indexes import ensure_indexes_async
+from app.services.ocr_engine import get_ocr_engine
+from app.services.user_service import get_password_executor
+from app.api.responses import OrjsonResponse
+from app.api.routes import transactions, thresholds, ocr, metrics, auth
 
-app = FastAPI(title="Petty Cash Tracker")
+app = FastAPI(title="Petty Cash Tracker", default_response_class=OrjsonResponse)
 
 # Configure CORS
 app.add_middleware(
@@ -14,17 +18,29 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.middleware("http")(metrics.metrics_middleware)
+
 
 # Database events
 @app.on_event("startup")
 async def startup_db_client():
     await connect_to_mongodb()
+    if settings.MONGO_CREATE_INDEXES:
+        await ensure_indexes_async(await get_database())
+
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
     await close_mongodb_connection()
+    get_ocr_engine().shutdown(wait=False)
+    get_password_executor().shutdown(wait=False)
+
 
 # Include routers
-app.include_router(transactions.router, prefix="/api/transactions", tags=["transactions"])
+app.include_router(
+    transactions.router, prefix="/api/transactions", tags=["transactions"]
+)
 app.include_router(thresholds.router, prefix="/api/thresholds", tags=["thresholds"])
-app.include_router(ocr.router, prefix="/api/ocr", tags=["ocr"])
\ No newline at end of file
+app.include_router(ocr.router, prefix="/api/ocr", tags=["ocr"])
+app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
+app.include_router(metrics.router)
@@ -0,0 +1,261 @@
+"""Process-wide latency metrics in the Prometheus text format
+
+Both apps record route latencies, a pymongo CommandListener records every
+MongoDB command and the OCR engine reports its stage timings into the
+histograms below; `render()` produces the `/metrics` response. Like the
+pool stats, the numbers cover this worker process only.
+
+While a request is traced (`start_trace`), the commands it issues are also
+collected with their filters, sorts and pipelines for the slow-request log.
+"""
+
+import bisect
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar, Token
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+from bson import json_util
+from pymongo import monitoring
+
+logger = logging.getLogger('app.slow_requests')
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds; request and command latencies, OCR stages (up to a minute)
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+OCR_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Command fields that describe the generated query (never documents/updates)
+QUERY_FIELDS = (
+    'filter',
+    'sort',
+    'projection',
+    'skip',
+    'limit',
+    'pipeline',
+    'query',
+    'key',
+    'hint',
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format(value: float) -> str:
+    return repr(float(value)) if value != float('inf') else '+Inf'
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels, safe to share between threads"""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        # One slot per bucket, then +Inf, count and sum
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 3)
+            series[slot] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} histogram',
+        ]
+        for key, values in sorted(series.items()):
+            labels = ','.join(
+                f'{name}="{_escape(value)}"'
+                for name, value in zip(self.labelnames, key)
+            )
+            prefix = f'{labels},' if labels else ''
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float('inf'),), values):
+                cumulative += count
+                bucket = f'{self.name}_bucket{{{prefix}le="{_format(bound)}"}}'
+                lines.append(f'{bucket} {int(cumulative)}')
+            suffix = f'{{{labels}}}' if labels else ''
+            lines.append(f'{self.name}_count{suffix} {int(values[-2])}')
+            lines.append(f'{self.name}_sum{suffix} {_format(values[-1])}')
+        return lines
+
+
+REQUEST_SECONDS = Histogram(
+    'http_request_duration_seconds',
+    'HTTP request latency by route template.',
+    ('app', 'method', 'route', 'status'),
+)
+MONGO_COMMAND_SECONDS = Histogram(
+    'mongodb_command_duration_seconds',
+    'MongoDB command latency by command and collection.',
+    ('command', 'collection', 'outcome'),
+)
+OCR_STAGE_SECONDS = Histogram(
+    'ocr_stage_duration_seconds',
+    'OCR pipeline stage latency (preprocessing steps, tesseract).',
+    ('stage',),
+    OCR_BUCKETS,
+)
+HISTOGRAMS = (REQUEST_SECONDS, MONGO_COMMAND_SECONDS, OCR_STAGE_SECONDS)
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    lines: List[str] = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.collect())
+    return '\n'.join(lines) + '\n'
+
+
+def reset() -> None:
+    for histogram in HISTOGRAMS:
+        histogram.reset()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=reset)
+
+
+def observe_ocr_stages(timings: Dict[str, float]) -> None:
+    """Record one OCR run's stage timings (milliseconds, as the engine reports them)"""
+    for stage, ms in timings.items():
+        OCR_STAGE_SECONDS.observe(ms / 1000, stage=stage)
+
+
+# Commands issued by the current request, while it is traced
+_trace: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar(
+    'request_trace', default=None
+)
+
+
+def start_trace() -> Token:
+    """Collect the current request's MongoDB commands; pass the token to end_trace"""
+    return _trace.set([])
+
+
+def end_trace(token: Token) -> List[Dict[str, Any]]:
+    commands = _trace.get() or []
+    _trace.reset(token)
+    return commands
+
+
+def _query_summary(command: Mapping[str, Any]) -> Dict[str, Any]:
+    summary = {field: command[field] for field in QUERY_FIELDS if field in command}
+    for field in ('updates', 'deletes'):
+        if field in command:
+            summary['q'] = [statement.get('q') for statement in command[field]]
+    return summary
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """Time every MongoDB command; add it to the request trace if one is active"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[Any, int], Tuple[str, Optional[Dict[str, Any]]]] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        # getMore names its collection in a separate field
+        field = 'collection' if event.command_name == 'getMore' else event.command_name
+        collection = event.command.get(field)
+        collection = collection if isinstance(collection, str) else ''
+        entry = None
+        trace = _trace.get()
+        if trace is not None:
+            entry = {
+                'command': event.command_name,
+                'collection': collection,
+                **_query_summary(event.command),
+            }
+            trace.append(entry)
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (collection, entry)
+
+    def _finished(
+        self,
+        event: Union[monitoring.CommandSucceededEvent, monitoring.CommandFailedEvent],
+        outcome: str,
+    ) -> None:
+        with self._lock:
+            collection, entry = self._pending.pop(
+                (event.connection_id, event.request_id), ('', None)
+            )
+        seconds = event.duration_micros / 1e6
+        MONGO_COMMAND_SECONDS.observe(
+            seconds, command=event.command_name, collection=collection, outcome=outcome
+        )
+        if entry is not None:
+            entry['ms'] = round(seconds * 1000, 3)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finished(event, 'ok')
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finished(event, 'error')
+
+
+command_metrics = CommandMetrics()
+
+
+def record_request(
+    app: str,
+    method: str,
+    route: str,
+    status: int,
+    started: float,
+    trace: Optional[List[Dict[str, Any]]] = None,
+    slow_ms: float = 0,
+    path: Optional[str] = None,
+) -> None:
+    """Observe a finished request; log it with its commands when slower than slow_ms"""
+    seconds = time.perf_counter() - started
+    REQUEST_SECONDS.observe(seconds, app=app, method=method, route=route, status=status)
+    if slow_ms and seconds * 1000 >= slow_ms:
+        logger.warning(
+            'Slow request %s %s -> %s in %.1f ms; commands: %s',
+            method,
+            path or route,
+            status,
+            seconds * 1000,
+            json_util.dumps(trace or []),
+        )
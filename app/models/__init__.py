@@ -1,4 +1,4 @@
 from app.models.transaction import Transaction, TransactionSchema
 from app.models.threshold import Threshold, ThresholdSchema
 
-__all__ = ['Transaction', 'TransactionSchema', 'Threshold', 'ThresholdSchema']
\ No newline at end of file
+__all__ = ['Transaction', 'TransactionSchema', 'Threshold', 'ThresholdSchema']
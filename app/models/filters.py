@@ -2,6 +2,7 @@ from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
 
+
 class TransactionFilter(BaseModel):
     search: Optional[str] = None
     type: Optional[str] = None
@@ -11,4 +12,4 @@ class TransactionFilter(BaseModel):
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
     sort_field: Optional[str] = None
-    sort_direction: Optional[str] = "desc"
\ No newline at end of file
+    sort_direction: Optional[str] = "desc"
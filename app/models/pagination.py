@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from typing import Any, List, Optional
+
+
+class CursorPage(BaseModel):
+    items: List[Any]
+    next_cursor: Optional[str] = None
+
+
+class TransactionEnvelope(BaseModel):
+    items: List[Any]
+    total: int
+    estimated: bool
+    receipts: float
+    expenses: float
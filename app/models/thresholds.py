@@ -1,10 +1,29 @@
+from typing import Literal
 from pydantic import BaseModel, Field
 
+
 class BalanceThreshold(BaseModel):
     person: str
     low_threshold: float = Field(default=500.0)
     medium_threshold: float = Field(default=3500.0)
 
+
 class ThresholdUpdate(BaseModel):
     low_threshold: float
-    medium_threshold: float
\ No newline at end of file
+    medium_threshold: float
+
+
+class ThresholdValues(BaseModel):
+    low: float
+    medium: float
+
+
+class PersonBalanceStatus(BaseModel):
+    """A person's ledger balance with their thresholds and resulting status"""
+
+    person: str
+    receipts: float
+    expenses: float
+    balance: float
+    status: Literal['low', 'medium', 'good']
+    thresholds: ThresholdValues
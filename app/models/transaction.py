@@ -1,7 +1,10 @@
 from datetime import datetime
-from typing import Optional
+from typing import Any, List, Literal, Optional
 from bson import ObjectId
-from marshmallow import Schema, fields, validate
+from marshmallow import Schema, fields, validate, EXCLUDE
+from pydantic import BaseModel, Field, field_validator
+from app.models.filters import TransactionFilter
+
 
 class TransactionSchema(Schema):
     id = fields.String(attribute='_id', dump_only=True)
@@ -13,9 +16,11 @@ class TransactionSchema(Schema):
     person = fields.String(required=True)
     project = fields.String(required=True)
     bill_image = fields.String(allow_none=True)
+    bill_image_id = fields.String(dump_only=True, allow_none=True)
 
     class Meta:
-        unknown = True
+        unknown = EXCLUDE
+
 
 class Transaction:
     def __init__(
@@ -28,7 +33,8 @@ class Transaction:
         person: str,
         project: str,
         bill_image: Optional[str] = None,
-        _id: Optional[ObjectId] = None
+        bill_image_id: Optional[str] = None,
+        _id: Optional[ObjectId] = None,
     ):
         self._id = _id
         self.date = date
@@ -38,4 +44,68 @@ class Transaction:
         self.category = category
         self.person = person
         self.project = project
-        self.bill_image = bill_image
\ No newline at end of file
+        self.bill_image = bill_image
+        self.bill_image_id = bill_image_id
+
+
+# Pydantic models for the FastAPI app (app.api); same fields as TransactionSchema
+
+
+class TransactionBase(BaseModel):
+    date: datetime
+    description: str
+    amount: float = Field(ge=0)
+    type: Literal['receipt', 'expense']
+    category: str
+    person: str
+    project: str
+
+
+class TransactionCreate(TransactionBase):
+    bill_image: Optional[str] = None
+
+
+class TransactionUpdate(BaseModel):
+    date: Optional[datetime] = None
+    description: Optional[str] = None
+    amount: Optional[float] = Field(default=None, ge=0)
+    type: Optional[Literal['receipt', 'expense']] = None
+    category: Optional[str] = None
+    person: Optional[str] = None
+    project: Optional[str] = None
+    # null removes the bill image
+    bill_image: Optional[str] = None
+
+    @field_validator(
+        'date',
+        'description',
+        'amount',
+        'type',
+        'category',
+        'person',
+        'project',
+        mode='before',
+    )
+    @classmethod
+    def not_null(cls, value: Any) -> Any:
+        """Leave a field out to keep it; only bill_image may be set to null"""
+        if value is None:
+            raise ValueError('may not be null')
+        return value
+
+
+class TransactionDB(TransactionBase):
+    id: str
+    bill_image_id: Optional[str] = None
+    bill_image: Optional[str] = None
+
+
+class BulkSelection(BaseModel):
+    """Transactions for a batch operation: an id list or the list filters"""
+
+    ids: Optional[List[str]] = None
+    filter: Optional[TransactionFilter] = None
+
+
+class BulkRecategorize(BulkSelection):
+    category: str = Field(min_length=1)
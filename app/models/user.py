@@ -2,16 +2,37 @@ from pydantic import BaseModel, EmailStr
 from typing import Optional
 from bson import ObjectId
 
+
 class UserBase(BaseModel):
     email: EmailStr
     full_name: str
 
+
 class UserCreate(UserBase):
     password: str
 
+
 class UserDB(UserBase):
     id: str
     hashed_password: str
 
     class Config:
-        json_encoders = {ObjectId: str}
\ No newline at end of file
+        json_encoders = {ObjectId: str}
+
+
+class UserLogin(BaseModel):
+    email: EmailStr
+    password: str
+
+
+class UserPublic(UserBase):
+    """A user as API responses show it (never the password hash)"""
+
+    id: str
+
+
+class AccessToken(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+    expires_in: int
+    user: UserPublic
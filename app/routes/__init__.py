@@ -1,4 +1,6 @@
 from app.routes.transaction_routes import bp as transaction_routes
 from app.routes.ocr_routes import bp as ocr_routes
+from app.routes.health_routes import bp as health_routes
+from app.routes.metrics_routes import bp as metrics_routes
 
-__all__ = ['transaction_routes', 'ocr_routes']
\ No newline at end of file
+__all__ = ['transaction_routes', 'ocr_routes', 'health_routes', 'metrics_routes']
@@ -0,0 +1,28 @@
+from flask import Blueprint, jsonify
+from flask.typing import ResponseReturnValue
+from app.database import get_pool_stats
+from app.routes.ocr_routes import current_ocr_cache, current_ocr_engine
+from app.services.transaction_service import current_query_cache
+
+bp = Blueprint('health', __name__)
+
+
+@bp.route('/db-pool', methods=['GET'])
+def db_pool_stats() -> ResponseReturnValue:
+    """Connection pool checkout wait times for this worker"""
+    return jsonify(get_pool_stats())
+
+
+@bp.route('/ocr', methods=['GET'])
+def ocr_stats() -> ResponseReturnValue:
+    """OCR process pool load and result cache hit rates for this worker"""
+    return jsonify(
+        {'engine': current_ocr_engine().stats(), 'cache': current_ocr_cache().stats()}
+    )
+
+
+@bp.route('/query-cache', methods=['GET'])
+def query_cache_stats() -> ResponseReturnValue:
+    """Transaction list and balance cache hit rates for this worker"""
+    cache = current_query_cache()
+    return jsonify(cache.stats() if cache else {'enabled': False})
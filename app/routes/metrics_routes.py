@@ -0,0 +1,45 @@
+import time
+from typing import Optional
+from flask import Blueprint, Response, current_app, g, request
+from app import metrics
+
+bp = Blueprint('metrics', __name__)
+
+
+@bp.before_app_request
+def start_request_timer() -> None:
+    g.metrics_started = time.perf_counter()
+    if current_app.config.get('SLOW_REQUEST_MS'):
+        g.metrics_trace = metrics.start_trace()
+
+
+@bp.after_app_request
+def remember_response_status(response: Response) -> Response:
+    g.metrics_status = response.status_code
+    return response
+
+
+@bp.teardown_app_request
+def record_request_latency(exc: Optional[BaseException]) -> None:
+    """Record every request, including views that raised (after_request skips those)"""
+    started = g.pop('metrics_started', None)
+    token = g.pop('metrics_trace', None)
+    trace = metrics.end_trace(token) if token else None
+    status = g.pop('metrics_status', 500)
+    if started is not None:
+        metrics.record_request(
+            'flask',
+            request.method,
+            request.url_rule.rule if request.url_rule else 'unmatched',
+            500 if exc is not None else status,
+            started,
+            trace,
+            current_app.config.get('SLOW_REQUEST_MS', 0),
+            request.full_path.rstrip('?'),
+        )
+
+
+@bp.route('/metrics', methods=['GET'])
+def prometheus_metrics() -> Response:
+    """Route, MongoDB command and OCR stage latencies for this worker"""
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
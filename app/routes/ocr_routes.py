@@ -1,33 +1,264 @@
-from flask import Blueprint, request, jsonify
-from app.services.ocr_service import OCRService
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import List, Tuple, Union
+from flask import (
+    Blueprint,
+    Response,
+    request,
+    jsonify,
+    current_app,
+    stream_with_context,
+)
+from flask.typing import ResponseReturnValue
+from app.database import get_db
+from app.services.image_store import InvalidImageError, decode_data_url
+from app.services.ocr_service import OCRService, ocr_settings_fingerprint
+from app.services.ocr_engine import (
+    OCREngine,
+    OCRSaturatedError,
+    get_ocr_engine,
+    job_status,
+)
+from app.services.ocr_cache import OCRResultCache, cache_key, get_ocr_cache
+from app.services.ocr_batch import (
+    ZIP_TYPES,
+    ImageSource,
+    batch_sources,
+    run_batch,
+    zip_images,
+)
+from app.services.ocr_settings import pipeline_settings
+from app.utils.uploads import (
+    UploadTooLargeError,
+    iter_stream,
+    request_image_upload,
+    spool_chunks,
+)
+from app.services.category_classifier import (
+    CategoryClassifier,
+    CategoryTaxonomy,
+    get_classifier_registry,
+)
 
 bp = Blueprint('ocr', __name__)
-ocr_service = OCRService()
+
+
+def current_ocr_engine() -> OCREngine:
+    config = current_app.config
+    return get_ocr_engine(
+        config.get('OCR_MAX_WORKERS'),
+        config.get('OCR_MAX_QUEUE', 16),
+        config.get('OCR_JOB_TTL', 600),
+        pipeline_settings(
+            max_side=config.get('OCR_MAX_SIDE'),
+            threshold=config.get('OCR_THRESHOLD'),
+            deskew=config.get('OCR_DESKEW'),
+            crop=config.get('OCR_CROP'),
+        ),
+    )
+
+
+def current_ocr_cache() -> OCRResultCache:
+    config = current_app.config
+    return get_ocr_cache(
+        config.get('OCR_CACHE_MAX_BYTES', 16 * 1024 * 1024),
+        config.get('OCR_CACHE_TTL', 30 * 24 * 3600),
+        config.get('OCR_CACHE_PERSIST', False),
+    )
+
+
+def current_classifier() -> CategoryClassifier:
+    """Compiled category classifier, reloaded when the taxonomy changed"""
+    config = current_app.config
+    registry = get_classifier_registry(
+        config.get('CATEGORY_RELOAD_INTERVAL', 30),
+        config.get('CATEGORY_LEARNED', False),
+        config.get('CATEGORY_MODEL_TTL', 3600),
+        config.get('CATEGORY_MODEL_SAMPLE', 50000),
+    )
+    return registry.refresh(get_db())
+
+
+def _uploaded_image() -> Union[bytes, str, None]:
+    """Image bytes from a multipart/raw upload, or the JSON base64 string"""
+    upload = request_image_upload(
+        'image', current_app.config.get('UPLOAD_MAX_BYTES', 10 * 1024 * 1024)
+    )
+    if upload is not None:
+        return upload[0]
+    return (request.get_json(silent=True) or {}).get('image')
+
+
+def _saturated(e: OCRSaturatedError) -> Tuple[Response, int]:
+    response = jsonify({'error': str(e)})
+    response.headers['Retry-After'] = '5'
+    return response, 503
+
 
 @bp.route('/analyze-bill', methods=['POST'])
 def analyze_bill():
     """Analyze bill image and suggest category and amount"""
-    if 'image' not in request.json:
+    try:
+        image = _uploaded_image()
+    except UploadTooLargeError as e:
+        return jsonify({'error': str(e)}), 413
+    if not image:
         return jsonify({'error': 'No image data provided'}), 400
 
+    ocr_service = OCRService(classifier=current_classifier())
     try:
-        # Extract text from image
-        text = ocr_service.extract_text(request.json['image'])
-        
+        image_bytes = image if isinstance(image, bytes) else decode_data_url(image)[0]
+        key = cache_key(
+            image_bytes, ocr_settings_fingerprint(current_ocr_engine().pipeline)
+        )
+        cached = current_ocr_cache().get(key, get_db())
+        if cached is not None:
+            # Re-classify so taxonomy edits apply to previously seen images
+            return jsonify(ocr_service.analyze_text(cached['extracted_text']))
+
+        # Extract text from image in the OCR process pool
+        text = current_ocr_engine().extract_text(
+            image_bytes, timeout=current_app.config.get('OCR_TIMEOUT')
+        )
+
         if not text:
             return jsonify({'error': 'Could not extract text from image'}), 400
-        
-        # Get suggested category and confidence
-        category, confidence = ocr_service.suggest_category(text)
-        
-        # Extract amount
-        amount = ocr_service.extract_amount(text)
-        
-        return jsonify({
-            'extracted_text': text,
-            'suggested_category': category,
-            'confidence': confidence,
-            'suggested_amount': amount
-        })
+
+        result = ocr_service.analyze_text(text)
+        current_ocr_cache().put(key, result, get_db())
+        return jsonify(result)
+    except InvalidImageError as e:
+        return jsonify({'error': str(e)}), 400
+    except OCRSaturatedError as e:
+        return _saturated(e)
+    except FutureTimeoutError:
+        return jsonify({'error': 'OCR timed out'}), 504
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+
+def _batch_sources() -> List[ImageSource]:
+    """Images of a batch upload: multipart `images` files (zips expanded) or zip body"""
+    config = current_app.config
+    max_bytes = config.get('UPLOAD_MAX_BYTES', 10 * 1024 * 1024)
+    batch_max_bytes = config.get('OCR_BATCH_MAX_BYTES', 256 * 1024 * 1024)
+    if request.content_length and request.content_length > batch_max_bytes:
+        raise UploadTooLargeError(f'Upload exceeds {batch_max_bytes} bytes')
+    # Uploads are copied to spools of our own: the request's files may be
+    # closed before the response finishes streaming (spools close when collected)
+    if request.mimetype == 'multipart/form-data':
+        return batch_sources(
+            (
+                (
+                    f.filename,
+                    f.mimetype,
+                    spool_chunks(iter_stream(f.stream), batch_max_bytes),
+                )
+                for f in request.files.getlist('images')
+            ),
+            max_bytes,
+        )
+    if request.mimetype in ZIP_TYPES:
+        return zip_images(
+            spool_chunks(iter_stream(request.stream), batch_max_bytes), max_bytes
+        )
+    return []
+
+
+@bp.route('/batch', methods=['POST'])
+def analyze_batch() -> ResponseReturnValue:
+    """OCR many bill images; streams one NDJSON line per image, then a summary"""
+    config = current_app.config
+    try:
+        sources = _batch_sources()
+    except UploadTooLargeError as e:
+        return jsonify({'error': str(e)}), 413
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if not sources:
+        return (
+            jsonify(
+                {'error': 'Upload images as multipart `images` files or a zip archive'}
+            ),
+            400,
+        )
+    max_images = config.get('OCR_BATCH_MAX_IMAGES', 200)
+    if len(sources) > max_images:
+        return jsonify({'error': f'At most {max_images} images per batch'}), 413
+
+    engine = current_ocr_engine()
+    body = run_batch(
+        sources,
+        engine,
+        OCRService(classifier=current_classifier()).analyze_text,
+        current_ocr_cache(),
+        get_db(),
+        min(config.get('OCR_BATCH_CONCURRENCY') or engine.max_workers, engine.capacity),
+        config.get('OCR_TIMEOUT'),
+    )
+    return Response(stream_with_context(body), mimetype='application/x-ndjson')
+
+
+@bp.route('/jobs', methods=['POST'])
+def submit_job() -> ResponseReturnValue:
+    """Queue a bill image for OCR and return a job id to poll"""
+    try:
+        image = _uploaded_image()
+    except UploadTooLargeError as e:
+        return jsonify({'error': str(e)}), 413
+    if not image:
+        return jsonify({'error': 'No image data provided'}), 400
+    try:
+        job_id = current_ocr_engine().submit_job(image)
+    except OCRSaturatedError as e:
+        return _saturated(e)
+    return jsonify({'job_id': job_id, 'status': 'queued'}), 202
+
+
+@bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id: str) -> ResponseReturnValue:
+    """Poll an OCR job; ?wait=<seconds> blocks until it finishes or times out"""
+    future = current_ocr_engine().get_job(job_id)
+    if future is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    wait = min(
+        request.args.get('wait', 0.0, type=float),
+        current_app.config.get('OCR_TIMEOUT', 60),
+    )
+    if wait > 0:
+        try:
+            future.result(wait)
+        except Exception:
+            pass
+
+    status = job_status(future)
+    if 'text' in status:
+        status.update(
+            OCRService(classifier=current_classifier()).analyze_text(status.pop('text'))
+        )
+    return jsonify({'job_id': job_id, **status})
+
+
+@bp.route('/categories', methods=['GET'])
+def get_categories() -> ResponseReturnValue:
+    """Keyword taxonomy used to suggest categories"""
+    return jsonify(CategoryTaxonomy(get_db()).get_taxonomy())
+
+
+@bp.route('/categories/<category>', methods=['PUT'])
+def set_category_keywords(category: str) -> ResponseReturnValue:
+    """Create a category or replace its keyword list"""
+    keywords = (request.json or {}).get('keywords')
+    if not isinstance(keywords, list) or not all(isinstance(k, str) for k in keywords):
+        return jsonify({'error': 'keywords must be a list of strings'}), 400
+    keywords = CategoryTaxonomy(get_db()).set_keywords(category, keywords)
+    get_classifier_registry().invalidate()
+    return jsonify({'category': category, 'keywords': keywords})
+
+
+@bp.route('/categories/<category>', methods=['DELETE'])
+def delete_category(category: str) -> ResponseReturnValue:
+    if not CategoryTaxonomy(get_db()).delete_category(category):
+        return jsonify({'error': 'Category not found'}), 404
+    get_classifier_registry().invalidate()
+    return '', 204
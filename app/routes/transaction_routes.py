@@ -1,47 +1,283 @@
-from flask import Blueprint, request, jsonify
-from app.services.transaction_service import TransactionService
+from datetime import datetime
+from typing import Any, Iterator, Optional, Tuple
+from flask import (
+    Blueprint,
+    Response,
+    current_app,
+    request,
+    jsonify,
+    stream_with_context,
+)
+from flask.typing import ResponseReturnValue
+from marshmallow import ValidationError
+from app.services.image_store import InvalidImageError
+from app.services.rollup_service import DIMENSIONS as REPORT_DIMENSIONS
+from app.services.transaction_service import (
+    BULK_BATCH_SIZE,
+    TransactionService,
+    bulk_selector,
+)
 from app.utils.pagination import get_pagination_params
 from app.utils.filters import build_transaction_filters
+from app.utils.cursor import SORTABLE_FIELDS, InvalidCursorError
+from app.utils.export import iter_csv, iter_ndjson, gzip_chunks
+from app.utils.importers import iter_csv_rows, iter_json_array
+from app.utils.uploads import UploadTooLargeError, request_image_upload
+
+EXPORT_FORMATS = {
+    'csv': (iter_csv, 'text/csv'),
+    'ndjson': (iter_ndjson, 'application/x-ndjson'),
+}
 
 bp = Blueprint('transactions', __name__)
-transaction_service = TransactionService()
+
 
 @bp.route('/', methods=['GET'])
 def get_transactions():
     skip, limit = get_pagination_params()
     filters = build_transaction_filters(request.args)
-    sort = (request.args.get('sort_field', 'date'), 
-            -1 if request.args.get('sort_direction', 'desc') == 'desc' else 1)
-    
-    transactions = transaction_service.get_transactions(skip, limit, filters, sort)
+    sort = (
+        request.args.get('sort_field', 'date'),
+        -1 if request.args.get('sort_direction', 'desc') == 'desc' else 1,
+    )
+    include_image = request.args.get('include_image') == '1'
+
+    # Keyset pagination when a cursor is supplied (empty cursor = first page)
+    if 'cursor' in request.args:
+        if sort[0] not in SORTABLE_FIELDS:
+            return jsonify({'error': f'Cannot paginate by {sort[0]}'}), 400
+        try:
+            transactions, next_cursor = TransactionService().get_transactions_page(
+                limit, filters, sort, request.args['cursor'], include_image
+            )
+        except InvalidCursorError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({'items': transactions, 'next_cursor': next_cursor})
+
+    # Page plus total count and receipt/expense sums
+    if request.args.get('envelope') == '1':
+        return jsonify(
+            TransactionService().get_transactions_envelope(
+                skip, limit, filters, sort, include_image
+            )
+        )
+
+    transactions = TransactionService().get_transactions(
+        skip, limit, filters, sort, include_image
+    )
     return jsonify(transactions)
 
+
+@bp.route('/export', methods=['GET'])
+def export_transactions() -> ResponseReturnValue:
+    """Stream all transactions matching the list filters as CSV or NDJSON"""
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f'Unsupported export format: {export_format}'}), 400
+    serializer, mimetype = EXPORT_FORMATS[export_format]
+
+    filters = build_transaction_filters(request.args)
+    sort = (
+        request.args.get('sort_field', 'date'),
+        -1 if request.args.get('sort_direction', 'desc') == 'desc' else 1,
+    )
+    docs = TransactionService().iter_transactions(
+        filters, sort, current_app.config.get('EXPORT_BATCH_SIZE', 1000)
+    )
+
+    filename = f'transactions.{export_format}'
+    body: Iterator[Any] = serializer(docs)
+    if request.args.get('gzip') == '1':
+        body = gzip_chunks(body)
+        mimetype = 'application/gzip'
+        filename += '.gz'
+
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
+
+
+@bp.route('/import', methods=['POST'])
+def import_transactions() -> ResponseReturnValue:
+    """Bulk import a CSV file or a JSON array of transactions"""
+    upload = request.files.get('file')
+    if upload is not None:
+        stream, mimetype, filename = (
+            upload.stream,
+            upload.mimetype,
+            upload.filename or '',
+        )
+    else:
+        stream, mimetype, filename = request.stream, request.mimetype, ''
+
+    if mimetype == 'text/csv' or filename.lower().endswith('.csv'):
+        rows = iter_csv_rows(stream)
+    elif mimetype == 'application/json' or filename.lower().endswith('.json'):
+        rows = iter_json_array(stream)
+    else:
+        return jsonify({'error': 'Upload a CSV file or a JSON array'}), 415
+
+    summary = TransactionService().import_transactions(
+        rows, current_app.config.get('IMPORT_CHUNK_SIZE', 1000)
+    )
+    if 'error' in summary and not summary['inserted']:
+        return jsonify(summary), 400
+    return jsonify(summary)
+
+
+def _upload_limit() -> int:
+    return int(current_app.config.get('UPLOAD_MAX_BYTES', 10 * 1024 * 1024))
+
+
 @bp.route('/', methods=['POST'])
 def create_transaction():
-    transaction = transaction_service.create_transaction(request.json)
+    """Create from JSON, or multipart form fields with a `bill_image` file"""
+    if request.mimetype == 'multipart/form-data':
+        try:
+            bill_image = request_image_upload('bill_image', _upload_limit())
+        except UploadTooLargeError as e:
+            return jsonify({'error': str(e)}), 413
+        data = request.form.to_dict()
+    else:
+        bill_image, data = None, request.json
+    try:
+        transaction = TransactionService().create_transaction(data, bill_image)
+    except InvalidImageError as e:
+        return jsonify({'error': str(e)}), 400
     return jsonify(transaction), 201
 
+
 @bp.route('/<transaction_id>', methods=['GET'])
 def get_transaction(transaction_id):
-    transaction = transaction_service.get_transaction(transaction_id)
+    transaction = TransactionService().get_transaction(transaction_id)
     if not transaction:
         return {'message': 'Transaction not found'}, 404
     return jsonify(transaction)
 
+
+@bp.route('/<transaction_id>/bill-image', methods=['GET'])
+def get_bill_image(transaction_id: str) -> ResponseReturnValue:
+    """Stream the bill image bytes stored for a transaction"""
+    image = TransactionService().get_bill_image(transaction_id)
+    if not image:
+        return {'message': 'Bill image not found'}, 404
+    content_type, body, length = image
+    response = Response(body, mimetype=content_type)
+    # Never let a browser second-guess the (whitelisted) type into HTML
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    if length is not None:
+        response.content_length = length
+    return response
+
+
+@bp.route('/<transaction_id>/bill-image', methods=['PUT'])
+def set_bill_image(transaction_id: str) -> ResponseReturnValue:
+    """Attach a bill image sent as the raw body or a multipart `image` file"""
+    try:
+        upload = request_image_upload('image', _upload_limit())
+    except UploadTooLargeError as e:
+        return jsonify({'error': str(e)}), 413
+    if upload is None:
+        return jsonify({'error': 'No image uploaded'}), 400
+    transaction = TransactionService().set_bill_image(transaction_id, *upload)
+    if not transaction:
+        return {'message': 'Transaction not found'}, 404
+    return jsonify(transaction)
+
+
 @bp.route('/<transaction_id>', methods=['PUT'])
 def update_transaction(transaction_id):
-    transaction = transaction_service.update_transaction(transaction_id, request.json)
+    try:
+        transaction = TransactionService().update_transaction(
+            transaction_id, request.get_json(silent=True)
+        )
+    except ValidationError as e:
+        return jsonify({'error': e.messages}), 400
+    except InvalidImageError as e:
+        return jsonify({'error': str(e)}), 400
     if not transaction:
         return {'message': 'Transaction not found'}, 404
     return jsonify(transaction)
 
+
 @bp.route('/<transaction_id>', methods=['DELETE'])
 def delete_transaction(transaction_id):
-    if transaction_service.delete_transaction(transaction_id):
+    if TransactionService().delete_transaction(transaction_id):
         return '', 204
     return {'message': 'Transaction not found'}, 404
 
+
+def _bulk_request() -> Tuple[dict, dict]:
+    """Selector and body of a batch request: `ids` or a list `filter` object"""
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        raise ValueError('Send a JSON object with ids or filter')
+    ids, filters = body.get('ids'), body.get('filter')
+    if ids is not None and not isinstance(ids, list):
+        raise ValueError('ids must be a list')
+    if filters is not None and not isinstance(filters, dict):
+        raise ValueError('filter must be an object')
+    return (
+        bulk_selector(ids, build_transaction_filters(filters) if filters else None),
+        body,
+    )
+
+
+def _bulk_batch_size() -> int:
+    return int(current_app.config.get('BULK_BATCH_SIZE', BULK_BATCH_SIZE))
+
+
+@bp.route('/bulk/recategorize', methods=['POST'])
+def recategorize_transactions() -> ResponseReturnValue:
+    """Set `category` on the transactions selected by `ids` or `filter`"""
+    try:
+        selector, body = _bulk_request()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    category = body.get('category')
+    if not isinstance(category, str) or not category:
+        return jsonify({'error': 'category is required'}), 400
+    return jsonify(
+        TransactionService().recategorize_transactions(
+            selector, category, _bulk_batch_size()
+        )
+    )
+
+
+@bp.route('/bulk/delete', methods=['POST'])
+def delete_transactions() -> ResponseReturnValue:
+    """Delete the transactions selected by `ids` or `filter`"""
+    try:
+        selector, _ = _bulk_request()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(
+        TransactionService().delete_transactions(selector, _bulk_batch_size())
+    )
+
+
 @bp.route('/balances', methods=['GET'])
 def get_person_balances():
-    balances = transaction_service.get_person_balances()
-    return jsonify(balances)
\ No newline at end of file
+    balances = TransactionService().get_person_balances()
+    return jsonify(balances)
+
+
+def _report_date(name: str) -> Optional[datetime]:
+    value = request.args.get(name)
+    return datetime.strptime(value, '%Y-%m-%d') if value else None
+
+
+@bp.route('/report', methods=['GET'])
+def get_report() -> ResponseReturnValue:
+    """Totals per day/week/month, optionally grouped by dimensions, from the rollups"""
+    group_by = [d for d in request.args.get('group_by', '').split(',') if d]
+    filters = {d: request.args[d] for d in REPORT_DIMENSIONS if request.args.get(d)}
+    try:
+        start = _report_date('start_date')
+        end = _report_date('end_date')
+        rows = TransactionService().get_report(
+            group_by, request.args.get('granularity', 'month'), start, end, filters
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(rows)
@@ -1,4 +1,16 @@
-from app.services.transaction_service import TransactionService
-from app.services.ocr_service import OCRService
+from importlib import import_module
+from typing import Any
 
-__all__ = ['TransactionService', 'OCRService']
\ No newline at end of file
+# Loaded on first access, so importing one service does not import them all
+_EXPORTS = {
+    'TransactionService': 'app.services.transaction_service',
+    'OCRService': 'app.services.ocr_service',
+}
+
+__all__ = ['TransactionService', 'OCRService']
+
+
+def __getattr__(name: str) -> Any:
+    if name in _EXPORTS:
+        return getattr(import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,191 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.database import Database
+
+# Largest difference between ledger and recomputed values treated as equal
+DRIFT_TOLERANCE = 0.005
+
+
+def _contribution(transaction: Optional[dict]) -> Optional[Tuple[str, float, float]]:
+    """(person, receipts, expenses) a transaction adds to the ledger"""
+    if not transaction or not transaction.get('person'):
+        return None
+    amount = float(transaction.get('amount') or 0)
+    if transaction.get('type') == 'receipt':
+        return transaction['person'], amount, 0.0
+    if transaction.get('type') == 'expense':
+        return transaction['person'], 0.0, amount
+    return None
+
+
+def _deltas(changes: Iterable[Tuple[Optional[dict], int]]) -> Dict[str, List[float]]:
+    deltas: Dict[str, List[float]] = {}
+    for transaction, sign in changes:
+        contribution = _contribution(transaction)
+        if contribution:
+            person, receipts, expenses = contribution
+            delta = deltas.setdefault(person, [0.0, 0.0])
+            delta[0] += sign * receipts
+            delta[1] += sign * expenses
+    return deltas
+
+
+def _operations(deltas: Dict[str, List[float]]) -> List[UpdateOne]:
+    return [
+        UpdateOne(
+            {'_id': person},
+            {
+                '$inc': {
+                    'receipts': receipts,
+                    'expenses': expenses,
+                    'balance': receipts - expenses,
+                }
+            },
+            upsert=True,
+        )
+        for person, (receipts, expenses) in deltas.items()
+        if receipts or expenses
+    ]
+
+
+def _balance_row(doc: dict) -> dict:
+    return {**doc, 'person': doc['_id']}
+
+
+class BalanceLedger:
+    """Materialized per-person balances kept in the `balances` collection
+
+    Each document is keyed by person (`_id`) and holds running receipts,
+    expenses and balance totals that are adjusted with $inc deltas on every
+    transaction write.
+    """
+
+    def __init__(self, database: Database) -> None:
+        self.db = database
+        self.collection = database.balances
+
+    def apply(self, old: Optional[dict], new: Optional[dict]) -> None:
+        """Move the ledger from the `old` version of a transaction to `new`"""
+        self._write(_deltas(((old, -1), (new, 1))))
+
+    def apply_many(self, transactions: Iterable[dict]) -> None:
+        """Add many new transactions with one write per person"""
+        self._write(_deltas((transaction, 1) for transaction in transactions))
+
+    def apply_changes(
+        self, changes: Iterable[Tuple[Optional[dict], Optional[dict]]]
+    ) -> None:
+        """Apply many (old, new) transaction pairs with one write per row"""
+        self._write(
+            _deltas(change for old, new in changes for change in ((old, -1), (new, 1)))
+        )
+
+    def _write(self, deltas: Dict[str, List[float]]) -> None:
+        operations = _operations(deltas)
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+
+    def get_balances(self) -> List[dict]:
+        return [_balance_row(doc) for doc in self.collection.find({}).sort('_id', 1)]
+
+    def compute_balances(self) -> List[dict]:
+        """Recompute balances from the full transaction history"""
+        pipeline: List[dict] = [
+            {
+                '$group': {
+                    '_id': '$person',
+                    'receipts': {
+                        '$sum': {'$cond': [{'$eq': ['$type', 'receipt']}, '$amount', 0]}
+                    },
+                    'expenses': {
+                        '$sum': {'$cond': [{'$eq': ['$type', 'expense']}, '$amount', 0]}
+                    },
+                }
+            },
+            {
+                '$project': {
+                    'person': '$_id',
+                    'receipts': 1,
+                    'expenses': 1,
+                    'balance': {'$subtract': ['$receipts', '$expenses']},
+                }
+            },
+        ]
+        return list(self.db.transactions.aggregate(pipeline))
+
+    def verify(self) -> List[dict]:
+        """Compare the ledger with a full recomputation and report drift"""
+        expected = {doc['_id']: doc for doc in self.compute_balances()}
+        actual = {doc['_id']: doc for doc in self.collection.find({})}
+        drift = []
+        for person in sorted(set(expected) | set(actual), key=str):
+            for field in ('receipts', 'expenses', 'balance'):
+                want = float(expected.get(person, {}).get(field, 0))
+                have = float(actual.get(person, {}).get(field, 0))
+                if abs(want - have) > DRIFT_TOLERANCE:
+                    drift.append(
+                        {
+                            'person': person,
+                            'field': field,
+                            'expected': want,
+                            'actual': have,
+                        }
+                    )
+        return drift
+
+    def rebuild(self) -> int:
+        """Replace the ledger with a full recomputation; returns row count
+
+        Rows are overwritten in place and only people without transactions
+        are deleted afterwards, so readers never see an empty ledger.
+        Writes made while it runs can be overwritten: stop them for an
+        exact result.
+        """
+        balances = self.compute_balances()
+        operations = [
+            ReplaceOne(
+                {'_id': doc['_id']},
+                {
+                    'receipts': doc['receipts'],
+                    'expenses': doc['expenses'],
+                    'balance': doc['balance'],
+                },
+                upsert=True,
+            )
+            for doc in balances
+        ]
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+        self.collection.delete_many({'_id': {'$nin': [doc['_id'] for doc in balances]}})
+        return len(balances)
+
+
+class AsyncBalanceLedger:
+    """BalanceLedger for Motor databases (FastAPI); same documents and deltas"""
+
+    def __init__(self, database: Any) -> None:
+        self.db = database
+        self.collection = database.balances
+
+    async def apply(self, old: Optional[dict], new: Optional[dict]) -> None:
+        await self._write(_deltas(((old, -1), (new, 1))))
+
+    async def apply_many(self, transactions: Iterable[dict]) -> None:
+        await self._write(_deltas((transaction, 1) for transaction in transactions))
+
+    async def apply_changes(
+        self, changes: Iterable[Tuple[Optional[dict], Optional[dict]]]
+    ) -> None:
+        await self._write(
+            _deltas(change for old, new in changes for change in ((old, -1), (new, 1)))
+        )
+
+    async def _write(self, deltas: Dict[str, List[float]]) -> None:
+        operations = _operations(deltas)
+        if operations:
+            await self.collection.bulk_write(operations, ordered=False)
+
+    async def get_balances(self) -> List[dict]:
+        return [
+            _balance_row(doc) async for doc in self.collection.find({}).sort('_id', 1)
+        ]
@@ -0,0 +1,329 @@
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from pymongo.database import Database
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = 'categories'
+FALLBACK_CATEGORY = 'Miscellaneous'
+
+# Used until categories are stored in the `categories` collection
+DEFAULT_TAXONOMY: Dict[str, List[str]] = {
+    'Office Supplies': ['paper', 'pen', 'stapler', 'ink', 'toner'],
+    'Travel': ['taxi', 'uber', 'flight', 'hotel', 'train'],
+    'Meals': ['restaurant', 'food', 'lunch', 'dinner', 'cafe'],
+    'Utilities': ['electricity', 'water', 'internet', 'phone'],
+    'Equipment': ['computer', 'laptop', 'monitor', 'keyboard'],
+}
+
+_TOKEN = re.compile(r'[a-z]{3,}')
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+class TokenScorer:
+    """Per-token category weights learned from transaction descriptions
+
+    A token's weight for a category is the share of its occurrences seen
+    under that category, damped for rare tokens, so distinctive words
+    ('toner') count for more than words spread across categories ('store').
+    """
+
+    def __init__(self, weights: Dict[str, Dict[str, float]]):
+        self.weights = weights
+
+    @classmethod
+    def train(
+        cls, samples: Iterable[Tuple[str, str]], min_count: int = 3
+    ) -> 'TokenScorer':
+        counts: Dict[str, Counter] = defaultdict(Counter)
+        for description, category in samples:
+            if not description or not category:
+                continue
+            for token in set(tokenize(description)):
+                counts[token][category] += 1
+
+        weights = {}
+        for token, per_category in counts.items():
+            total = sum(per_category.values())
+            if total < min_count:
+                continue
+            damping = 1 - 1 / math.log2(total + 2)
+            weights[token] = {
+                category: count / total * damping
+                for category, count in per_category.items()
+            }
+        return cls(weights)
+
+    def score(self, tokens: Iterable[str]) -> Dict[str, float]:
+        scores: Dict[str, float] = defaultdict(float)
+        distinct = set(tokens)
+        for token in distinct:
+            for category, weight in self.weights.get(token, {}).items():
+                scores[category] += weight
+        if not distinct:
+            return {}
+        return {category: score / len(distinct) for category, score in scores.items()}
+
+
+class CategoryClassifier:
+    """Keyword taxonomy compiled into a single word-boundary regex
+
+    One `finditer` pass over the text finds every keyword of every category,
+    so classification cost depends on the text length, not on the size of
+    the taxonomy.
+    """
+
+    def __init__(
+        self, taxonomy: Dict[str, List[str]], scorer: Optional[TokenScorer] = None
+    ):
+        self.taxonomy = {
+            category: sorted({k.lower() for k in keywords if k})
+            for category, keywords in taxonomy.items()
+        }
+        self.scorer = scorer
+        self.keyword_categories: Dict[str, List[str]] = defaultdict(list)
+        for category, keywords in self.taxonomy.items():
+            for keyword in keywords:
+                self.keyword_categories[keyword].append(category)
+
+        # Longest first so 'water bill' wins over 'water' at the same position
+        alternatives = sorted(self.keyword_categories, key=len, reverse=True)
+        self.pattern = (
+            re.compile(r'\b(?:' + '|'.join(re.escape(k) for k in alternatives) + r')\b')
+            if alternatives
+            else None
+        )
+
+    def keyword_scores(self, text: str) -> Dict[str, float]:
+        if self.pattern is None:
+            return {}
+        found = {match.group(0) for match in self.pattern.finditer(text.lower())}
+        hits: Counter = Counter()
+        for keyword in found:
+            for category in self.keyword_categories[keyword]:
+                hits[category] += 1
+        return {
+            category: count / len(self.taxonomy[category])
+            for category, count in hits.items()
+        }
+
+    def classify(self, text: str) -> Tuple[str, float]:
+        scores = self.keyword_scores(text)
+        if not scores and self.scorer is not None:
+            scores = self.scorer.score(tokenize(text))
+        if not scores:
+            return FALLBACK_CATEGORY, 0.0
+        return max(scores.items(), key=lambda item: item[1])
+
+
+def taxonomy_from_documents(docs: Iterable[dict]) -> Dict[str, List[str]]:
+    return {doc['_id']: list(doc.get('keywords', [])) for doc in docs}
+
+
+def _fingerprint(taxonomy: Dict[str, List[str]]) -> str:
+    return hashlib.sha1(json.dumps(taxonomy, sort_keys=True).encode()).hexdigest()
+
+
+class CategoryTaxonomy:
+    """Category keyword lists stored in the `categories` collection
+
+    Documents are keyed by category name (`_id`) and hold a `keywords` list.
+    The first write seeds the collection with DEFAULT_TAXONOMY so editing
+    one category does not drop the built-in ones.
+    """
+
+    def __init__(self, database: Database) -> None:
+        self.db = database
+        self.collection = database[COLLECTION]
+
+    def get_taxonomy(self) -> Dict[str, List[str]]:
+        return taxonomy_from_documents(self.collection.find({}).sort('_id', 1)) or dict(
+            DEFAULT_TAXONOMY
+        )
+
+    def _seed(self) -> None:
+        if self.collection.count_documents({}, limit=1) == 0:
+            self.collection.insert_many(
+                [
+                    {'_id': category, 'keywords': keywords}
+                    for category, keywords in DEFAULT_TAXONOMY.items()
+                ]
+            )
+
+    def set_keywords(self, category: str, keywords: List[str]) -> List[str]:
+        self._seed()
+        keywords = sorted({k.strip().lower() for k in keywords if k and k.strip()})
+        self.collection.update_one(
+            {'_id': category}, {'$set': {'keywords': keywords}}, upsert=True
+        )
+        return keywords
+
+    def delete_category(self, category: str) -> bool:
+        self._seed()
+        deleted: int = self.collection.delete_one({'_id': category}).deleted_count
+        return deleted > 0
+
+
+class ClassifierRegistry:
+    """Holds the compiled classifier and recompiles it when the taxonomy changes
+
+    The `categories` collection is re-read at most every `reload_interval`
+    seconds; the matcher is only recompiled when its contents changed.
+    With `learned` set, a TokenScorer is retrained from recent transactions
+    every `model_ttl` seconds. Each reload is claimed before it starts, so
+    concurrent refreshes never repeat one that is already in progress.
+    """
+
+    def __init__(
+        self,
+        reload_interval: float = 30.0,
+        learned: bool = False,
+        model_ttl: float = 3600.0,
+        model_sample: int = 50000,
+    ):
+        self.reload_interval = reload_interval
+        self.learned = learned
+        self.model_ttl = model_ttl
+        self.model_sample = model_sample
+        self._lock = threading.Lock()
+        self._taxonomy = DEFAULT_TAXONOMY
+        self._fingerprint = _fingerprint(DEFAULT_TAXONOMY)
+        self._scorer: Optional[TokenScorer] = None
+        self._classifier = CategoryClassifier(DEFAULT_TAXONOMY)
+        self._checked_at = float('-inf')
+        self._trained_at = float('-inf')
+
+    @property
+    def version(self) -> str:
+        return self._fingerprint
+
+    def current(self) -> CategoryClassifier:
+        return self._classifier
+
+    def invalidate(self) -> None:
+        """Force a reload on the next refresh (after taxonomy writes)"""
+        self._checked_at = float('-inf')
+
+    def _claim(self) -> Tuple[bool, bool]:
+        """Which reloads (taxonomy, model) are due, marking them as done now"""
+        with self._lock:
+            now = time.monotonic()
+            taxonomy_due = now - self._checked_at >= self.reload_interval
+            model_due = self.learned and now - self._trained_at >= self.model_ttl
+            if taxonomy_due:
+                self._checked_at = now
+            if model_due:
+                self._trained_at = now
+            return taxonomy_due, model_due
+
+    def _failed(self, error: PyMongoError) -> None:
+        # Keep classifying with what we have; the claim retries after the usual interval
+        logger.warning('Could not reload category taxonomy: %s', error)
+
+    def _install(
+        self, taxonomy: Optional[Dict[str, List[str]]], scorer: Optional[TokenScorer]
+    ) -> None:
+        with self._lock:
+            changed = False
+            if taxonomy is not None:
+                taxonomy = taxonomy or DEFAULT_TAXONOMY
+                fingerprint = _fingerprint(taxonomy)
+                if fingerprint != self._fingerprint:
+                    self._taxonomy, self._fingerprint, changed = (
+                        taxonomy,
+                        fingerprint,
+                        True,
+                    )
+            if scorer is not None:
+                self._scorer, changed = scorer, True
+            if changed:
+                self._classifier = CategoryClassifier(self._taxonomy, self._scorer)
+
+    def _samples_query(self) -> Tuple[dict, dict]:
+        return (
+            {'description': {'$type': 'string'}, 'category': {'$type': 'string'}},
+            {'description': 1, 'category': 1, '_id': 0},
+        )
+
+    def refresh(self, database: Database) -> CategoryClassifier:
+        """Reload from a pymongo database if due"""
+        taxonomy_due, model_due = self._claim()
+        taxonomy = scorer = None
+        try:
+            if taxonomy_due:
+                taxonomy = taxonomy_from_documents(database[COLLECTION].find({}))
+            if model_due:
+                query, projection = self._samples_query()
+                docs = (
+                    database.transactions.find(query, projection)
+                    .sort('_id', -1)
+                    .limit(self.model_sample)
+                )
+                scorer = TokenScorer.train(
+                    (d['description'], d['category']) for d in docs
+                )
+        except PyMongoError as e:
+            self._failed(e)
+            return self._classifier
+        self._install(taxonomy, scorer)
+        return self._classifier
+
+    async def refresh_async(self, database: Any) -> CategoryClassifier:
+        """Reload from a Motor database if due; training runs in the default executor"""
+        taxonomy_due, model_due = self._claim()
+        taxonomy = scorer = None
+        try:
+            if taxonomy_due:
+                taxonomy = taxonomy_from_documents(
+                    await database[COLLECTION].find({}).to_list(length=None)
+                )
+            if model_due:
+                query, projection = self._samples_query()
+                docs = (
+                    await database.transactions.find(query, projection)
+                    .sort('_id', -1)
+                    .limit(self.model_sample)
+                    .to_list(length=None)
+                )
+                samples = [(d['description'], d['category']) for d in docs]
+                scorer = await asyncio.get_running_loop().run_in_executor(
+                    None, TokenScorer.train, samples
+                )
+        except PyMongoError as e:
+            self._failed(e)
+            return self._classifier
+        self._install(taxonomy, scorer)
+        return self._classifier
+
+
+_registry: Optional[ClassifierRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_classifier_registry(
+    reload_interval: float = 30.0,
+    learned: bool = False,
+    model_ttl: float = 3600.0,
+    model_sample: int = 50000,
+) -> ClassifierRegistry:
+    """Get the process-wide classifier registry, creating it on first use"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ClassifierRegistry(
+                    reload_interval, learned, model_ttl, model_sample
+                )
+    return _registry
@@ -0,0 +1,133 @@
+import time
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+from PIL import Image
+
+# Re-exported; they live apart so configuring OCR does not load NumPy or PIL
+from app.services.ocr_settings import (
+    PIPELINE_DEFAULTS,
+    pipeline_fingerprint,
+    pipeline_settings,
+)  # noqa: F401
+
+# Deskew search runs on a subsampled copy with at most this many dark pixels
+_DESKEW_SIDE = 800
+_DESKEW_SAMPLE = 50_000
+
+
+def downscale(image: Image.Image, max_side: int) -> Image.Image:
+    if max_side and max(image.size) > max_side:
+        scale = max_side / max(image.size)
+        size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        image = image.resize(size, Image.Resampling.BILINEAR, reducing_gap=2.0)
+    return image
+
+
+def crop_to_paper(gray: np.ndarray, margin: int = 8) -> np.ndarray:
+    """Crop to the bright receipt region; unchanged if none stands out"""
+    bright = gray > gray.mean()
+    rows = np.flatnonzero(bright.mean(axis=1) > 0.5)
+    cols = np.flatnonzero(bright.mean(axis=0) > 0.5)
+    if rows.size == 0 or cols.size == 0:
+        return gray
+    top, bottom = max(rows[0] - margin, 0), min(rows[-1] + margin + 1, gray.shape[0])
+    left, right = max(cols[0] - margin, 0), min(cols[-1] + margin + 1, gray.shape[1])
+    # A tiny region is more likely noise than the receipt
+    if (bottom - top) * (right - left) < 0.2 * gray.size:
+        return gray
+    return gray[top:bottom, left:right]
+
+
+def _skew_score(ys: np.ndarray, xs: np.ndarray, angle: float) -> float:
+    shifted = np.rint(ys - xs * np.tan(np.radians(angle))).astype(np.int64)
+    counts = np.bincount(shifted - shifted.min())
+    return float(np.dot(counts, counts))
+
+
+def estimate_skew(gray: np.ndarray, max_skew: float) -> float:
+    """Skew angle in degrees that makes text rows most horizontal
+
+    Dark pixels are sheared by each candidate angle and binned by row; the
+    angle with the sharpest row profile (largest sum of squared counts) wins.
+    A 1 degree search is refined to 0.2 degrees around the best angle.
+    """
+    step = max(1, max(gray.shape) // _DESKEW_SIDE)
+    small = gray[::step, ::step]
+    ys, xs = np.nonzero(small < small.mean() * 0.75)
+    if ys.size < 100:
+        return 0.0
+    if ys.size > _DESKEW_SAMPLE:
+        pick = np.random.default_rng(0).choice(ys.size, _DESKEW_SAMPLE, replace=False)
+        ys, xs = ys[pick], xs[pick]
+    ys = ys.astype(np.float64)
+    xs = xs.astype(np.float64) - small.shape[1] / 2
+
+    coarse = np.arange(-max_skew, max_skew + 0.5, 1.0)
+    best = max(coarse, key=lambda angle: _skew_score(ys, xs, angle))
+    fine = np.arange(best - 0.8, best + 0.9, 0.2)
+    return round(float(max(fine, key=lambda angle: _skew_score(ys, xs, angle))), 1)
+
+
+def deskew(gray: np.ndarray, max_skew: float) -> np.ndarray:
+    angle = estimate_skew(gray, max_skew)
+    if abs(angle) < 0.3:
+        return gray
+    rotated = Image.fromarray(gray).rotate(
+        angle, resample=Image.Resampling.BILINEAR, expand=True, fillcolor=255
+    )
+    return np.asarray(rotated)
+
+
+def adaptive_threshold(gray: np.ndarray, block_size: int, offset: float) -> np.ndarray:
+    """Binarize against the mean of each pixel's block_size x block_size window"""
+    half = block_size // 2
+    b = 2 * half + 1
+    area = b * b
+    # Integral image in place; uint32 sums wrap, but window differences stay
+    # exact for images below 16M pixels
+    integral = np.pad(gray, half + 1, mode='edge').astype(np.uint32)
+    np.cumsum(integral, axis=0, out=integral)
+    np.cumsum(integral, axis=1, out=integral)
+    h, w = gray.shape
+    window = integral[b : b + h, b : b + w] - integral[:h, b : b + w]
+    window -= integral[b : b + h, :w]
+    window += integral[:h, :w]
+    # gray > mean - offset, in integers: gray * area + offset * area > window sum
+    limit = gray.astype(np.uint32) * area + int(offset * area)
+    return np.where(limit > window, 255, 0).astype(np.uint8)
+
+
+def preprocess(
+    image: Image.Image, settings: Optional[Dict[str, Any]] = None
+) -> Tuple[Image.Image, Dict[str, float]]:
+    """Run the preprocessing pipeline; return the binarized image and stage timings"""
+    settings = settings or PIPELINE_DEFAULTS
+    timings: Dict[str, float] = {}
+    clock = time.perf_counter()
+
+    def lap(stage: str) -> None:
+        nonlocal clock
+        now = time.perf_counter()
+        timings[stage] = round((now - clock) * 1000, 3)
+        clock = now
+
+    if image.format == 'JPEG' and settings['max_side']:
+        # Let the JPEG decoder drop resolution instead of resizing afterwards
+        image.draft('L', (settings['max_side'], settings['max_side']))
+    gray_image = image.convert('L')
+    lap('decode')
+    gray_image = downscale(gray_image, settings['max_side'])
+    gray = np.asarray(gray_image)
+    lap('downscale')
+    if settings['crop']:
+        gray = crop_to_paper(gray)
+        lap('crop')
+    if settings['deskew']:
+        gray = deskew(gray, settings['max_skew'])
+        lap('deskew')
+    if settings['threshold'] == 'adaptive':
+        binary = adaptive_threshold(gray, settings['block_size'], settings['offset'])
+    else:
+        binary = np.where(gray < settings['global_threshold'], 0, 255).astype(np.uint8)
+    lap('threshold')
+    return Image.fromarray(binary), timings
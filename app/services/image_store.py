@@ -0,0 +1,173 @@
+import base64
+import binascii
+import hashlib
+from datetime import datetime
+from typing import Any, Optional, Tuple
+from gridfs import GridFSBucket, GridOut
+from gridfs.errors import NoFile
+from pymongo.database import Database
+
+BUCKET_NAME = 'bill_images'
+
+# The only content types bill images are stored and served with; anything a
+# client declares beyond these (text/html, image/svg+xml, ...) could run
+# script on the app's origin, so the bytes are sniffed instead
+IMAGE_CONTENT_TYPES = frozenset(
+    (
+        'image/jpeg',
+        'image/png',
+        'image/gif',
+        'image/webp',
+        'image/tiff',
+        'application/pdf',
+    )
+)
+
+
+class InvalidImageError(ValueError):
+    """Raised for a bill image that is not valid base64; answer 400"""
+
+
+_SIGNATURES = (
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+    (b'%PDF', 'application/pdf'),
+    (b'II*\x00', 'image/tiff'),
+    (b'MM\x00*', 'image/tiff'),
+)
+
+
+def sniff_content_type(data: bytes) -> str:
+    """Guess the MIME type of an uploaded bill from its magic bytes"""
+    for signature, content_type in _SIGNATURES:
+        if data.startswith(signature):
+            return content_type
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'image/webp'
+    return 'application/octet-stream'
+
+
+def image_content_type(data: bytes, declared: Optional[str] = None) -> str:
+    """`declared` if it is an allowed bill image type, else the sniffed type"""
+    declared = (declared or '').strip().lower()
+    if declared in IMAGE_CONTENT_TYPES:
+        return declared
+    return sniff_content_type(data)
+
+
+def decode_data_url(image_data: str) -> Tuple[bytes, Optional[str]]:
+    """Decode a base64 string or data URL into (bytes, declared content type)
+
+    Raises InvalidImageError for anything but strict base64.
+    """
+    content_type = None
+    if ',' in image_data:
+        header, image_data = image_data.split(',', 1)
+        if header.startswith('data:'):
+            content_type = header[5:].split(';', 1)[0] or None
+    try:
+        return base64.b64decode(image_data.strip(), validate=True), content_type
+    except binascii.Error:
+        raise InvalidImageError('Image is not valid base64') from None
+
+
+def _touch(image_id: str) -> Tuple[dict, dict]:
+    """update_one arguments marking a stored image as just uploaded"""
+    return {'filename': image_id}, {'$currentDate': {'uploadDate': True}}
+
+
+class ImageStore:
+    """Content-addressed bill image storage in GridFS
+
+    Images are identified by the SHA-256 of their bytes, so the same receipt
+    uploaded twice is stored once. Transactions keep only that id in
+    `bill_image_id`.
+    """
+
+    def __init__(self, database: Database) -> None:
+        self.db = database
+        self.bucket = GridFSBucket(database, bucket_name=BUCKET_NAME)
+        self.files = database[f'{BUCKET_NAME}.files']
+
+    def put(self, data: bytes, content_type: Optional[str] = None) -> str:
+        image_id = hashlib.sha256(data).hexdigest()
+        # Reusing a stored image refreshes its uploadDate so sweep() keeps it
+        if self.files.update_one(*_touch(image_id)).matched_count == 0:
+            self.bucket.upload_from_stream(
+                image_id,
+                data,
+                metadata={'content_type': image_content_type(data, content_type)},
+            )
+        return image_id
+
+    def put_base64(self, image_data: str) -> str:
+        data, content_type = decode_data_url(image_data)
+        return self.put(data, content_type)
+
+    def open(self, image_id: str) -> Optional[GridOut]:
+        try:
+            return self.bucket.open_download_stream_by_name(image_id)
+        except NoFile:
+            return None
+
+    def sweep(self, uploaded_before: datetime, batch_size: int = 500) -> int:
+        """Delete images uploaded before `uploaded_before` no transaction references
+
+        Replacing or deleting a transaction's image leaves the blob behind,
+        since other transactions may share it. Recent uploads are skipped:
+        their transaction may not be written yet (put() refreshes
+        uploadDate when it reuses an image). Returns the number deleted.
+        """
+        deleted = 0
+        files = self.files.find(
+            {'uploadDate': {'$lt': uploaded_before}}, {'filename': 1}
+        )
+        batch = []
+        for file in files.batch_size(batch_size):
+            batch.append(file)
+            if len(batch) == batch_size:
+                deleted += self._delete_unreferenced(batch)
+                batch = []
+        if batch:
+            deleted += self._delete_unreferenced(batch)
+        return deleted
+
+    def _delete_unreferenced(self, files: list) -> int:
+        referenced = set(
+            self.db.transactions.distinct(
+                'bill_image_id',
+                {'bill_image_id': {'$in': [f['filename'] for f in files]}},
+            )
+        )
+        unreferenced = [f for f in files if f['filename'] not in referenced]
+        for file in unreferenced:
+            self.bucket.delete(file['_id'])
+        return len(unreferenced)
+
+
+class AsyncImageStore:
+    """ImageStore for Motor databases (FastAPI); same bucket and ids"""
+
+    def __init__(self, database: Any) -> None:
+        # Motor is only installed for the FastAPI app
+        from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+
+        self.db = database
+        self.bucket = AsyncIOMotorGridFSBucket(database, bucket_name=BUCKET_NAME)
+        self.files = database[f'{BUCKET_NAME}.files']
+
+    async def put(self, data: bytes, content_type: Optional[str] = None) -> str:
+        image_id = hashlib.sha256(data).hexdigest()
+        if (await self.files.update_one(*_touch(image_id))).matched_count == 0:
+            await self.bucket.upload_from_stream(
+                image_id,
+                data,
+                metadata={'content_type': image_content_type(data, content_type)},
+            )
+        return image_id
+
+    async def put_base64(self, image_data: str) -> str:
+        data, content_type = decode_data_url(image_data)
+        return await self.put(data, content_type)
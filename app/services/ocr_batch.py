@@ -0,0 +1,354 @@
+import asyncio
+import os
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from functools import partial
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    IO,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+from pymongo.database import Database
+from app.services.ocr_cache import OCRResultCache, cache_key
+from app.services.ocr_engine import OCREngine, OCRSaturatedError
+from app.services.ocr_service import ocr_settings_fingerprint
+from app.utils.serialization import dumps
+from app.utils.uploads import UploadTooLargeError, open_upload, read_upload
+
+ZIP_TYPES = ('application/zip', 'application/x-zip-compressed')
+IMAGE_EXTENSIONS = (
+    '.jpg',
+    '.jpeg',
+    '.png',
+    '.gif',
+    '.bmp',
+    '.tif',
+    '.tiff',
+    '.webp',
+    '.pdf',
+)
+
+# (name, loader) pairs; images are read only when their turn comes
+ImageSource = Tuple[str, Callable[[], bytes]]
+
+
+def is_zip(filename: Optional[str], mimetype: Optional[str]) -> bool:
+    return mimetype in ZIP_TYPES or (filename or '').lower().endswith('.zip')
+
+
+def _read_member(
+    archive: zipfile.ZipFile, info: zipfile.ZipInfo, max_bytes: int
+) -> bytes:
+    if info.file_size > max_bytes:
+        raise UploadTooLargeError(f'Image exceeds {max_bytes} bytes')
+    with archive.open(info) as member:
+        # The declared size is not trusted; never inflate past the limit
+        data = member.read(max_bytes + 1)
+    if len(data) > max_bytes:
+        raise UploadTooLargeError(f'Image exceeds {max_bytes} bytes')
+    return data
+
+
+def zip_images(stream: IO[bytes], max_bytes: int) -> List[ImageSource]:
+    """Image members of a zip archive in archive order; ValueError if it is not one"""
+    try:
+        archive = zipfile.ZipFile(stream)
+    except zipfile.BadZipFile:
+        raise ValueError('Not a valid zip archive') from None
+    sources: List[ImageSource] = []
+    for info in archive.infolist():
+        name = os.path.basename(info.filename)
+        if (
+            info.is_dir()
+            or name.startswith('.')
+            or info.filename.startswith('__MACOSX/')
+        ):
+            continue
+        if name.lower().endswith(IMAGE_EXTENSIONS):
+            sources.append(
+                (info.filename, partial(_read_member, archive, info, max_bytes))
+            )
+    return sources
+
+
+def _read_upload(stream: IO[bytes], max_bytes: int) -> bytes:
+    return read_upload(open_upload(stream, max_bytes))
+
+
+def batch_sources(
+    files: Iterable[Tuple[Optional[str], Optional[str], IO[bytes]]], max_bytes: int
+) -> List[ImageSource]:
+    """Images from uploaded (filename, mimetype, stream) files; zips are expanded"""
+    sources: List[ImageSource] = []
+    for index, (filename, mimetype, stream) in enumerate(files):
+        if is_zip(filename, mimetype):
+            sources.extend(zip_images(stream, max_bytes))
+        else:
+            name = filename or f'image-{index + 1}'
+            sources.append((name, partial(_read_upload, stream, max_bytes)))
+    return sources
+
+
+class BatchResults:
+    """NDJSON lines for one batch: a line per image, then a timing summary"""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.succeeded = 0
+        self.failed = 0
+        self.cached = 0
+        self._ocr_ms: List[float] = []
+        self._stage_totals: Dict[str, float] = {}
+
+    def ok(
+        self,
+        index: int,
+        name: str,
+        result: Dict[str, Any],
+        ms: float = 0.0,
+        timings: Optional[Dict[str, float]] = None,
+    ) -> bytes:
+        self.succeeded += 1
+        if timings is None:
+            self.cached += 1
+        else:
+            self._ocr_ms.append(ms)
+            for stage, stage_ms in timings.items():
+                self._stage_totals[stage] = (
+                    self._stage_totals.get(stage, 0.0) + stage_ms
+                )
+        line = {
+            'index': index,
+            'name': name,
+            'status': 'ok',
+            'cached': timings is None,
+            'ms': round(ms, 3),
+            **result,
+        }
+        return dumps(line) + b'\n'
+
+    def error(self, index: int, name: str, message: str) -> bytes:
+        self.failed += 1
+        return (
+            dumps({'index': index, 'name': name, 'status': 'error', 'error': message})
+            + b'\n'
+        )
+
+    def summary(self) -> bytes:
+        ordered = sorted(self._ocr_ms)
+        runs = len(ordered)
+        return (
+            dumps(
+                {
+                    'summary': {
+                        'images': self.succeeded + self.failed,
+                        'succeeded': self.succeeded,
+                        'failed': self.failed,
+                        'cached': self.cached,
+                        'wall_ms': round(
+                            (time.perf_counter() - self.started) * 1000, 3
+                        ),
+                        'ocr_ms': {
+                            'mean': round(sum(ordered) / runs, 3) if runs else 0.0,
+                            'p50': round(ordered[runs // 2], 3) if runs else 0.0,
+                            'max': round(ordered[-1], 3) if runs else 0.0,
+                        },
+                        'stage_ms': {
+                            stage: round(total / runs, 3)
+                            for stage, total in self._stage_totals.items()
+                        },
+                    }
+                }
+            )
+            + b'\n'
+        )
+
+
+def _image_error(error: BaseException) -> str:
+    return str(error) or type(error).__name__
+
+
+class _Pending:
+    __slots__ = ('index', 'name', 'key', 'submitted')
+
+    def __init__(self, index: int, name: str, key: str):
+        self.index = index
+        self.name = name
+        self.key = key
+        self.submitted = time.perf_counter()
+
+
+def _finished(
+    results: BatchResults,
+    job: _Pending,
+    future: Union[Future, asyncio.Future],
+    analyze: Callable[[str], Dict[str, Any]],
+) -> Tuple[bytes, Optional[Dict[str, Any]]]:
+    """Result line for a completed OCR future, plus the analysis to cache"""
+    ms = (time.perf_counter() - job.submitted) * 1000
+    if future.cancelled():
+        return results.error(job.index, job.name, 'OCR timed out'), None
+    error = future.exception()
+    if error is not None:
+        return results.error(job.index, job.name, _image_error(error)), None
+    text, timings = future.result()
+    if not text or not text.strip():
+        return (
+            results.error(job.index, job.name, 'Could not extract text from image'),
+            None,
+        )
+    result = analyze(text)
+    return results.ok(job.index, job.name, result, ms, timings), result
+
+
+def run_batch(
+    sources: List[ImageSource],
+    engine: OCREngine,
+    analyze: Callable[[str], Dict[str, Any]],
+    cache: OCRResultCache,
+    database: Optional[Database],
+    concurrency: int,
+    timeout: Optional[float] = None,
+) -> Iterator[bytes]:
+    """OCR `sources` with at most `concurrency` images in the engine at once
+
+    Yields an NDJSON line per image as soon as it finishes (so not in
+    upload order; each line carries its `index`), then a summary line.
+    Failures of single images become error lines. Cached images are
+    answered without OCR. A finished image frees its slot for the next one;
+    if none finishes within `timeout` seconds the ones still running fail.
+    """
+    results = BatchResults()
+    fingerprint = ocr_settings_fingerprint(engine.pipeline)
+    pending: Dict[Future, _Pending] = {}
+
+    def collect(block: bool = True) -> Iterator[bytes]:
+        done, _ = wait(
+            pending, timeout=timeout if block else 0, return_when=FIRST_COMPLETED
+        )
+        if block and not done:
+            done = set(pending)
+            for future in done:
+                future.cancel()
+        for future in done:
+            job = pending.pop(future)
+            if not future.done():
+                yield results.error(job.index, job.name, 'OCR timed out')
+                continue
+            line, result = _finished(results, job, future, analyze)
+            if result is not None:
+                cache.put(job.key, result, database)
+            yield line
+
+    for index, (name, read) in enumerate(sources):
+        try:
+            image = read()
+            key = cache_key(image, fingerprint)
+            cached = cache.get(key, database)
+        except Exception as e:
+            yield results.error(index, name, _image_error(e))
+            continue
+        if cached is not None:
+            yield results.ok(index, name, analyze(cached['extracted_text']))
+            continue
+
+        while True:
+            if len(pending) >= concurrency:
+                yield from collect()
+            try:
+                pending[engine.submit(image)] = _Pending(index, name, key)
+                break
+            except OCRSaturatedError as e:
+                # Other requests hold the engine; wait for one of ours to free a slot
+                if not pending:
+                    yield results.error(index, name, str(e))
+                    break
+                yield from collect()
+        yield from collect(block=False)
+
+    while pending:
+        yield from collect()
+    yield results.summary()
+
+
+async def run_batch_async(
+    sources: List[ImageSource],
+    engine: OCREngine,
+    analyze: Callable[[str], Dict[str, Any]],
+    cache: OCRResultCache,
+    database: Any,
+    concurrency: int,
+    timeout: Optional[float] = None,
+) -> AsyncIterator[bytes]:
+    """run_batch for the event loop (FastAPI); same lines and summary"""
+    results = BatchResults()
+    fingerprint = ocr_settings_fingerprint(engine.pipeline)
+    pending: Dict[asyncio.Future, Tuple[_Pending, Future]] = {}
+
+    async def collect(block: bool = True) -> List[bytes]:
+        done, _ = await asyncio.wait(
+            pending,
+            timeout=timeout if block else 0,
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        if block and not done:
+            done = set(pending)
+            for future, (_, submitted) in pending.items():
+                submitted.cancel()
+                future.cancel()
+        lines = []
+        for future in done:
+            job, _ = pending.pop(future)
+            line, result = _finished(results, job, future, analyze)
+            if result is not None:
+                await cache.put_async(job.key, result, database)
+            lines.append(line)
+        return lines
+
+    for index, (name, read) in enumerate(sources):
+        try:
+            # Reading may spool or inflate a zip member; keep it off the loop
+            image = await asyncio.to_thread(read)
+            key = cache_key(image, fingerprint)
+            cached = await cache.get_async(key, database)
+        except Exception as e:
+            yield results.error(index, name, _image_error(e))
+            continue
+        if cached is not None:
+            yield results.ok(index, name, analyze(cached['extracted_text']))
+            continue
+
+        while True:
+            if len(pending) >= concurrency:
+                for line in await collect():
+                    yield line
+            try:
+                submitted = engine.submit(image)
+                pending[asyncio.wrap_future(submitted)] = (
+                    _Pending(index, name, key),
+                    submitted,
+                )
+                break
+            except OCRSaturatedError as e:
+                if not pending:
+                    yield results.error(index, name, str(e))
+                    break
+                for line in await collect():
+                    yield line
+        if pending:
+            for line in await collect(block=False):
+                yield line
+
+    while pending:
+        for line in await collect():
+            yield line
+    yield results.summary()
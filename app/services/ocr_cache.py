@@ -0,0 +1,45 @@
+import hashlib
+import threading
+from typing import Optional
+from pymongo import ASCENDING
+from app.indexes import register_index
+from app.services.result_cache import ResultCache
+
+COLLECTION = 'ocr_cache'
+
+# Documents are removed by MongoDB once expires_at has passed
+register_index(
+    COLLECTION, [('expires_at', ASCENDING)], name='expires_at_ttl', expireAfterSeconds=0
+)
+
+
+def cache_key(image_bytes: bytes, settings_fingerprint: str) -> str:
+    """Key an OCR result by image content and the settings that produced it"""
+    digest = hashlib.sha256(image_bytes)
+    digest.update(b'\0')
+    digest.update(settings_fingerprint.encode())
+    return digest.hexdigest()
+
+
+class OCRResultCache(ResultCache):
+    """Cache of OCR analysis results; the shared tier is `ocr_cache`"""
+
+    collection = COLLECTION
+
+
+_cache: Optional[OCRResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_ocr_cache(
+    max_bytes: int = 16 * 1024 * 1024,
+    ttl_seconds: float = 30 * 24 * 3600,
+    persistent: bool = False,
+) -> OCRResultCache:
+    """Get the process-wide OCR result cache, creating it on first use"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = OCRResultCache(max_bytes, ttl_seconds, persistent)
+    return _cache
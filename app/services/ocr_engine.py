@@ -0,0 +1,213 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional, Tuple
+from app.metrics import observe_ocr_stages
+from app.services.ocr_settings import PIPELINE_DEFAULTS
+from app.services.ocr_service import ocr_image_timed
+
+
+class OCRSaturatedError(RuntimeError):
+    """Raised when the OCR queue is full; callers should answer 503"""
+
+
+class OCRError(RuntimeError):
+    """OCR failure raised from a worker process"""
+
+
+def _run_ocr(image_data: Any, pipeline: Dict[str, Any]) -> Tuple[str, Dict[str, float]]:
+    # Some library exceptions (e.g. TesseractNotFoundError) cannot be
+    # unpickled in the parent and would mark the whole pool as broken
+    try:
+        return ocr_image_timed(image_data, pipeline)
+    except Exception as e:
+        raise OCRError(str(e)) from None
+
+
+def _mp_context() -> multiprocessing.context.BaseContext:
+    # forkserver/spawn keep worker processes free of the parent's threads
+    # and sockets (pymongo pools, web server threads)
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context(
+        'forkserver' if 'forkserver' in methods else 'spawn'
+    )
+
+
+class OCREngine:
+    """Runs Tesseract in a bounded process pool with admission control
+
+    At most `max_workers` images are processed at once and at most
+    `max_queue` more may wait; further submissions raise OCRSaturatedError
+    instead of piling up behind a slow pool. Futures resolve to
+    (text, stage timings); average timings per stage are kept for stats().
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        max_queue: int,
+        job_ttl: float = 600.0,
+        pipeline: Optional[Dict[str, Any]] = None,
+    ):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.job_ttl = job_ttl
+        self.pipeline = pipeline or dict(PIPELINE_DEFAULTS)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._timed_runs = 0
+        self._stage_totals: Dict[str, float] = {}
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                self.max_workers, mp_context=_mp_context()
+            )
+        return self._executor
+
+    def _release(self, future: Future) -> None:
+        timings = None
+        if not future.cancelled() and future.exception() is None:
+            _, timings = future.result()
+        with self._lock:
+            self._inflight -= 1
+            if timings:
+                self._timed_runs += 1
+                for stage, ms in timings.items():
+                    self._stage_totals[stage] = self._stage_totals.get(stage, 0.0) + ms
+        if timings:
+            observe_ocr_stages(timings)
+
+    def submit(self, image_data: Any) -> Future:
+        """Queue an image for OCR; the future resolves to (text, timings)"""
+        with self._lock:
+            if self._inflight >= self.capacity:
+                raise OCRSaturatedError('OCR queue is full, retry later')
+            self._inflight += 1
+            try:
+                try:
+                    future = self._get_executor().submit(
+                        _run_ocr, image_data, self.pipeline
+                    )
+                except BrokenProcessPool:
+                    # A worker died (OOM, segfault); start a fresh pool
+                    self._executor = None
+                    future = self._get_executor().submit(
+                        _run_ocr, image_data, self.pipeline
+                    )
+            except Exception:
+                self._inflight -= 1
+                raise
+        future.add_done_callback(self._release)
+        return future
+
+    def extract_text(self, image_data: Any, timeout: Optional[float] = None) -> str:
+        """Blocking OCR for synchronous (WSGI) callers"""
+        text: str = self.submit(image_data).result(timeout)[0]
+        return text
+
+    async def extract_text_async(
+        self, image_data: Any, timeout: Optional[float] = None
+    ) -> str:
+        """OCR without blocking the event loop"""
+        future = asyncio.wrap_future(self.submit(image_data))
+        text: str = (await asyncio.wait_for(future, timeout))[0]
+        return text
+
+    def submit_job(self, image_data: Any) -> str:
+        """Queue an image and return a job id to poll with get_job"""
+        future = self.submit(image_data)
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._prune_jobs()
+            self._jobs[job_id] = {'future': future, 'created_at': time.monotonic()}
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[Future]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job['future'] if job else None
+
+    def _prune_jobs(self) -> None:
+        cutoff = time.monotonic() - self.job_ttl
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job['created_at'] < cutoff and job['future'].done()
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            runs = self._timed_runs
+            return {
+                'workers': self.max_workers,
+                'inflight': self._inflight,
+                'capacity': self.capacity,
+                'jobs': len(self._jobs),
+                'completed': runs,
+                'stage_ms': {
+                    stage: round(total / runs, 3)
+                    for stage, total in self._stage_totals.items()
+                },
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+
+_engine: Optional[OCREngine] = None
+_engine_lock = threading.Lock()
+
+
+def _reset_after_fork() -> None:
+    global _engine
+    _engine = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_ocr_engine(
+    max_workers: Optional[int] = None,
+    max_queue: int = 16,
+    job_ttl: float = 600.0,
+    pipeline: Optional[Dict[str, Any]] = None,
+) -> OCREngine:
+    """Get the process-wide OCR engine, creating it on first use"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = OCREngine(
+                    max_workers or os.cpu_count() or 1, max_queue, job_ttl, pipeline
+                )
+    return _engine
+
+
+def job_status(future: Future) -> Dict[str, Any]:
+    """Status dict for a job future; 'text' is set once it has finished"""
+    if not future.done():
+        return {'status': 'running' if future.running() else 'queued'}
+    if future.cancelled():
+        return {'status': 'failed', 'error': 'cancelled'}
+    error = future.exception()
+    if error is not None:
+        return {'status': 'failed', 'error': str(error)}
+    text, _ = future.result()
+    return {'status': 'done', 'text': text}
@@ -1,72 +1,105 @@
-import pytesseract
-from PIL import Image
 import io
-import base64
-import re
-from typing import Tuple, Optional
+import time
+from typing import TYPE_CHECKING, Any, Dict, Tuple, Optional, Union
 from app.database import get_db
+from app.services.image_store import decode_data_url
+from app.services.ocr_settings import PIPELINE_DEFAULTS, pipeline_fingerprint
+from app.services.receipt_parser import extract_fields
+from app.services.category_classifier import CategoryClassifier, get_classifier_registry
+
+# PIL, NumPy and pytesseract are imported on first use: web workers only
+# analyze text, the images are read in the OCR engine's processes
+if TYPE_CHECKING:
+    from PIL import Image
+
+# Everything that changes OCR output for the same image; part of cache keys
+TESSERACT_CONFIG = ''
+OCR_VERSION = 2
+
+
+def ocr_settings_fingerprint(pipeline: Optional[Dict[str, Any]] = None) -> str:
+    pipeline = pipeline or PIPELINE_DEFAULTS
+    return f'v{OCR_VERSION}:{pipeline_fingerprint(pipeline)}:config={TESSERACT_CONFIG}'
+
+
+def _open_image(image_data: Union[str, bytes]) -> 'Image.Image':
+    from PIL import Image
+
+    if isinstance(image_data, str):
+        image_data, _ = decode_data_url(image_data)
+    return Image.open(io.BytesIO(image_data))
+
+
+def preprocess_image(
+    image_data: Union[str, bytes], pipeline: Optional[Dict[str, Any]] = None
+) -> 'Image.Image':
+    """Preprocess the image for better OCR results"""
+    from app.services.image_pipeline import preprocess
+
+    image, _ = preprocess(_open_image(image_data), pipeline)
+    return image
+
+
+def ocr_image_timed(
+    image_data: Union[str, bytes], pipeline: Optional[Dict[str, Any]] = None
+) -> Tuple[str, Dict[str, float]]:
+    """OCR an image and return the text with per-stage timings in ms"""
+    import pytesseract
+    from app.services.image_pipeline import preprocess
+
+    image, timings = preprocess(_open_image(image_data), pipeline)
+    start = time.perf_counter()
+    text = pytesseract.image_to_string(image, config=TESSERACT_CONFIG)
+    timings['tesseract'] = round((time.perf_counter() - start) * 1000, 3)
+    return text, timings
+
+
+def ocr_image(
+    image_data: Union[str, bytes], pipeline: Optional[Dict[str, Any]] = None
+) -> str:
+    """Run OCR on an image (base64 text or raw bytes); raises on bad input
+
+    Module-level so it can be executed in OCR engine worker processes.
+    """
+    return ocr_image_timed(image_data, pipeline)[0]
+
 
 class OCRService:
-    def __init__(self):
-        self.db = get_db()
+    def __init__(
+        self, database: Any = None, classifier: Optional[CategoryClassifier] = None
+    ) -> None:
+        self.db = database if database is not None else get_db()
         self.collection = self.db.transactions
+        self.classifier = (
+            classifier
+            if classifier is not None
+            else get_classifier_registry().current()
+        )
 
-    def preprocess_image(self, image_data: str) -> Image.Image:
+    def preprocess_image(self, image_data: Union[str, bytes]) -> 'Image.Image':
         """Preprocess the image for better OCR results"""
-        if ',' in image_data:
-            image_data = image_data.split(',')[1]
-        
-        image_bytes = base64.b64decode(image_data)
-        image = Image.open(io.BytesIO(image_bytes))
-        
-        # Convert to grayscale and increase contrast
-        image = image.convert('L')
-        return image.point(lambda x: 0 if x < 128 else 255)
-
-    def extract_text(self, image_data: str) -> str:
-        """Extract text from image using OCR"""
-        try:
-            image = self.preprocess_image(image_data)
-            return pytesseract.image_to_string(image)
-        except Exception as e:
-            print(f"OCR Error: {str(e)}")
-            return ""
+        return preprocess_image(image_data)
 
     def extract_amount(self, text: str) -> Optional[float]:
         """Extract the total amount from the bill text"""
-        amount_patterns = [
-            r'total[\s:]*[\$]?\s*(\d+[.,]\d{2})',
-            r'amount[\s:]*[\$]?\s*(\d+[.,]\d{2})',
-            r'[\$]?\s*(\d+[.,]\d{2})\s*$'
-        ]
-        
-        for pattern in amount_patterns:
-            matches = re.finditer(pattern, text.lower())
-            amounts = [float(m.group(1).replace(',', '')) for m in matches]
-            if amounts:
-                return max(amounts)
-        return None
-
-    async def suggest_category(self, text: str) -> Tuple[str, float]:
-        """Suggest a category based on bill content"""
-        category_keywords = {
-            'Office Supplies': ['paper', 'pen', 'stapler', 'ink', 'toner'],
-            'Travel': ['taxi', 'uber', 'flight', 'hotel', 'train'],
-            'Meals': ['restaurant', 'food', 'lunch', 'dinner', 'cafe'],
-            'Utilities': ['electricity', 'water', 'internet', 'phone'],
-            'Equipment': ['computer', 'laptop', 'monitor', 'keyboard'],
-        }
-
-        text_lower = text.lower()
-        scores = {}
-        
-        for category, keywords in category_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in text_lower)
-            if score > 0:
-                scores[category] = score / len(keywords)
+        total: Optional[float] = extract_fields(text)['total']
+        return total
 
-        if not scores:
-            return "Miscellaneous", 0.0
+    def suggest_category(self, text: str) -> Tuple[str, float]:
+        """Suggest a category based on bill content"""
+        return self.classifier.classify(text)
 
-        best_category = max(scores.items(), key=lambda x: x[1])
-        return best_category
\ No newline at end of file
+    def analyze_text(self, text: str) -> Dict[str, Any]:
+        """Build the analyze-bill response for extracted text"""
+        category, confidence = self.suggest_category(text)
+        fields = extract_fields(text)
+        return {
+            'extracted_text': text,
+            'suggested_category': category,
+            'confidence': confidence,
+            'suggested_amount': fields['total'],
+            'suggested_tax': fields['tax'],
+            'suggested_date': fields['date'],
+            'suggested_vendor': fields['vendor'],
+            'currency': fields['currency'],
+        }
@@ -0,0 +1,28 @@
+"""OCR preprocessing settings, importable without NumPy or PIL"""
+
+from typing import Any, Dict
+
+# Everything here changes OCR output, so it is part of the OCR cache key
+PIPELINE_DEFAULTS: Dict[str, Any] = {
+    'max_side': 2000,  # longest side in pixels after downscaling; 0 keeps full size
+    'threshold': 'adaptive',  # 'adaptive' (local mean) or 'global'
+    'global_threshold': 128,
+    'block_size': 31,  # adaptive window, pixels
+    'offset': 10,  # adaptive: how much darker than the local mean is ink
+    'deskew': True,
+    'max_skew': 10.0,  # degrees searched either way
+    'crop': True,
+}
+
+
+def pipeline_settings(**overrides: Any) -> Dict[str, Any]:
+    """PIPELINE_DEFAULTS with the given (non-None) overrides applied"""
+    settings = dict(PIPELINE_DEFAULTS)
+    settings.update(
+        {key: value for key, value in overrides.items() if value is not None}
+    )
+    return settings
+
+
+def pipeline_fingerprint(settings: Dict[str, Any]) -> str:
+    return ','.join(f'{key}={settings[key]}' for key in sorted(settings))
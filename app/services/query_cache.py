@@ -0,0 +1,110 @@
+import hashlib
+import json
+import threading
+from typing import Any, Dict, Optional
+from bson import ObjectId
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.database import Database
+from app.indexes import register_index
+from app.services.result_cache import ResultCache
+
+COLLECTION = 'query_cache'
+VERSIONS = 'collection_versions'
+
+register_index(
+    COLLECTION, [('expires_at', ASCENDING)], name='expires_at_ttl', expireAfterSeconds=0
+)
+
+
+def _version_token(doc: Dict[str, Any]) -> str:
+    # The epoch changes when the counter document is recreated (e.g. the
+    # database was dropped or restored), so old keys never match again
+    return f"{doc['epoch']}.{doc['version']}"
+
+
+def _bump_update() -> Dict[str, Any]:
+    return {'$inc': {'version': 1}, '$setOnInsert': {'epoch': str(ObjectId())}}
+
+
+def _init_update() -> Dict[str, Any]:
+    return {'$setOnInsert': {'epoch': str(ObjectId()), 'version': 0}}
+
+
+def get_version(database: Database, collection: str) -> str:
+    """Current version token of a collection's contents (pymongo)"""
+    doc = database[VERSIONS].find_one({'_id': collection})
+    if doc is None:
+        doc = database[VERSIONS].find_one_and_update(
+            {'_id': collection},
+            _init_update(),
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+    return _version_token(doc)
+
+
+def bump_version(database: Database, collection: str) -> None:
+    """Mark a collection as changed; call after every write to it"""
+    database[VERSIONS].update_one({'_id': collection}, _bump_update(), upsert=True)
+
+
+async def get_version_async(database: Any, collection: str) -> str:
+    """get_version() for Motor databases"""
+    doc = await database[VERSIONS].find_one({'_id': collection})
+    if doc is None:
+        doc = await database[VERSIONS].find_one_and_update(
+            {'_id': collection},
+            _init_update(),
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+    return _version_token(doc)
+
+
+async def bump_version_async(database: Any, collection: str) -> None:
+    """bump_version() for Motor databases"""
+    await database[VERSIONS].update_one(
+        {'_id': collection}, _bump_update(), upsert=True
+    )
+
+
+def query_key(kind: str, version: str, params: Dict[str, Any]) -> str:
+    """Key a query result by its kind, the data version and canonical params
+
+    Params are serialized with sorted keys, so the same filters given in a
+    different order (or parsed from a differently ordered query string)
+    share an entry.
+    """
+    canonical = json.dumps(params, sort_keys=True, separators=(',', ':'), default=str)
+    digest = hashlib.sha256(canonical.encode()).hexdigest()
+    return f'{kind}:{version}:{digest}'
+
+
+class QueryResultCache(ResultCache):
+    """Cache of transaction list and balance results
+
+    Keys include the `collection_versions` token of the data they were read
+    from, so a write anywhere (any worker, either app) makes every earlier
+    entry unreachable; stale entries then age out of the LRU and the TTL
+    collection. The optional shared tier is the `query_cache` collection.
+    """
+
+    collection = COLLECTION
+
+
+_cache: Optional[QueryResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_query_cache(
+    max_bytes: int = 32 * 1024 * 1024,
+    ttl_seconds: float = 600,
+    persistent: bool = False,
+) -> QueryResultCache:
+    """Get the process-wide query result cache, creating it on first use"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = QueryResultCache(max_bytes, ttl_seconds, persistent)
+    return _cache
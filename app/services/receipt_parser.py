@@ -0,0 +1,197 @@
+import re
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+CURRENCY_SYMBOLS = {'$': 'USD', '€': 'EUR', '£': 'GBP', '₹': 'INR'}
+CURRENCY_CODES = ('USD', 'EUR', 'GBP', 'INR', 'CAD', 'AUD')
+# Receipts in these currencies write ambiguous numeric dates day-first
+DAY_FIRST_CURRENCIES = frozenset(('EUR', 'GBP', 'INR', 'AUD'))
+
+# Lines scanned from the top for the vendor name, skipping generic headers
+VENDOR_LINES = 5
+HEADER_LINES = {'receipt', 'sales receipt', 'invoice', 'customer copy', 'welcome'}
+
+_MONTHS = {
+    m: i
+    for i, m in enumerate(
+        (
+            'jan',
+            'feb',
+            'mar',
+            'apr',
+            'may',
+            'jun',
+            'jul',
+            'aug',
+            'sep',
+            'oct',
+            'nov',
+            'dec',
+        ),
+        1,
+    )
+}
+_MONTH = r'(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?'
+
+_LABELS = {
+    'grand total': 'total',
+    'total': 'total',
+    'amount due': 'total',
+    'balance due': 'total',
+    'subtotal': 'subtotal',
+    'amount': 'amount',
+    'tax': 'tax',
+    'taxes': 'tax',
+    'vat': 'tax',
+    'gst': 'tax',
+    'hst': 'tax',
+    'sales tax': 'tax',
+}
+
+# Every token the extractor cares about, matched in one left-to-right pass.
+# Dates come before money so '12.03.2024' is not read as an amount.
+_TOKENS = re.compile(
+    r'(?P<nl>\n)'
+    r'|(?P<iso>\b(?P<iy>\d{4})-(?P<im>\d{1,2})-(?P<id>\d{1,2})\b)'
+    r'|(?P<num_date>\b(?P<a>\d{1,2})[/.-](?P<b>\d{1,2})[/.-](?P<y>\d{4}|\d{2})\b)'
+    r'|(?P<dmy>\b(?P<dd>\d{1,2})\s+(?P<dm>' + _MONTH + r')\s+(?P<dy>\d{4})\b)'
+    r'|(?P<mdy>\b(?P<mm>' + _MONTH + r')\s+(?P<md>\d{1,2}),?\s+(?P<my>\d{4})\b)'
+    r'|(?P<money>(?P<sym>[$€£₹])?\s?'
+    r'(?P<value>\d{1,3}(?:[,.]\d{3})+[.,]\d{2}|\d+[.,]\d{2})(?![\d.,]*\d))'
+    r'|\b(?P<label>grand\s+total|sub\s*-?\s*total|total|amount\s+due|balance\s+due'
+    r'|amount|sales\s+tax|taxes|tax|vat|gst|hst)\b'
+    r'|\b(?P<code>' + '|'.join(CURRENCY_CODES) + r')\b'
+    r'|(?P<symbol>[$€£₹])',
+    re.IGNORECASE,
+)
+_LETTERS = re.compile(r'[^\W\d_]{2,}')
+
+
+def parse_amount(value: str) -> float:
+    """'1,234.56', '1.234,56' and '12,50' -> float; the last separator is decimal"""
+    whole, fraction = value[:-3], value[-2:]
+    return float(re.sub(r'[,.]', '', whole) + '.' + fraction)
+
+
+def _label_kind(label: str) -> str:
+    key = re.sub(r'\s+', ' ', label.lower())
+    if key.startswith('sub'):
+        return 'subtotal'
+    return _LABELS[key]
+
+
+def _make_date(year: int, month: int, day: int) -> Optional[str]:
+    if year < 100:
+        year += 2000
+    try:
+        return date(year, month, day).isoformat()
+    except ValueError:
+        return None
+
+
+def _token_date(match: re.Match, day_first: bool = False) -> Optional[str]:
+    if match.group('iso'):
+        return _make_date(
+            int(match.group('iy')), int(match.group('im')), int(match.group('id'))
+        )
+    if match.group('num_date'):
+        a, b, year = int(match.group('a')), int(match.group('b')), int(match.group('y'))
+        # Only one order is valid when a part exceeds 12; otherwise `day_first` decides
+        if day_first:
+            return _make_date(year, b, a) or _make_date(year, a, b)
+        return _make_date(year, a, b) or _make_date(year, b, a)
+    if match.group('dmy'):
+        month = _MONTHS[match.group('dm')[:3].lower()]
+        return _make_date(int(match.group('dy')), month, int(match.group('dd')))
+    month = _MONTHS[match.group('mm')[:3].lower()]
+    return _make_date(int(match.group('my')), month, int(match.group('md')))
+
+
+class _Line:
+    __slots__ = ('start', 'end', 'kind', 'amounts', 'tokens', 'money_end')
+
+    def __init__(self, start: int):
+        self.start = start
+        self.end = start
+        self.kind: Optional[str] = None
+        self.amounts: List[float] = []
+        self.tokens = 0
+        self.money_end = start
+
+
+def extract_fields(text: str) -> Dict[str, Any]:
+    """Extract total, tax, date, vendor and currency from receipt text
+
+    A single scan with one compiled pattern classifies every line by its
+    first label (total, subtotal, amount, tax) and collects its amounts.
+    The total is the largest amount on a total line, then on an amount line,
+    then the largest amount ending any line. Ambiguous numeric dates such as
+    05-06-2024 are read day-first when the currency is in
+    DAY_FIRST_CURRENCIES, otherwise month-first.
+    """
+    lines = [_Line(0)]
+    date_match = currency = None
+
+    for match in _TOKENS.finditer(text):
+        line = lines[-1]
+        kind = match.lastgroup
+        if kind == 'nl':
+            line.end = match.start()
+            lines.append(_Line(match.end()))
+            continue
+        line.tokens += 1
+        if kind == 'money':
+            line.amounts.append(parse_amount(match.group('value')))
+            line.money_end = match.end()
+            if currency is None and match.group('sym'):
+                currency = CURRENCY_SYMBOLS[match.group('sym')]
+        elif kind == 'label':
+            if line.kind is None:
+                line.kind = _label_kind(match.group('label'))
+        elif kind == 'code':
+            currency = currency or match.group('code').upper()
+        elif kind == 'symbol':
+            currency = currency or CURRENCY_SYMBOLS[match.group('symbol')]
+        elif date_match is None and _token_date(match) is not None:
+            date_match = match
+    lines[-1].end = len(text)
+    found_date = (
+        _token_date(date_match, currency in DAY_FIRST_CURRENCIES)
+        if date_match
+        else None
+    )
+
+    def largest(kind: str) -> Optional[float]:
+        amounts = [a for line in lines if line.kind == kind for a in line.amounts]
+        return max(amounts) if amounts else None
+
+    total = largest('total')
+    if total is None:
+        total = largest('amount')
+    if total is None:
+        trailing = [
+            line.amounts[-1]
+            for line in lines
+            if line.amounts and not text[line.money_end : line.end].strip()
+        ]
+        total = max(trailing) if trailing else None
+
+    tax = next(
+        (line.amounts[0] for line in lines if line.kind == 'tax' and line.amounts), None
+    )
+
+    vendor = None
+    for line in lines[:VENDOR_LINES]:
+        candidate = text[line.start : line.end].strip()
+        words = ' '.join(_LETTERS.findall(candidate)).lower()
+        if not line.tokens and words and words not in HEADER_LINES:
+            vendor = candidate
+            break
+
+    return {
+        'total': total,
+        'tax': tax,
+        'date': found_date,
+        'vendor': vendor,
+        'currency': currency,
+    }
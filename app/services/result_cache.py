@@ -0,0 +1,143 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+from pymongo.database import Database
+from app.utils.serialization import dumps
+
+# Rough per-entry bookkeeping cost added to the serialized result size
+ENTRY_OVERHEAD = 256
+
+
+def _entry_size(result: Any) -> int:
+    return len(dumps(result)) + ENTRY_OVERHEAD
+
+
+class ResultCache:
+    """Two-tier cache of JSON-like results
+
+    Tier one is an in-process LRU bounded by the approximate size of the
+    cached results; tier two (optional) is a MongoDB collection, shared by
+    all workers, whose documents expire through a TTL index on
+    `expires_at`. Persistent hits are promoted into the LRU. Cached values
+    are returned as-is, so callers must not mutate them.
+    """
+
+    collection: str
+
+    def __init__(self, max_bytes: int, ttl_seconds: float, persistent: bool = False):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.persistent = persistent
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, Any]' = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._bytes = 0
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _get_memory(self, key: str) -> Optional[Any]:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+            return result
+
+    def _put_memory(self, key: str, result: Any) -> None:
+        size = _entry_size(result)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._sizes[key]
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            self._sizes[key] = size
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                old_key, _ = self._entries.popitem(last=False)
+                self._bytes -= self._sizes.pop(old_key)
+                self.evictions += 1
+
+    def _record_miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+
+    def _record_persistent_hit(self) -> None:
+        with self._lock:
+            self.persistent_hits += 1
+
+    def _document(self, key: str, result: Any) -> Dict[str, Any]:
+        now = datetime.now(timezone.utc)
+        return {
+            '_id': key,
+            'result': result,
+            'created_at': now,
+            'expires_at': now + timedelta(seconds=self.ttl_seconds),
+        }
+
+    def get(self, key: str, database: Optional[Database] = None) -> Optional[Any]:
+        result = self._get_memory(key)
+        if result is not None:
+            return result
+        if self.persistent and database is not None:
+            doc = database[self.collection].find_one({'_id': key}, {'result': 1})
+            if doc:
+                self._record_persistent_hit()
+                self._put_memory(key, doc['result'])
+                return doc['result']
+        self._record_miss()
+        return None
+
+    def put(self, key: str, result: Any, database: Optional[Database] = None) -> None:
+        self._put_memory(key, result)
+        if self.persistent and database is not None:
+            database[self.collection].replace_one(
+                {'_id': key}, self._document(key, result), upsert=True
+            )
+
+    async def get_async(self, key: str, database: Any = None) -> Optional[Any]:
+        """get() for Motor databases"""
+        result = self._get_memory(key)
+        if result is not None:
+            return result
+        if self.persistent and database is not None:
+            doc = await database[self.collection].find_one({'_id': key}, {'result': 1})
+            if doc:
+                self._record_persistent_hit()
+                self._put_memory(key, doc['result'])
+                return doc['result']
+        self._record_miss()
+        return None
+
+    async def put_async(self, key: str, result: Any, database: Any = None) -> None:
+        """put() for Motor databases"""
+        self._put_memory(key, result)
+        if self.persistent and database is not None:
+            await database[self.collection].replace_one(
+                {'_id': key}, self._document(key, result), upsert=True
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.memory_hits + self.persistent_hits + self.misses
+            hits = self.memory_hits + self.persistent_hits
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'memory_hits': self.memory_hits,
+                'persistent_hits': self.persistent_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,302 @@
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from pymongo import UpdateOne
+from pymongo.database import Database
+
+COLLECTION = 'rollups'
+
+# Dimensions a rollup row is keyed by (besides the day) and reports can group by
+DIMENSIONS = ('category', 'project', 'person', 'type')
+GRANULARITIES = ('day', 'week', 'month')
+
+# Upserts per bulk_write (and stale rows per delete) when backfilling
+REBUILD_BATCH_SIZE = 1000
+
+RollupKey = Tuple[datetime, Optional[str], Optional[str], Optional[str], Optional[str]]
+
+
+def _day(value: Any) -> Optional[datetime]:
+    """Midnight (naive UTC) of a transaction date; None when it has no usable date"""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return datetime.combine(value.date(), time())
+    if isinstance(value, date):
+        return datetime.combine(value, time())
+    return None
+
+
+def period_starts(day: datetime) -> Dict[str, datetime]:
+    """Start of the day, ISO week (Monday) and month containing `day`"""
+    return {
+        'day': day,
+        'week': day - timedelta(days=day.weekday()),
+        'month': day.replace(day=1),
+    }
+
+
+def _key(transaction: Optional[dict]) -> Optional[RollupKey]:
+    if not transaction:
+        return None
+    day = _day(transaction.get('date'))
+    if day is None:
+        return None
+    category, project, person, type_ = (transaction.get(d) for d in DIMENSIONS)
+    return day, category, project, person, type_
+
+
+def _deltas(
+    changes: Iterable[Tuple[Optional[dict], int]],
+) -> Dict[RollupKey, List[float]]:
+    deltas: Dict[RollupKey, List[float]] = {}
+    for transaction, sign in changes:
+        key = _key(transaction)
+        if transaction is not None and key is not None:
+            delta = deltas.setdefault(key, [0.0, 0])
+            delta[0] += sign * float(transaction.get('amount') or 0)
+            delta[1] += sign
+    return deltas
+
+
+def _operations(
+    deltas: Dict[RollupKey, List[float]], replace: bool = False
+) -> List[UpdateOne]:
+    """Upserts adding `deltas` to the rollup rows (or, with `replace`, setting them)"""
+    operations = []
+    for (day, *dimensions), (amount, count) in deltas.items():
+        if not (amount or count):
+            # An update that keeps day and dimensions only touched other fields
+            continue
+        periods = period_starts(day)
+        weeks = {'week': periods['week'], 'month': periods['month']}
+        totals = {'amount': amount, 'count': count}
+        operations.append(
+            UpdateOne(
+                {'day': day, **dict(zip(DIMENSIONS, dimensions))},
+                (
+                    {'$set': {**totals, **weeks}}
+                    if replace
+                    else {'$inc': totals, '$setOnInsert': weeks}
+                ),
+                upsert=True,
+            )
+        )
+    return operations
+
+
+def _day_range(
+    start: Optional[datetime], end: Optional[datetime]
+) -> Dict[str, datetime]:
+    """`day` bounds covering the days from `start` through `end`, inclusive"""
+    bounds = {}
+    for operator, value in (('$gte', _day(start)), ('$lte', _day(end))):
+        if value is not None:
+            bounds[operator] = value
+    return bounds
+
+
+def report_pipeline(
+    group_by: Sequence[str] = (),
+    granularity: str = 'month',
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    filters: Optional[Dict[str, str]] = None,
+) -> List[dict]:
+    """Aggregation over the rollups; raises ValueError for unknown options"""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+    unknown = [d for d in list(group_by) + list(filters or {}) if d not in DIMENSIONS]
+    if unknown:
+        raise ValueError(
+            f"Unknown dimension(s): {', '.join(unknown)}; "
+            f"use {', '.join(DIMENSIONS)}"
+        )
+
+    match: Dict[str, Any] = dict(filters or {})
+    days = _day_range(start, end)
+    if days:
+        match['day'] = days
+
+    def sum_type(type_: str) -> dict:
+        return {'$sum': {'$cond': [{'$eq': ['$type', type_]}, '$amount', 0]}}
+
+    return [
+        {'$match': match},
+        {
+            '$group': {
+                '_id': {'period': f'${granularity}', **{d: f'${d}' for d in group_by}},
+                'amount': {'$sum': '$amount'},
+                'receipts': sum_type('receipt'),
+                'expenses': sum_type('expense'),
+                'count': {'$sum': '$count'},
+            }
+        },
+        # Rows emptied by deletes stay behind with a zero count
+        {'$match': {'count': {'$gt': 0}}},
+    ]
+
+
+def _report_rows(docs: Iterable[dict], group_by: Sequence[str]) -> List[dict]:
+    rows = []
+    for doc in docs:
+        row = {'period': doc['_id']['period'].date().isoformat()}
+        row.update({dimension: doc['_id'].get(dimension) for dimension in group_by})
+        row.update(
+            {
+                'amount': round(doc['amount'], 2),
+                'receipts': round(doc['receipts'], 2),
+                'expenses': round(doc['expenses'], 2),
+                'net': round(doc['receipts'] - doc['expenses'], 2),
+                'count': doc['count'],
+            }
+        )
+        rows.append(row)
+    rows.sort(key=lambda row: [row['period']] + [row[d] or '' for d in group_by])
+    return rows
+
+
+class PeriodRollups:
+    """Daily transaction totals kept in the `rollups` collection
+
+    One document per day × category × project × person × type holds the
+    summed amount and transaction count, adjusted with $inc deltas on every
+    transaction write like the balances ledger. Documents also carry the
+    start of their week and month, so reports over any range aggregate a
+    few rollup rows per period instead of scanning transactions.
+    """
+
+    def __init__(self, database: Database) -> None:
+        self.db = database
+        self.collection = database[COLLECTION]
+
+    def apply(self, old: Optional[dict], new: Optional[dict]) -> None:
+        """Move the rollups from the `old` version of a transaction to `new`"""
+        self._write(_deltas(((old, -1), (new, 1))))
+
+    def apply_many(self, transactions: Iterable[dict]) -> None:
+        """Add many new transactions with one write per rollup row"""
+        self._write(_deltas((transaction, 1) for transaction in transactions))
+
+    def apply_changes(
+        self, changes: Iterable[Tuple[Optional[dict], Optional[dict]]]
+    ) -> None:
+        """Apply many (old, new) transaction pairs with one write per row"""
+        self._write(
+            _deltas(change for old, new in changes for change in ((old, -1), (new, 1)))
+        )
+
+    def _write(self, deltas: Dict[RollupKey, List[float]]) -> None:
+        operations = _operations(deltas)
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+
+    def report(
+        self,
+        group_by: Sequence[str] = (),
+        granularity: str = 'month',
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        filters: Optional[Dict[str, str]] = None,
+    ) -> List[dict]:
+        """Totals per period (and per `group_by` dimension) between start and end"""
+        pipeline = report_pipeline(group_by, granularity, start, end, filters)
+        return _report_rows(self.collection.aggregate(pipeline), group_by)
+
+    def rebuild(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        batch_size: int = REBUILD_BATCH_SIZE,
+    ) -> int:
+        """Recompute the rollups for the days from start through end
+
+        Without bounds every rollup is rebuilt. Transactions in the range
+        are streamed and summed in memory (one entry per rollup row), then
+        written over the stored rows in batches; only rows left without
+        transactions are deleted afterwards, so reports never see the range
+        empty. Writes made while it runs can be overwritten: stop them for
+        an exact result. Returns the number of transactions read.
+        """
+        days = _day_range(start, end)
+        query: Dict[str, Any] = {}
+        if days:
+            query['date'] = {}
+            if '$gte' in days:
+                query['date']['$gte'] = days['$gte']
+            if '$lte' in days:
+                query['date']['$lt'] = days['$lte'] + timedelta(days=1)
+
+        projection = {'_id': 0, 'date': 1, 'amount': 1, **{d: 1 for d in DIMENSIONS}}
+        read = 0
+
+        def transactions() -> Iterable[Tuple[dict, int]]:
+            nonlocal read
+            for transaction in self.db.transactions.find(query, projection).batch_size(
+                batch_size
+            ):
+                read += 1
+                yield transaction, 1
+
+        deltas = _deltas(transactions())
+        operations = _operations(deltas, replace=True)
+        for offset in range(0, len(operations), batch_size):
+            self.collection.bulk_write(
+                operations[offset : offset + batch_size], ordered=False
+            )
+
+        stale = []
+        rows = self.collection.find(
+            {'day': days} if days else {}, {'day': 1, **{d: 1 for d in DIMENSIONS}}
+        )
+        for row in rows.batch_size(batch_size):
+            if (row['day'],) + tuple(row.get(d) for d in DIMENSIONS) not in deltas:
+                stale.append(row['_id'])
+            if len(stale) == batch_size:
+                self.collection.delete_many({'_id': {'$in': stale}})
+                stale = []
+        if stale:
+            self.collection.delete_many({'_id': {'$in': stale}})
+        return read
+
+
+class AsyncPeriodRollups:
+    """PeriodRollups for Motor databases (FastAPI); same documents and deltas"""
+
+    def __init__(self, database: Any) -> None:
+        self.db = database
+        self.collection = database[COLLECTION]
+
+    async def apply(self, old: Optional[dict], new: Optional[dict]) -> None:
+        await self._write(_deltas(((old, -1), (new, 1))))
+
+    async def apply_many(self, transactions: Iterable[dict]) -> None:
+        await self._write(_deltas((transaction, 1) for transaction in transactions))
+
+    async def apply_changes(
+        self, changes: Iterable[Tuple[Optional[dict], Optional[dict]]]
+    ) -> None:
+        await self._write(
+            _deltas(change for old, new in changes for change in ((old, -1), (new, 1)))
+        )
+
+    async def _write(self, deltas: Dict[RollupKey, List[float]]) -> None:
+        operations = _operations(deltas)
+        if operations:
+            await self.collection.bulk_write(operations, ordered=False)
+
+    async def report(
+        self,
+        group_by: Sequence[str] = (),
+        granularity: str = 'month',
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        filters: Optional[Dict[str, str]] = None,
+    ) -> List[dict]:
+        pipeline = report_pipeline(group_by, granularity, start, end, filters)
+        docs = await self.collection.aggregate(pipeline).to_list(length=None)
+        return _report_rows(docs, group_by)
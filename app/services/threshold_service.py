@@ -1,29 +1,139 @@
-from typing import Optional
+import time
+from typing import Any, Dict, List, Optional
+from pymongo import ASCENDING
+from app.indexes import register_index
 from app.models.thresholds import BalanceThreshold, ThresholdUpdate
 
+DEFAULT_LOW = BalanceThreshold.model_fields['low_threshold'].default
+DEFAULT_MEDIUM = BalanceThreshold.model_fields['medium_threshold'].default
+
+# One threshold document per person (upsert key, $lookup target)
+register_index('thresholds', [('person', ASCENDING)], name='person', unique=True)
+
+
+def status_pipeline() -> List[dict]:
+    """Balances joined with thresholds (or the defaults) and a status per person
+
+    Matches the frontend's rule: below `low` is low, below `medium` is
+    medium, anything else is good.
+    """
+    return [
+        {
+            '$lookup': {
+                'from': 'thresholds',
+                'localField': '_id',
+                'foreignField': 'person',
+                'as': 'threshold',
+            }
+        },
+        {'$unwind': {'path': '$threshold', 'preserveNullAndEmptyArrays': True}},
+        {
+            '$project': {
+                '_id': 0,
+                'person': '$_id',
+                'receipts': 1,
+                'expenses': 1,
+                'balance': 1,
+                'thresholds': {
+                    'low': {'$ifNull': ['$threshold.low_threshold', DEFAULT_LOW]},
+                    'medium': {
+                        '$ifNull': ['$threshold.medium_threshold', DEFAULT_MEDIUM]
+                    },
+                },
+            }
+        },
+        {
+            '$addFields': {
+                'status': {
+                    '$switch': {
+                        'branches': [
+                            {
+                                'case': {'$lt': ['$balance', '$thresholds.low']},
+                                'then': 'low',
+                            },
+                            {
+                                'case': {'$lt': ['$balance', '$thresholds.medium']},
+                                'then': 'medium',
+                            },
+                        ],
+                        'default': 'good',
+                    }
+                }
+            }
+        },
+        {'$sort': {'person': 1}},
+    ]
+
+
+class ThresholdCache:
+    """Every person's threshold document, held in memory
+
+    The whole (small) `thresholds` collection is loaded in one query and
+    reloaded after `ttl` seconds, or on the next lookup after this worker
+    writes a threshold.
+    """
+
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = ttl
+        self._thresholds: Dict[str, BalanceThreshold] = {}
+        self._loaded_at = float('-inf')
+
+    def invalidate(self) -> None:
+        self._loaded_at = float('-inf')
+
+    async def get(self, database: Any, person: str) -> Optional[BalanceThreshold]:
+        if time.monotonic() - self._loaded_at >= self.ttl:
+            docs = await database.thresholds.find({}, {'_id': 0}).to_list(length=None)
+            self._thresholds = {doc['person']: BalanceThreshold(**doc) for doc in docs}
+            self._loaded_at = time.monotonic()
+        return self._thresholds.get(person)
+
+
+_cache: Optional[ThresholdCache] = None
+
+
+def get_threshold_cache(ttl: float = 60.0) -> ThresholdCache:
+    """Get the process-wide threshold cache (used from the event loop only)"""
+    global _cache
+    if _cache is None:
+        _cache = ThresholdCache(ttl)
+    return _cache
+
+
 class ThresholdService:
-    def __init__(self, database):
+    def __init__(self, database: Any, cache: Optional[ThresholdCache] = None) -> None:
         self.db = database
         self.collection = database.thresholds
+        self.cache = cache
 
     async def get_threshold(self, person: str) -> Optional[BalanceThreshold]:
+        if self.cache is not None:
+            return await self.cache.get(self.db, person)
         threshold = await self.collection.find_one({"person": person})
         if threshold:
             return BalanceThreshold(**threshold)
         return None
 
-    async def update_threshold(self, person: str, threshold: ThresholdUpdate) -> BalanceThreshold:
+    async def update_threshold(
+        self, person: str, threshold: ThresholdUpdate
+    ) -> BalanceThreshold:
         threshold_dict = threshold.model_dump()
         threshold_dict["person"] = person
-        
+
         await self.collection.update_one(
-            {"person": person},
-            {"$set": threshold_dict},
-            upsert=True
+            {"person": person}, {"$set": threshold_dict}, upsert=True
         )
-        
+        if self.cache is not None:
+            self.cache.invalidate()
+
         return BalanceThreshold(
             person=person,
             low_threshold=threshold.low_threshold,
-            medium_threshold=threshold.medium_threshold
-        )
\ No newline at end of file
+            medium_threshold=threshold.medium_threshold,
+        )
+
+    async def get_statuses(self) -> List[dict]:
+        """Every person's balance, thresholds and status in one aggregation"""
+        cursor = self.db.balances.aggregate(status_pipeline())
+        statuses: List[dict] = await cursor.to_list(length=None)
+        return statuses
@@ -0,0 +1,111 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from app.models.user import UserDB
+
+
+class TokenService:
+    """Issues access tokens (JWT) and verifies them through a small LRU
+
+    A verified token is remembered with its claims until it expires, so
+    repeated requests with the same token skip the signature check and
+    never query `users`. Tokens are signed with `secret`; rotating it only
+    invalidates cached tokens in a new process. python-jose is imported on
+    first use.
+    """
+
+    def __init__(
+        self,
+        secret: str,
+        algorithm: str = "HS256",
+        expire_minutes: int = 60,
+        cache_size: int = 1024,
+    ):
+        self.secret = secret
+        self.algorithm = algorithm
+        self.expire_seconds = expire_minutes * 60
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._verified: 'OrderedDict[str, Tuple[float, Dict[str, Any]]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def issue(self, user: UserDB) -> str:
+        from jose import jwt
+
+        now = int(time.time())
+        claims = {
+            "sub": user.id,
+            "email": user.email,
+            "name": user.full_name,
+            "iat": now,
+            "exp": now + self.expire_seconds,
+        }
+        token: str = jwt.encode(claims, self.secret, algorithm=self.algorithm)
+        return token
+
+    def verify(self, token: str) -> Optional[Dict[str, Any]]:
+        """The token's claims, or None if it is invalid or expired"""
+        now = time.time()
+        with self._lock:
+            entry = self._verified.get(token)
+            if entry is not None:
+                if entry[0] > now:
+                    self._verified.move_to_end(token)
+                    self.hits += 1
+                    return entry[1]
+                del self._verified[token]
+            self.misses += 1
+        from jose import JWTError, jwt
+
+        try:
+            claims: Dict[str, Any] = jwt.decode(
+                token, self.secret, algorithms=[self.algorithm]
+            )
+        except JWTError:
+            return None
+        if "sub" not in claims or not isinstance(claims.get("exp"), (int, float)):
+            return None
+        with self._lock:
+            self._verified[token] = (float(claims["exp"]), claims)
+            while len(self._verified) > self.cache_size:
+                self._verified.popitem(last=False)
+        return claims
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "cached": len(self._verified),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_service: Optional[TokenService] = None
+_service_lock = threading.Lock()
+
+
+def _reset_after_fork() -> None:
+    global _service
+    _service = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_token_service(
+    secret: str,
+    algorithm: str = "HS256",
+    expire_minutes: int = 60,
+    cache_size: int = 1024,
+) -> TokenService:
+    """Get the process-wide token service, creating it on first use"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = TokenService(secret, algorithm, expire_minutes, cache_size)
+    return _service
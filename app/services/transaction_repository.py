@@ -0,0 +1,393 @@
+from datetime import datetime
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import DeleteOne, ReturnDocument, UpdateOne
+from app.models.filters import TransactionFilter
+from app.models.transaction import TransactionCreate, TransactionDB, TransactionUpdate
+from app.services.balance_service import AsyncBalanceLedger
+from app.services.image_store import AsyncImageStore
+from app.services.query_cache import (
+    QueryResultCache,
+    bump_version_async,
+    get_version_async,
+    query_key,
+)
+from app.services.rollup_service import AsyncPeriodRollups
+from app.services.transaction_filters import TransactionFilterBuilder
+from app.services.transaction_service import (
+    BULK_BATCH_SIZE,
+    LEDGER_PROJECTION,
+    LIST_PROJECTION,
+    SUMS_PIPELINE,
+    applied_changes,
+    envelope,
+    envelope_pipeline,
+    facet_envelope,
+    pinned_filter,
+)
+from app.utils.cursor import (
+    build_keyset_query,
+    decode_cursor,
+    encode_cursor,
+    keyset_sort,
+)
+
+
+def _object_id(transaction_id: str) -> Optional[ObjectId]:
+    try:
+        return ObjectId(transaction_id)
+    except (InvalidId, TypeError):
+        return None
+
+
+API_FIELDS = tuple(TransactionDB.model_fields)
+
+T = TypeVar('T')
+
+
+def to_api(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Transaction document -> TransactionDB fields (`_id` becomes `id`)
+
+    The result has exactly the model's fields, so list routes can encode it
+    directly without running it through the response model.
+    """
+    row = {field: doc.get(field) for field in API_FIELDS}
+    row['id'] = str(doc['_id'])
+    return row
+
+
+class TransactionRepository:
+    """Async transaction storage for the FastAPI app on the Motor client
+
+    Mirrors TransactionService: the same documents, indexes, keyset cursors,
+    GridFS bill images, balances ledger and period rollups, with every call
+    awaited so requests never block the event loop. With a `cache`, list
+    and balance reads are cached against the same version counter the
+    Flask app bumps.
+    """
+
+    def __init__(self, database: Any, cache: Optional[QueryResultCache] = None) -> None:
+        self.db = database
+        self.cache = cache
+        self.collection = database.transactions
+        self.ledger = AsyncBalanceLedger(database)
+        self.rollups = AsyncPeriodRollups(database)
+        self.images = AsyncImageStore(database)
+
+    async def _cached(
+        self, kind: str, params: Dict[str, Any], compute: Callable[[], Awaitable[T]]
+    ) -> T:
+        if self.cache is None:
+            return await compute()
+        key = query_key(
+            kind, await get_version_async(self.db, self.collection.name), params
+        )
+        result: Optional[T] = await self.cache.get_async(key, self.db)
+        if result is None:
+            result = await compute()
+            await self.cache.put_async(key, result, self.db)
+        return result
+
+    async def _changed(self) -> None:
+        await bump_version_async(self.db, self.collection.name)
+
+    @staticmethod
+    def _sort(filters: TransactionFilter) -> Tuple[str, int]:
+        [(field, direction)] = TransactionFilterBuilder.get_sort_params(filters).items()
+        return field, direction
+
+    async def _store_bill_image(self, data: dict) -> dict:
+        """Replace an inline base64 bill_image with a blob store reference"""
+        if 'bill_image' not in data:
+            return data
+        data = dict(data)
+        image = data.pop('bill_image')
+        data['bill_image_id'] = await self.images.put_base64(image) if image else None
+        return data
+
+    async def get_transactions(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        filters: Optional[TransactionFilter] = None,
+        include_image: bool = False,
+    ) -> List[dict]:
+        filters = filters or TransactionFilter()
+
+        async def compute() -> List[dict]:
+            query = TransactionFilterBuilder.build_query(filters)
+            cursor = (
+                self.collection.find(query, None if include_image else LIST_PROJECTION)
+                .sort(keyset_sort(*self._sort(filters)))
+                .skip(skip)
+                .limit(limit)
+            )
+            return [to_api(doc) async for doc in cursor]
+
+        return await self._cached(
+            'api:transactions',
+            {
+                'filters': filters.model_dump(),
+                'skip': skip,
+                'limit': limit,
+                'include_image': include_image,
+            },
+            compute,
+        )
+
+    async def get_transactions_envelope(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        filters: Optional[TransactionFilter] = None,
+        include_image: bool = False,
+    ) -> dict:
+        """TransactionService.get_transactions_envelope for the FastAPI routes"""
+        filters = filters or TransactionFilter()
+        query = TransactionFilterBuilder.build_query(filters)
+        sort_spec = keyset_sort(*self._sort(filters))
+        projection = None if include_image else LIST_PROJECTION
+
+        async def compute() -> dict:
+            if not query:
+                cursor = (
+                    self.collection.find({}, projection)
+                    .sort(sort_spec)
+                    .skip(skip)
+                    .limit(limit)
+                )
+                sums = await self.collection.aggregate(SUMS_PIPELINE).to_list(length=1)
+                totals = sums[0] if sums else {}
+                return envelope(
+                    [to_api(doc) async for doc in cursor],
+                    await self.collection.estimated_document_count(),
+                    True,
+                    totals.get('receipts', 0.0),
+                    totals.get('expenses', 0.0),
+                )
+            pipeline = envelope_pipeline(query, sort_spec, skip, limit, include_image)
+            results = await self.collection.aggregate(
+                pipeline, allowDiskUse=True
+            ).to_list(length=1)
+            return facet_envelope(results[0] if results else None, to_api)
+
+        return await self._cached(
+            'api:transactions_envelope',
+            {
+                'filters': filters.model_dump(),
+                'skip': skip,
+                'limit': limit,
+                'include_image': include_image,
+            },
+            compute,
+        )
+
+    async def get_transactions_page(
+        self,
+        limit: int = 100,
+        filters: Optional[TransactionFilter] = None,
+        cursor: Optional[str] = None,
+        include_image: bool = False,
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Keyset pagination: returns a page and the cursor for the next one"""
+        filters = filters or TransactionFilter()
+        query = TransactionFilterBuilder.build_query(filters)
+        sort_field, direction = self._sort(filters)
+        if cursor:
+            sort_field, direction, value, last_id = decode_cursor(cursor)
+            query = build_keyset_query(query, sort_field, direction, value, last_id)
+
+        async def compute() -> list:
+            projection = None if include_image else LIST_PROJECTION
+            docs = (
+                await self.collection.find(query, projection)
+                .sort(keyset_sort(sort_field, direction))
+                .limit(limit + 1)
+                .to_list(length=limit + 1)
+            )
+            next_cursor = None
+            if len(docs) > limit:
+                docs = docs[:limit]
+                next_cursor = encode_cursor(sort_field, direction, docs[-1])
+            return [[to_api(doc) for doc in docs], next_cursor]
+
+        items, next_cursor = await self._cached(
+            'api:transactions_page',
+            {
+                'filters': filters.model_dump(),
+                'cursor': cursor,
+                'limit': limit,
+                'include_image': include_image,
+            },
+            compute,
+        )
+        return items, next_cursor
+
+    async def get_transaction(self, transaction_id: str) -> Optional[dict]:
+        object_id = _object_id(transaction_id)
+        if object_id is None:
+            return None
+        doc = await self.collection.find_one({'_id': object_id})
+        return to_api(doc) if doc else None
+
+    async def create_transaction(self, transaction: TransactionCreate) -> dict:
+        doc = await self._store_bill_image(transaction.model_dump(exclude_none=True))
+        result = await self.collection.insert_one(doc)
+        doc['_id'] = result.inserted_id
+        await self.ledger.apply(None, doc)
+        await self.rollups.apply(None, doc)
+        await self._changed()
+        return to_api(doc)
+
+    async def update_transaction(
+        self, transaction_id: str, transaction: TransactionUpdate
+    ) -> Optional[dict]:
+        object_id = _object_id(transaction_id)
+        if object_id is None:
+            return None
+        changes = transaction.model_dump(exclude_unset=True)
+        update_data = await self._store_bill_image(changes)
+        update: Dict[str, Any] = {'$set': update_data} if update_data else {}
+        if 'bill_image' in changes:
+            update['$unset'] = {'bill_image': ''}
+        if not update:
+            return await self.get_transaction(transaction_id)
+
+        previous = await self.collection.find_one_and_update(
+            {'_id': object_id}, update, return_document=ReturnDocument.BEFORE
+        )
+        if previous is None:
+            return None
+        current = {**previous, **update_data}
+        if 'bill_image' in changes:
+            current.pop('bill_image', None)
+        await self.ledger.apply(previous, current)
+        await self.rollups.apply(previous, current)
+        await self._changed()
+        return to_api(current)
+
+    async def delete_transaction(self, transaction_id: str) -> bool:
+        object_id = _object_id(transaction_id)
+        if object_id is None:
+            return False
+        deleted = await self.collection.find_one_and_delete({'_id': object_id})
+        if deleted is None:
+            return False
+        await self.ledger.apply(deleted, None)
+        await self.rollups.apply(deleted, None)
+        await self._changed()
+        return True
+
+    async def _bulk(
+        self,
+        selector: dict,
+        batch_size: int,
+        write: Callable[
+            [List[dict]], Awaitable[Tuple[int, List[Tuple[dict, Optional[dict]]]]]
+        ],
+    ) -> Tuple[int, int]:
+        """TransactionService._bulk: pre-images and one bulk_write per _id batch"""
+        matched = written = 0
+        last_id = None
+        while True:
+            query = (
+                selector
+                if last_id is None
+                else {'$and': [selector, {'_id': {'$gt': last_id}}]}
+            )
+            batch = (
+                await self.collection.find(query, LEDGER_PROJECTION)
+                .sort('_id', 1)
+                .limit(batch_size)
+                .to_list(length=batch_size)
+            )
+            if not batch:
+                break
+            matched += len(batch)
+            count, changes = await write(batch)
+            written += count
+            if changes:
+                await self.ledger.apply_changes(changes)
+                await self.rollups.apply_changes(changes)
+            last_id = batch[-1]['_id']
+        if written:
+            await self._changed()
+        return matched, written
+
+    async def _current(self, batch: List[dict], projection: dict) -> List[dict]:
+        ids = [doc['_id'] for doc in batch]
+        cursor = self.collection.find({'_id': {'$in': ids}}, projection)
+        current: List[dict] = await cursor.to_list(length=len(ids))
+        return current
+
+    async def recategorize_transactions(
+        self, selector: dict, category: str, batch_size: int = BULK_BATCH_SIZE
+    ) -> Dict[str, int]:
+        async def write(
+            batch: List[dict],
+        ) -> Tuple[int, List[Tuple[dict, Optional[dict]]]]:
+            batch = [doc for doc in batch if doc.get('category') != category]
+            if not batch:
+                return 0, []
+            result = await self.collection.bulk_write(
+                [
+                    UpdateOne(pinned_filter(doc), {'$set': {'category': category}})
+                    for doc in batch
+                ],
+                ordered=False,
+            )
+            current = []
+            if result.modified_count < len(batch):
+                current = await self._current(batch, LEDGER_PROJECTION)
+            return result.modified_count, applied_changes(
+                batch,
+                result.modified_count,
+                lambda doc: {**doc, 'category': category},
+                lambda: current,
+            )
+
+        matched, modified = await self._bulk(selector, batch_size, write)
+        return {'matched': matched, 'modified': modified}
+
+    async def delete_transactions(
+        self, selector: dict, batch_size: int = BULK_BATCH_SIZE
+    ) -> Dict[str, int]:
+        async def write(
+            batch: List[dict],
+        ) -> Tuple[int, List[Tuple[dict, Optional[dict]]]]:
+            result = await self.collection.bulk_write(
+                [DeleteOne(pinned_filter(doc)) for doc in batch], ordered=False
+            )
+            current = []
+            if result.deleted_count < len(batch):
+                current = await self._current(batch, {'_id': 1})
+            return result.deleted_count, applied_changes(
+                batch, result.deleted_count, lambda doc: None, lambda: current
+            )
+
+        matched, deleted = await self._bulk(selector, batch_size, write)
+        return {'matched': matched, 'deleted': deleted}
+
+    async def get_person_balances(self) -> List[dict]:
+        return await self._cached('api:balances', {}, self.ledger.get_balances)
+
+    async def get_report(
+        self,
+        group_by: Sequence[str] = (),
+        granularity: str = 'month',
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        filters: Optional[Dict[str, str]] = None,
+    ) -> List[dict]:
+        return await self.rollups.report(group_by, granularity, start, end, filters)
@@ -1,24 +1,341 @@
-from typing import List, Optional
+import csv
+from itertools import islice
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
 from datetime import datetime
 from bson import ObjectId
+from bson.errors import InvalidId
+from flask import current_app
+from marshmallow import ValidationError
+from pymongo import DeleteOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
 from app.models.transaction import Transaction, TransactionSchema
 from app.database import get_db
+from app.indexes import guard_query
+from app.services.balance_service import BalanceLedger
+from app.services.rollup_service import PeriodRollups
+from app.services.image_store import (
+    IMAGE_CONTENT_TYPES,
+    ImageStore,
+    InvalidImageError,
+    decode_data_url,
+    image_content_type,
+)
+from app.services.query_cache import (
+    QueryResultCache,
+    bump_version,
+    get_query_cache,
+    get_version,
+    query_key,
+)
+from app.utils.serialization import serialize_transaction
+from app.utils.cursor import (
+    encode_cursor,
+    decode_cursor,
+    build_keyset_query,
+    keyset_sort,
+)
+
+T = TypeVar('T')
+
+# List endpoints never ship inline (legacy) bill image data
+LIST_PROJECTION = {'bill_image': 0}
+# Per-row errors returned by a bulk import before the list is truncated
+MAX_IMPORT_ERRORS = 1000
+# Transactions read and written per bulk_write by the batch endpoints
+BULK_BATCH_SIZE = 500
+# Fields the balances ledger and period rollups are derived from
+LEDGER_FIELDS = ('date', 'amount', 'type', 'category', 'person', 'project')
+LEDGER_PROJECTION = {field: 1 for field in LEDGER_FIELDS}
+
+# Count and receipt/expense sums of a selection, for envelope responses
+TOTALS_GROUP = {
+    '_id': None,
+    'count': {'$sum': 1},
+    'receipts': {'$sum': {'$cond': [{'$eq': ['$type', 'receipt']}, '$amount', 0]}},
+    'expenses': {'$sum': {'$cond': [{'$eq': ['$type', 'expense']}, '$amount', 0]}},
+}
+SUMS_PIPELINE: List[dict] = [
+    {'$project': {'_id': 0, 'type': 1, 'amount': 1}},
+    {'$group': TOTALS_GROUP},
+]
+
+
+def envelope_pipeline(
+    query: dict, sort_spec: list, skip: int, limit: int, include_image: bool = False
+) -> List[dict]:
+    """One aggregation returning a page of `query` with its count and sums
+
+    $sort runs before $facet so it can still use an index; sub-pipelines of
+    $facet never do. The result is one document with `items` and `totals`.
+    """
+    items: List[dict] = [{'$skip': skip}, {'$limit': limit}]
+    if not include_image:
+        items.append({'$project': {'bill_image': 0}})
+    return [
+        {'$match': query},
+        {'$sort': dict(sort_spec)},
+        {'$facet': {'items': items, 'totals': [{'$group': TOTALS_GROUP}]}},
+    ]
+
+
+def envelope(
+    items: List[dict], total: int, estimated: bool, receipts: float, expenses: float
+) -> dict:
+    """List response with the total count and receipt/expense sums of the selection"""
+    return {
+        'items': items,
+        'total': total,
+        'estimated': estimated,
+        'receipts': round(float(receipts), 2),
+        'expenses': round(float(expenses), 2),
+    }
+
+
+def facet_envelope(result: Optional[dict], convert: Callable[[dict], dict]) -> dict:
+    """envelope() from the document envelope_pipeline produced"""
+    result = result or {'items': [], 'totals': []}
+    totals = result['totals'][0] if result['totals'] else {}
+    return envelope(
+        [convert(doc) for doc in result['items']],
+        totals.get('count', 0),
+        False,
+        totals.get('receipts', 0.0),
+        totals.get('expenses', 0.0),
+    )
+
+
+def _object_id(transaction_id: str) -> Optional[ObjectId]:
+    try:
+        return ObjectId(transaction_id)
+    except (InvalidId, TypeError):
+        return None
+
+
+def bulk_selector(
+    ids: Optional[Sequence[str]] = None, filters: Optional[dict] = None
+) -> dict:
+    """Query selecting the transactions of a batch operation
+
+    Either an id list or a non-empty filter; an empty selection is refused
+    rather than treated as "every transaction". Raises ValueError.
+    """
+    if ids is not None:
+        try:
+            return {
+                '_id': {'$in': [ObjectId(transaction_id) for transaction_id in ids]}
+            }
+        except (InvalidId, TypeError):
+            raise ValueError('ids must be transaction ids') from None
+    if not filters:
+        raise ValueError('Select transactions by ids or a non-empty filter')
+    return filters
+
+
+def pinned_filter(transaction: dict) -> dict:
+    """Match `transaction` only while its ledger fields still hold the values read
+
+    Batch writes use it so a concurrent edit between reading the pre-images
+    and writing makes the operation miss instead of skewing the ledger.
+    """
+    return {
+        '_id': transaction['_id'],
+        **{field: transaction.get(field) for field in LEDGER_FIELDS},
+    }
+
+
+def applied_changes(
+    batch: List[dict],
+    written: int,
+    new: Callable[[dict], Optional[dict]],
+    current: Callable[[], Iterable[dict]],
+) -> List[Tuple[dict, Optional[dict]]]:
+    """(old, new) pairs for the batch documents a bulk_write actually changed
+
+    When fewer than all were written, `current()` re-reads the batch and a
+    document counts as changed only if it now looks like `new(old)`.
+    """
+    changes = [(doc, new(doc)) for doc in batch]
+    if written < len(batch):
+        found = {doc['_id']: doc for doc in current()}
+
+        def applied(old: dict, after: Optional[dict]) -> bool:
+            if after is None:
+                return old['_id'] not in found
+            return old['_id'] in found and pinned_filter(
+                found[old['_id']]
+            ) == pinned_filter(after)
+
+        changes = [(old, after) for old, after in changes if applied(old, after)]
+    return changes
+
+
+def current_query_cache() -> Optional[QueryResultCache]:
+    """The worker's query result cache, or None when QUERY_CACHE is off"""
+    config = current_app.config
+    if not config.get('QUERY_CACHE'):
+        return None
+    return get_query_cache(
+        config.get('QUERY_CACHE_MAX_BYTES', 32 * 1024 * 1024),
+        config.get('QUERY_CACHE_TTL', 600),
+        config.get('QUERY_CACHE_PERSIST', False),
+    )
+
 
 class TransactionService:
     def __init__(self):
         self.db = get_db()
         self.collection = self.db.transactions
         self.schema = TransactionSchema()
+        self.ledger = BalanceLedger(self.db)
+        self.rollups = PeriodRollups(self.db)
+        self.images = ImageStore(self.db)
 
-    def create_transaction(self, transaction_data: dict) -> dict:
-        transaction = self.schema.load(transaction_data)
-        result = self.collection.insert_one(transaction)
-        return self.get_transaction(result.inserted_id)
+    def _guard_query(self, query: dict, sort: Optional[list]) -> None:
+        """Flag unindexed queries when QUERY_GUARD is enabled (dev/test)"""
+        config = current_app.config
+        if config.get('QUERY_GUARD'):
+            guard_query(
+                self.collection,
+                query,
+                sort,
+                min_docs=config.get('QUERY_GUARD_MIN_DOCS', 1000),
+                strict=config.get('QUERY_GUARD_STRICT', False),
+            )
+
+    def _cached(self, kind: str, params: Dict[str, Any], compute: Callable[[], T]) -> T:
+        """Serve `compute()` from the query cache for the current data version"""
+        cache = current_query_cache()
+        if cache is None:
+            return compute()
+        key = query_key(kind, get_version(self.db, self.collection.name), params)
+        result: Optional[T] = cache.get(key, self.db)
+        if result is None:
+            result = compute()
+            cache.put(key, result, self.db)
+        return result
+
+    def _changed(self) -> None:
+        bump_version(self.db, self.collection.name)
+
+    def _store_bill_image(self, data: dict) -> dict:
+        """Replace an inline base64 bill_image with a blob store reference"""
+        if 'bill_image' not in data:
+            return data
+        data = dict(data)
+        image = data.pop('bill_image')
+        data['bill_image_id'] = self.images.put_base64(image) if image else None
+        return data
+
+    def create_transaction(
+        self,
+        transaction_data: dict,
+        bill_image: Optional[Tuple[bytes, Optional[str]]] = None,
+    ) -> dict:
+        """Create a transaction; `bill_image` is an uploaded (bytes, content type)"""
+        transaction = self._store_bill_image(self.schema.load(transaction_data))
+        if bill_image is not None:
+            transaction['bill_image_id'] = self.images.put(*bill_image)
+        # insert_one sets _id on the document; no need to read it back
+        self.collection.insert_one(transaction)
+        self.ledger.apply(None, transaction)
+        self.rollups.apply(None, transaction)
+        self._changed()
+        return serialize_transaction(transaction)
+
+    def import_transactions(
+        self, rows: Iterable[Any], chunk_size: int = 1000
+    ) -> Dict[str, Any]:
+        """Validate and insert rows in chunks, collecting per-row errors
+
+        Rows are consumed lazily so arbitrarily large uploads are processed
+        with memory bounded by `chunk_size`. Row numbers in errors are
+        1-based positions in the input.
+        """
+        summary: Dict[str, Any] = {
+            'inserted': 0,
+            'failed': 0,
+            'errors': [],
+            'errors_truncated': False,
+        }
+
+        def record(row: int, errors: Any) -> None:
+            summary['failed'] += 1
+            if len(summary['errors']) < MAX_IMPORT_ERRORS:
+                summary['errors'].append({'row': row, 'errors': errors})
+            else:
+                summary['errors_truncated'] = True
+
+        rows = iter(rows)
+        offset = 0
+        while True:
+            chunk: List[Any] = []
+            source_error: Optional[Exception] = None
+            try:
+                chunk.extend(islice(rows, chunk_size))
+            except (ValueError, csv.Error) as e:
+                # Malformed upload: import the rows read so far, then stop
+                source_error = e
+            if not chunk and source_error is None:
+                break
+
+            try:
+                loaded = self.schema.load(chunk, many=True)
+                invalid = {}
+            except ValidationError as e:
+                loaded = e.valid_data
+                invalid = e.messages if isinstance(e.messages, dict) else {}
+
+            positions, documents = [], []
+            for index, document in enumerate(loaded):
+                if index in invalid:
+                    record(offset + index + 1, invalid[index])
+                    continue
+                try:
+                    documents.append(self._store_bill_image(document))
+                    positions.append(offset + index + 1)
+                except ValueError as e:
+                    record(offset + index + 1, {'bill_image': [str(e)]})
+
+            if documents:
+                failed_indexes = set()
+                try:
+                    self.collection.insert_many(documents, ordered=False)
+                except BulkWriteError as e:
+                    for error in e.details.get('writeErrors', []):
+                        failed_indexes.add(error['index'])
+                        record(
+                            positions[error['index']], {'_write': [error.get('errmsg')]}
+                        )
+                inserted = [
+                    d for i, d in enumerate(documents) if i not in failed_indexes
+                ]
+                self.ledger.apply_many(inserted)
+                self.rollups.apply_many(inserted)
+                self._changed()
+                summary['inserted'] += len(inserted)
+
+            offset += len(chunk)
+            if source_error is not None:
+                summary['error'] = f'Stopped after row {offset}: {source_error}'
+                break
+
+        return summary
 
     def get_transaction(self, transaction_id: str) -> Optional[dict]:
         try:
             transaction = self.collection.find_one({'_id': ObjectId(transaction_id)})
-            return self.schema.dump(transaction) if transaction else None
+            return serialize_transaction(transaction) if transaction else None
         except Exception:
             return None
 
@@ -26,56 +343,345 @@ class TransactionService:
         self,
         skip: int = 0,
         limit: int = 100,
-        filters: dict = None,
-        sort: tuple = None
+        filters: Optional[dict] = None,
+        sort: Optional[tuple] = None,
+        include_image: bool = False,
     ) -> List[dict]:
         query = filters or {}
-        cursor = self.collection.find(query).skip(skip).limit(limit)
-        if sort:
-            cursor = cursor.sort(*sort)
-        return [self.schema.dump(doc) for doc in cursor]
+        sort_spec = keyset_sort(*sort) if sort else None
 
-    def update_transaction(self, transaction_id: str, update_data: dict) -> Optional[dict]:
-        try:
-            self.collection.update_one(
-                {'_id': ObjectId(transaction_id)},
-                {'$set': update_data}
+        def compute() -> List[dict]:
+            self._guard_query(query, sort_spec)
+            cursor = self.collection.find(
+                query, None if include_image else LIST_PROJECTION
+            )
+            if sort_spec:
+                cursor = cursor.sort(sort_spec)
+            cursor = cursor.skip(skip).limit(limit)
+            return [serialize_transaction(doc) for doc in cursor]
+
+        return self._cached(
+            'transactions',
+            {
+                'filters': query,
+                'sort': sort_spec,
+                'skip': skip,
+                'limit': limit,
+                'include_image': include_image,
+            },
+            compute,
+        )
+
+    def get_transactions_envelope(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        filters: Optional[dict] = None,
+        sort: tuple = ('date', -1),
+        include_image: bool = False,
+    ) -> dict:
+        """A page plus the total count and receipt/expense sums of everything matching
+
+        Filtered requests run one $facet aggregation. Without filters the
+        page is read through the sort index, the count comes from collection
+        metadata (estimated_document_count) and the sums from a $group over
+        `type` and `amount`, so no full documents are loaded or sorted.
+        """
+        query = filters or {}
+        sort_spec = keyset_sort(*sort)
+        projection = None if include_image else LIST_PROJECTION
+
+        def compute() -> dict:
+            if not query:
+                cursor = (
+                    self.collection.find({}, projection)
+                    .sort(sort_spec)
+                    .skip(skip)
+                    .limit(limit)
+                )
+                totals: dict = next(self.collection.aggregate(SUMS_PIPELINE), {})
+                return envelope(
+                    [serialize_transaction(doc) for doc in cursor],
+                    self.collection.estimated_document_count(),
+                    True,
+                    totals.get('receipts', 0.0),
+                    totals.get('expenses', 0.0),
+                )
+            self._guard_query(query, sort_spec)
+            pipeline = envelope_pipeline(query, sort_spec, skip, limit, include_image)
+            result = next(self.collection.aggregate(pipeline, allowDiskUse=True), None)
+            return facet_envelope(result, serialize_transaction)
+
+        return self._cached(
+            'transactions_envelope',
+            {
+                'filters': query,
+                'sort': sort_spec,
+                'skip': skip,
+                'limit': limit,
+                'include_image': include_image,
+            },
+            compute,
+        )
+
+    def get_transactions_page(
+        self,
+        limit: int = 100,
+        filters: Optional[dict] = None,
+        sort: tuple = ('date', -1),
+        cursor: Optional[str] = None,
+        include_image: bool = False,
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Keyset pagination: returns a page and the cursor for the next one"""
+        sort_field, direction = sort
+        query = filters or {}
+        if cursor:
+            sort_field, direction, value, last_id = decode_cursor(cursor)
+            query = build_keyset_query(query, sort_field, direction, value, last_id)
+
+        sort_spec = keyset_sort(sort_field, direction)
+
+        def compute() -> list:
+            self._guard_query(query, sort_spec)
+            projection = None if include_image else LIST_PROJECTION
+            docs = list(
+                self.collection.find(query, projection).sort(sort_spec).limit(limit + 1)
             )
+            next_cursor = None
+            if len(docs) > limit:
+                docs = docs[:limit]
+                next_cursor = encode_cursor(sort_field, direction, docs[-1])
+            return [[serialize_transaction(doc) for doc in docs], next_cursor]
+
+        items, next_cursor = self._cached(
+            'transactions_page',
+            {
+                'filters': query,
+                'sort': sort_spec,
+                'limit': limit,
+                'include_image': include_image,
+            },
+            compute,
+        )
+        return items, next_cursor
+
+    def iter_transactions(
+        self,
+        filters: Optional[dict] = None,
+        sort: tuple = ('date', -1),
+        batch_size: int = 1000,
+    ) -> Iterator[dict]:
+        """Stream raw documents (without bill image data) from a server-side cursor"""
+        query = filters or {}
+        sort_spec = keyset_sort(*sort)
+        self._guard_query(query, sort_spec)
+        return (
+            self.collection.find(query, LIST_PROJECTION)
+            .sort(sort_spec)
+            .batch_size(batch_size)
+        )
+
+    def update_transaction(
+        self, transaction_id: str, update_data: Optional[dict]
+    ) -> Optional[dict]:
+        """The updated transaction, or None if it does not exist
+
+        Fields are validated (and converted) by the schema before anything is
+        written, since the ledger and rollup deltas are computed from them.
+        Raises ValidationError for invalid fields and InvalidImageError for a
+        bill_image that cannot be decoded.
+        """
+        if update_data is None:
+            raise ValidationError('Send a JSON object of fields to update')
+        update_data = self.schema.load(update_data, partial=True)
+        object_id = _object_id(transaction_id)
+        if object_id is None:
+            return None
+        if not update_data:
             return self.get_transaction(transaction_id)
-        except Exception:
+        changes = self._store_bill_image(update_data)
+        update = {'$set': changes}
+        if 'bill_image' in update_data:
+            update['$unset'] = {'bill_image': ''}
+        # The pre-image feeds the ledger; the post-image is built from it
+        # locally instead of being read back
+        previous = self.collection.find_one_and_update(
+            {'_id': object_id}, update, return_document=ReturnDocument.BEFORE
+        )
+        if previous is None:
             return None
+        current = {**previous, **changes}
+        if 'bill_image' in update_data:
+            current.pop('bill_image', None)
+        self.ledger.apply(previous, current)
+        self.rollups.apply(previous, current)
+        self._changed()
+        return serialize_transaction(current)
 
     def delete_transaction(self, transaction_id: str) -> bool:
-        try:
-            result = self.collection.delete_one({'_id': ObjectId(transaction_id)})
-            return result.deleted_count > 0
-        except Exception:
+        object_id = _object_id(transaction_id)
+        if object_id is None:
             return False
+        deleted = self.collection.find_one_and_delete({'_id': object_id})
+        if deleted is None:
+            return False
+        self.ledger.apply(deleted, None)
+        self.rollups.apply(deleted, None)
+        self._changed()
+        return True
+
+    def _bulk(
+        self,
+        selector: dict,
+        batch_size: int,
+        write: Callable[[List[dict]], Tuple[int, List[Tuple[dict, Optional[dict]]]]],
+    ) -> Tuple[int, int]:
+        """Run `write` over the selected transactions in _id order, batch by batch
+
+        Each batch's pre-images are read with one query; `write` issues one
+        bulk_write and returns its count and the (old, new) pairs it applied,
+        which go to the ledger and rollups. Returns (matched, written).
+        """
+        matched = written = 0
+        last_id = None
+        while True:
+            query = (
+                selector
+                if last_id is None
+                else {'$and': [selector, {'_id': {'$gt': last_id}}]}
+            )
+            batch = list(
+                self.collection.find(query, LEDGER_PROJECTION)
+                .sort('_id', 1)
+                .limit(batch_size)
+            )
+            if not batch:
+                break
+            matched += len(batch)
+            count, changes = write(batch)
+            written += count
+            if changes:
+                self.ledger.apply_changes(changes)
+                self.rollups.apply_changes(changes)
+            last_id = batch[-1]['_id']
+        if written:
+            self._changed()
+        return matched, written
+
+    def recategorize_transactions(
+        self, selector: dict, category: str, batch_size: int = BULK_BATCH_SIZE
+    ) -> Dict[str, int]:
+        """Set `category` on every transaction matching `selector`; see bulk_selector"""
+
+        def write(batch: List[dict]) -> Tuple[int, List[Tuple[dict, Optional[dict]]]]:
+            batch = [doc for doc in batch if doc.get('category') != category]
+            if not batch:
+                return 0, []
+            result = self.collection.bulk_write(
+                [
+                    UpdateOne(pinned_filter(doc), {'$set': {'category': category}})
+                    for doc in batch
+                ],
+                ordered=False,
+            )
+            return result.modified_count, applied_changes(
+                batch,
+                result.modified_count,
+                lambda doc: {**doc, 'category': category},
+                lambda: self.collection.find(
+                    {'_id': {'$in': [doc['_id'] for doc in batch]}}, LEDGER_PROJECTION
+                ),
+            )
+
+        matched, modified = self._bulk(selector, batch_size, write)
+        return {'matched': matched, 'modified': modified}
+
+    def delete_transactions(
+        self, selector: dict, batch_size: int = BULK_BATCH_SIZE
+    ) -> Dict[str, int]:
+        """Delete every transaction matching `selector` (see bulk_selector)"""
+
+        def write(batch: List[dict]) -> Tuple[int, List[Tuple[dict, Optional[dict]]]]:
+            result = self.collection.bulk_write(
+                [DeleteOne(pinned_filter(doc)) for doc in batch], ordered=False
+            )
+            return result.deleted_count, applied_changes(
+                batch,
+                result.deleted_count,
+                lambda doc: None,
+                lambda: self.collection.find(
+                    {'_id': {'$in': [doc['_id'] for doc in batch]}}, {'_id': 1}
+                ),
+            )
+
+        matched, deleted = self._bulk(selector, batch_size, write)
+        return {'matched': matched, 'deleted': deleted}
 
     def get_person_balances(self) -> List[dict]:
-        pipeline = [
+        return self._cached('balances', {}, self.ledger.get_balances)
+
+    def get_report(
+        self,
+        group_by: Sequence[str] = (),
+        granularity: str = 'month',
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        filters: Optional[Dict[str, str]] = None,
+    ) -> List[dict]:
+        """Period totals read from the rollups; ValueError for unknown options"""
+        return self.rollups.report(group_by, granularity, start, end, filters)
+
+    def set_bill_image(
+        self, transaction_id: str, data: bytes, content_type: Optional[str] = None
+    ) -> Optional[dict]:
+        """Attach an uploaded bill image to an existing transaction"""
+        try:
+            object_id = ObjectId(transaction_id)
+        except Exception:
+            return None
+        # Checked first so no blob is stored for a missing transaction
+        if self.collection.count_documents({'_id': object_id}, limit=1) == 0:
+            return None
+        transaction = self.collection.find_one_and_update(
+            {'_id': object_id},
             {
-                '$group': {
-                    '_id': '$person',
-                    'receipts': {
-                        '$sum': {
-                            '$cond': [{'$eq': ['$type', 'receipt']}, '$amount', 0]
-                        }
-                    },
-                    'expenses': {
-                        '$sum': {
-                            '$cond': [{'$eq': ['$type', 'expense']}, '$amount', 0]
-                        }
-                    }
-                }
+                '$set': {'bill_image_id': self.images.put(data, content_type)},
+                '$unset': {'bill_image': ''},
             },
-            {
-                '$project': {
-                    'person': '$_id',
-                    'receipts': 1,
-                    'expenses': 1,
-                    'balance': {'$subtract': ['$receipts', '$expenses']}
-                }
-            }
-        ]
-        return list(self.collection.aggregate(pipeline))
\ No newline at end of file
+            LIST_PROJECTION,
+            return_document=ReturnDocument.AFTER,
+        )
+        self._changed()
+        return serialize_transaction(transaction) if transaction else None
+
+    def get_bill_image(
+        self, transaction_id: str
+    ) -> Optional[Tuple[str, Iterable[bytes], Optional[int]]]:
+        """(content type, byte iterable, length) of a transaction's bill image"""
+        try:
+            transaction = self.collection.find_one(
+                {'_id': ObjectId(transaction_id)}, {'bill_image_id': 1, 'bill_image': 1}
+            )
+        except Exception:
+            return None
+        if not transaction:
+            return None
+
+        if transaction.get('bill_image_id'):
+            grid_out = self.images.open(transaction['bill_image_id'])
+            if grid_out is None:
+                return None
+            content_type = (grid_out.metadata or {}).get('content_type')
+            # Images stored before the type whitelist may carry any declared type
+            if content_type not in IMAGE_CONTENT_TYPES:
+                content_type = 'application/octet-stream'
+            return content_type, grid_out, grid_out.length
+
+        # Documents not yet migrated still carry the image inline
+        if transaction.get('bill_image'):
+            try:
+                data, content_type = decode_data_url(transaction['bill_image'])
+            except InvalidImageError:
+                return None
+            return image_content_type(data, content_type), [data], len(data)
+        return None
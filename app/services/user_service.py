@@ -1,27 +1,115 @@
-from typing import Optional
-from passlib.context import CryptContext
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Optional, TypeVar
+from pymongo import ASCENDING
+from pymongo.errors import DuplicateKeyError
+from app.indexes import register_index
 from app.models.user import UserCreate, UserDB
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+# Login and signup look users up by email; the unique index settles signup races
+register_index('users', [('email', ASCENDING)], name='email', unique=True)
+
+
+class EmailTakenError(ValueError):
+    """Raised on signup with an email that already has an account"""
+
+
+T = TypeVar('T')
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_dummy_hash: Optional[str] = None
+_pwd_context: Optional['CryptContext'] = None
+
+
+def password_context() -> 'CryptContext':
+    """The bcrypt CryptContext; passlib and bcrypt are loaded on first use"""
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _pwd_context
+
+
+def _reset_after_fork() -> None:
+    global _executor
+    _executor = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_password_executor(max_workers: int = 4) -> ThreadPoolExecutor:
+    """Get the process-wide pool that runs bcrypt off the event loop
+
+    bcrypt releases the GIL, so a few threads hash in parallel; the bound
+    keeps a burst of logins from taking every core from the OCR pool.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=max_workers, thread_name_prefix='bcrypt'
+                )
+    return _executor
+
+
+def _verify_or_burn(plain_password: str, hashed_password: Optional[str]) -> bool:
+    global _dummy_hash
+    if hashed_password is None:
+        # Unknown email: spend the same bcrypt time so it can't be told apart
+        if _dummy_hash is None:
+            _dummy_hash = password_context().hash(os.urandom(16).hex())
+        password_context().verify(plain_password, _dummy_hash)
+        return False
+    return bool(password_context().verify(plain_password, hashed_password))
+
 
 class UserService:
-    def __init__(self, database):
+    def __init__(
+        self, database: Any, executor: Optional[ThreadPoolExecutor] = None
+    ) -> None:
         self.db = database
         self.collection = database.users
+        self.executor = executor
 
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        return pwd_context.verify(plain_password, hashed_password)
+        return bool(password_context().verify(plain_password, hashed_password))
 
     def get_password_hash(self, password: str) -> str:
-        return pwd_context.hash(password)
+        hashed: str = password_context().hash(password)
+        return hashed
+
+    async def _in_executor(self, function: Callable[..., T], *args: Any) -> T:
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, function, *args
+        )
 
     async def create_user(self, user: UserCreate) -> UserDB:
-        hashed_password = self.get_password_hash(user.password)
+        """Store a new user; EmailTakenError if the email is registered
+
+        The lookup works without the unique `email` index (created by `flask
+        ensure-indexes`); the index closes the race between two signups.
+        """
+        if await self.collection.find_one({"email": user.email}, {"_id": 1}):
+            raise EmailTakenError(user.email)
+        hashed_password = await self._in_executor(self.get_password_hash, user.password)
         user_dict = user.model_dump()
         user_dict["hashed_password"] = hashed_password
         del user_dict["password"]
-        
-        result = await self.collection.insert_one(user_dict)
+
+        try:
+            result = await self.collection.insert_one(user_dict)
+        except DuplicateKeyError:
+            raise EmailTakenError(user.email) from None
         user_dict["id"] = str(result.inserted_id)
         return UserDB(**user_dict)
 
@@ -30,4 +118,12 @@ class UserService:
         if user_dict:
             user_dict["id"] = str(user_dict["_id"])
             return UserDB(**user_dict)
-        return None
\ No newline at end of file
+        return None
+
+    async def authenticate(self, email: str, password: str) -> Optional[UserDB]:
+        """The user if `password` matches, else None (unknown emails take as long)"""
+        user = await self.get_user_by_email(email)
+        hashed_password = user.hashed_password if user else None
+        if await self._in_executor(_verify_or_burn, password, hashed_password):
+            return user
+        return None
@@ -1,4 +1,11 @@
 from app.utils.filters import build_transaction_filters
 from app.utils.pagination import get_pagination_params
+from app.utils.cursor import encode_cursor, decode_cursor, InvalidCursorError
 
-__all__ = ['build_transaction_filters', 'get_pagination_params']
\ No newline at end of file
+__all__ = [
+    'build_transaction_filters',
+    'get_pagination_params',
+    'encode_cursor',
+    'decode_cursor',
+    'InvalidCursorError',
+]
@@ -0,0 +1,77 @@
+import base64
+import binascii
+from typing import Any, Dict, List, Optional, Tuple
+from bson import ObjectId, json_util
+
+# Fields that can be used as the keyset for cursor pagination
+SORTABLE_FIELDS = {
+    'date',
+    'amount',
+    'description',
+    'category',
+    'person',
+    'project',
+    'type',
+}
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def encode_cursor(sort_field: str, direction: int, doc: Dict[str, Any]) -> str:
+    """Encode the keyset position after `doc` as an opaque token"""
+    payload = json_util.dumps([sort_field, direction, doc.get(sort_field), doc['_id']])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token: str) -> Tuple[str, int, Any, ObjectId]:
+    """Decode a token produced by encode_cursor"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        sort_field, direction, value, last_id = json_util.loads(
+            base64.urlsafe_b64decode(padded.encode())
+        )
+    except (ValueError, TypeError, binascii.Error) as e:
+        raise InvalidCursorError('Invalid cursor') from e
+
+    if (
+        sort_field not in SORTABLE_FIELDS
+        or direction not in (1, -1)
+        or not isinstance(last_id, ObjectId)
+    ):
+        raise InvalidCursorError('Invalid cursor')
+    return sort_field, direction, value, last_id
+
+
+def keyset_sort(sort_field: str, direction: int) -> List[Tuple[str, int]]:
+    """Sort spec with _id as tiebreaker so the order is total"""
+    return [(sort_field, direction), ('_id', direction)]
+
+
+def build_keyset_query(
+    filters: Optional[Dict[str, Any]],
+    sort_field: str,
+    direction: int,
+    value: Any,
+    last_id: ObjectId,
+) -> Dict[str, Any]:
+    """Restrict `filters` to documents strictly after (value, last_id)
+
+    MongoDB sorts null (and missing) before every other value, but `$gt`
+    and `$lt` only compare values of the same type. So the null group
+    is handled explicitly: ascending pages move from it to all non-null
+    values, and descending pages move from non-null values into it.
+    """
+    op = '$lt' if direction == -1 else '$gt'
+    tie = {sort_field: value, '_id': {op: last_id}}
+    if value is None:
+        after = {'$or': [{sort_field: {'$ne': None}}, tie]} if direction == 1 else tie
+    else:
+        clauses = [{sort_field: {op: value}}, tie]
+        if direction == -1:
+            clauses.append({sort_field: None})
+        after = {'$or': clauses}
+    if not filters:
+        return after
+    return {'$and': [filters, after]}
@@ -0,0 +1,75 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator
+
+EXPORT_FIELDS = [
+    'id',
+    'date',
+    'description',
+    'amount',
+    'type',
+    'category',
+    'person',
+    'project',
+    'bill_image_id',
+]
+
+# Rows serialized before a chunk is handed to the WSGI server
+ROWS_PER_CHUNK = 500
+# Leading characters that make spreadsheets evaluate a cell as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def export_row(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten a transaction document into JSON/CSV friendly values"""
+    row = {field: doc.get(field) for field in EXPORT_FIELDS}
+    row['id'] = str(doc['_id'])
+    if isinstance(row['date'], datetime):
+        row['date'] = row['date'].isoformat()
+    return row
+
+
+def csv_safe(value: Any) -> Any:
+    """Quote text that a spreadsheet would run as a formula with a leading '"""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def iter_csv(docs: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    for count, doc in enumerate(docs, 1):
+        writer.writerow(
+            {field: csv_safe(value) for field, value in export_row(doc).items()}
+        )
+        if count % ROWS_PER_CHUNK == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_ndjson(docs: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    lines = []
+    for doc in docs:
+        lines.append(json.dumps(export_row(doc)))
+        if len(lines) == ROWS_PER_CHUNK:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def gzip_chunks(chunks: Iterable[str]) -> Iterator[bytes]:
+    """Gzip a stream of text chunks without buffering the whole body"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
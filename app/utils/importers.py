@@ -0,0 +1,85 @@
+import codecs
+import csv
+import io
+import json
+import re
+from typing import Any, Dict, IO, Iterator
+
+# Read size for streamed uploads
+READ_SIZE = 64 * 1024
+
+_DATE_ONLY = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+_JSON_SKIP = re.compile(r'\A[\s,]+')
+
+
+class ImportFormatError(ValueError):
+    """Raised when an upload is not a CSV file or a JSON array"""
+
+
+def _normalize_csv_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    # Spreadsheet exports leave empty cells and often drop the time part
+    row = {
+        key.strip(): value
+        for key, value in row.items()
+        if key and value not in ('', None)
+    }
+    date = row.get('date')
+    if isinstance(date, str) and _DATE_ONLY.match(date.strip()):
+        row['date'] = f'{date.strip()}T00:00:00'
+    return row
+
+
+def iter_csv_rows(stream: IO[bytes]) -> Iterator[Dict[str, Any]]:
+    """Yield one dict per CSV data row without reading the whole upload"""
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    for row in csv.DictReader(text):
+        yield _normalize_csv_row(row)
+
+
+def iter_json_array(stream: IO[bytes]) -> Iterator[Any]:
+    """Yield the elements of a top-level JSON array incrementally"""
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buffer, eof
+        chunk = stream.read(READ_SIZE)
+        if not chunk:
+            eof = True
+            buffer += text_decoder.decode(b'', final=True)
+            return False
+        # Incremental decoding copes with characters split across reads
+        buffer += text_decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+        return True
+
+    # Opening bracket
+    while not buffer.lstrip() and fill():
+        pass
+    buffer = buffer.lstrip('\ufeff').lstrip()
+    if not buffer.startswith('['):
+        raise ImportFormatError('Expected a JSON array')
+    buffer = buffer[1:]
+
+    while True:
+        buffer = _JSON_SKIP.sub('', buffer)
+        if not buffer:
+            if not fill():
+                raise ImportFormatError('Unterminated JSON array')
+            continue
+        if buffer[0] == ']':
+            return
+        try:
+            item, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            # Element split across reads: fetch more before giving up
+            if eof or not fill():
+                raise ImportFormatError('Invalid JSON array element')
+            continue
+        if end == len(buffer) and not eof and not isinstance(item, (dict, list, str)):
+            # A bare number may continue in the next read
+            if fill():
+                continue
+        yield item
+        buffer = buffer[end:]
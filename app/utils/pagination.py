@@ -1,6 +1,7 @@
 from flask import request
 from typing import Tuple
 
+
 def get_pagination_params() -> Tuple[int, int]:
     """Get pagination parameters from request args"""
     try:
@@ -8,4 +9,4 @@ def get_pagination_params() -> Tuple[int, int]:
         limit = min(int(request.args.get('limit', 100)), 1000)
         return max(0, skip), max(1, limit)
     except ValueError:
-        return 0, 100
\ No newline at end of file
+        return 0, 100
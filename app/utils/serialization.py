@@ -0,0 +1,95 @@
+from datetime import date
+from typing import Any, Callable, Dict, List, Tuple, Type, cast
+import orjson
+from bson import ObjectId
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+from marshmallow import Schema, fields
+from app.models.transaction import TransactionSchema
+
+_MISSING = object()
+
+
+def _isoformat(value: Any) -> Any:
+    # Dates stored as strings by older writes pass through unchanged
+    return value.isoformat() if isinstance(value, date) else value
+
+
+# marshmallow field type -> conversion applied to non-None values on dump
+_CONVERTERS: Dict[type, Callable[[Any], Any]] = {
+    fields.String: str,
+    fields.Float: float,
+    fields.Integer: int,
+    fields.Boolean: bool,
+    fields.DateTime: _isoformat,
+}
+
+
+def compile_serializer(schema: Schema) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """A dump function equivalent to `schema.dump` for plain documents
+
+    Field lookups, output keys and converters are resolved once here, so
+    each document costs one dict lookup and one conversion per field
+    instead of marshmallow's per-field dispatch. Fields without a known
+    converter fall back to their own `serialize`.
+    """
+    plan: List[Tuple[str, str, Callable[[Any], Any]]] = []
+    for name, field in schema.dump_fields.items():
+        convert = _CONVERTERS.get(type(field))
+        if convert is None:
+
+            def convert(
+                value: Any, _name: str = name, _field: fields.Field = field
+            ) -> Any:
+                return _field.serialize(_name, {_name: value})
+
+        plan.append((field.data_key or name, field.attribute or name, convert))
+
+    def serialize(doc: Dict[str, Any]) -> Dict[str, Any]:
+        out = {}
+        for key, attribute, convert in plan:
+            value = doc.get(attribute, _MISSING)
+            if value is _MISSING:
+                continue
+            out[key] = None if value is None else convert(value)
+        return out
+
+    return serialize
+
+
+serialize_transaction = compile_serializer(TransactionSchema())
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    return DefaultJSONProvider.default(value)
+
+
+def dumps(obj: Any, sort_keys: bool = False) -> bytes:
+    """orjson encoding that also accepts ObjectId and non-string keys"""
+    option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+    return orjson.dumps(obj, default=_default, option=option)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson
+
+    `jsonify` responses are encoded straight to bytes. Datetimes are
+    written as ISO 8601 (the format the schema dumps them in) rather than
+    Flask's HTTP date format.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return dumps(obj, kwargs.get('sort_keys', self.sort_keys)).decode()
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        # _app is typed as the sansio App, whose response class takes no body
+        response_class = cast(Type[Response], self._app.response_class)
+        return response_class(
+            dumps(obj, self.sort_keys) + b'\n', mimetype=self.mimetype
+        )
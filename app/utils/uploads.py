@@ -0,0 +1,120 @@
+import os
+from tempfile import SpooledTemporaryFile
+from typing import AsyncIterable, IO, Iterable, Optional, Tuple
+from flask import request
+from app.services.image_store import IMAGE_CONTENT_TYPES
+
+# Read size when copying request bodies
+READ_SIZE = 64 * 1024
+# Uploads larger than this roll over from memory to a temporary file
+SPOOL_MEMORY_LIMIT = 1024 * 1024
+
+# Allowance for multipart boundaries and form fields on top of the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+# Raw request bodies accepted as an image upload: the bill image types, or
+# untyped bytes that the image store sniffs (never image/svg+xml or HTML)
+RAW_IMAGE_TYPES = IMAGE_CONTENT_TYPES | {'application/octet-stream'}
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured size limit; answer 413"""
+
+
+def is_raw_image(mimetype: Optional[str]) -> bool:
+    return mimetype in RAW_IMAGE_TYPES
+
+
+def _limit_error(max_bytes: int) -> UploadTooLargeError:
+    return UploadTooLargeError(f'Upload exceeds {max_bytes} bytes')
+
+
+def spool_chunks(chunks: Iterable[bytes], max_bytes: int) -> IO[bytes]:
+    """Copy chunks into a spooled temp file (rewound), enforcing max_bytes"""
+    spool = SpooledTemporaryFile(max_size=SPOOL_MEMORY_LIMIT)
+    size = 0
+    for chunk in chunks:
+        size += len(chunk)
+        if size > max_bytes:
+            spool.close()
+            raise _limit_error(max_bytes)
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+
+async def spool_chunks_async(chunks: AsyncIterable[bytes], max_bytes: int) -> IO[bytes]:
+    spool = SpooledTemporaryFile(max_size=SPOOL_MEMORY_LIMIT)
+    size = 0
+    async for chunk in chunks:
+        size += len(chunk)
+        if size > max_bytes:
+            spool.close()
+            raise _limit_error(max_bytes)
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+
+def iter_stream(stream: IO[bytes]) -> Iterable[bytes]:
+    return iter(lambda: stream.read(READ_SIZE), b'')
+
+
+def open_upload(stream: IO[bytes], max_bytes: int) -> IO[bytes]:
+    """A rewound, size-checked file for an upload stream
+
+    Already spooled streams (multipart files) are checked in place instead
+    of being copied again; anything else is spooled.
+    """
+    if stream.seekable():
+        size = stream.seek(0, os.SEEK_END)
+        if size > max_bytes:
+            raise _limit_error(max_bytes)
+        stream.seek(0)
+        return stream
+    return spool_chunks(iter_stream(stream), max_bytes)
+
+
+def read_upload(upload: IO[bytes]) -> bytes:
+    """The upload's bytes, read in one go
+
+    BytesIO over these bytes shares them instead of copying, so this is the
+    only copy between the request body and PIL (and the payload OCR workers
+    are sent), where the base64 path needed a split, a decode and a copy.
+    """
+    upload.seek(0)
+    return upload.read()
+
+
+def _declared_type(mimetype: Optional[str]) -> Optional[str]:
+    # Anything but a bill image type (e.g. a multipart part declared as
+    # text/html) is dropped; the image store sniffs the bytes instead
+    return mimetype if mimetype in IMAGE_CONTENT_TYPES else None
+
+
+def request_image_upload(
+    field: str, max_bytes: int
+) -> Optional[Tuple[bytes, Optional[str]]]:
+    """(bytes, content type) of an image sent as a multipart file or raw body
+
+    Returns None for other requests (e.g. JSON with a base64 image), raises
+    UploadTooLargeError past max_bytes.
+    """
+    if request.mimetype == 'multipart/form-data':
+        if (
+            request.content_length
+            and request.content_length > max_bytes + MULTIPART_OVERHEAD
+        ):
+            raise _limit_error(max_bytes)
+        upload = request.files.get(field)
+        if upload is None:
+            return None
+        return read_upload(open_upload(upload.stream, max_bytes)), _declared_type(
+            upload.mimetype
+        )
+    if is_raw_image(request.mimetype):
+        if request.content_length and request.content_length > max_bytes:
+            raise _limit_error(max_bytes)
+        with spool_chunks(iter_stream(request.stream), max_bytes) as spool:
+            return read_upload(spool), _declared_type(request.mimetype)
+    return None
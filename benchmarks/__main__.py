@@ -0,0 +1,145 @@
+"""Benchmark suite: seeded data, startup, micro-benchmarks and HTTP load scenarios
+
+    python -m benchmarks --size 10k --output results.json
+    python -m benchmarks --size 100k --baseline baseline.json --fail-on-regression
+    python -m benchmarks --mongomock --size 10k          # no mongod needed
+    python -m benchmarks --url http://localhost:5000 --no-seed
+
+Results are written as JSON; with --baseline every shared metric is
+compared and slowdowns beyond --tolerance are reported as regressions.
+"""
+
+import argparse
+import sys
+import time
+from typing import List, Optional
+from flask import Flask
+from config import Config
+from app import create_app
+from app.database import get_client, set_client
+from benchmarks import data, load, micro, results, startup
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks', description=__doc__.splitlines()[0]
+    )
+    parser.add_argument(
+        '--size', default='10k', help='Transactions to seed: 10k, 100k, 1m or a number.'
+    )
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument(
+        '--database', default='petty_cash_bench', help='Database seeded and served.'
+    )
+    parser.add_argument(
+        '--mongomock',
+        action='store_true',
+        help='Use an in-memory mongomock client instead of MONGODB_URL.',
+    )
+    parser.add_argument(
+        '--url', help='Load-test a running server instead of an in-process app.'
+    )
+    parser.add_argument(
+        '--no-seed', action='store_true', help='Reuse the data already in --database.'
+    )
+    parser.add_argument('--no-micro', action='store_true')
+    parser.add_argument('--no-load', action='store_true')
+    parser.add_argument(
+        '--requests', type=int, default=200, help='Requests per load scenario.'
+    )
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument(
+        '--ocr-images', type=int, default=8, help='OCR requests (0 skips OCR).'
+    )
+    parser.add_argument(
+        '--micro-ops', type=int, default=2000, help='Inputs per micro-benchmark.'
+    )
+    parser.add_argument(
+        '--startup-runs',
+        type=int,
+        default=5,
+        help='Fresh worker starts timed (0 skips).',
+    )
+    parser.add_argument('--output', default='benchmark-results.json')
+    parser.add_argument('--baseline', help='Earlier results file to compare against.')
+    parser.add_argument(
+        '--tolerance', type=float, default=0.25, help='Allowed slowdown, e.g. 0.25.'
+    )
+    parser.add_argument('--fail-on-regression', action='store_true')
+    return parser.parse_args(argv)
+
+
+def build_app(args: argparse.Namespace) -> Flask:
+    if args.mongomock:
+        import mongomock
+        import mongomock.gridfs
+
+        mongomock.gridfs.enable_gridfs_integration()
+        set_client(mongomock.MongoClient())
+    config = type(
+        'BenchmarkConfig',
+        (Config,),
+        {
+            'DATABASE_NAME': args.database,
+            # An explain() per request would skew latencies, and mongomock has none
+            'QUERY_GUARD': False,
+            # Load scenarios repeat the same requests; measure queries, not cache hits
+            'QUERY_CACHE': False,
+            # mongomock checks unique indexes by scanning, which only slows seeding
+            'MONGO_CREATE_INDEXES': not args.mongomock,
+        },
+    )
+    return create_app(config)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    meta = {**results.environment(), 'args': dict(vars(args))}
+    measured = {}
+
+    if args.startup_runs:
+        measured.update(startup.run(args.startup_runs))
+
+    if not args.no_micro:
+        measured.update(micro.run(args.micro_ops, args.seed))
+
+    if not args.no_load:
+        if args.mongomock and not args.url and args.concurrency > 1:
+            # mongomock is not thread-safe; concurrent requests corrupt its cursors
+            print(
+                'mongomock: running load scenarios with concurrency 1', file=sys.stderr
+            )
+            args.concurrency = meta['args']['concurrency'] = 1
+        app = build_app(args)
+        if not args.no_seed:
+            count = data.parse_size(args.size)
+            started = time.perf_counter()
+            data.seed_database(get_client(app.config)[args.database], count, args.seed)
+            measured['seed.transactions'] = {
+                'count': count,
+                'seconds': round(time.perf_counter() - started, 3),
+            }
+        client = load.HttpClient(args.url) if args.url else load.InProcessClient(app)
+        measured.update(
+            load.run(
+                client.send, args.requests, args.concurrency, args.ocr_images, args.seed
+            )
+        )
+
+    for name, values in measured.items():
+        print(f'{name:<36} ' + '  '.join(f'{k}={v}' for k, v in values.items()))
+    results.save(args.output, meta, measured)
+    print(f'Saved {args.output}')
+
+    if args.baseline:
+        rows = results.compare(
+            results.load(args.baseline)['results'], measured, args.tolerance
+        )
+        results.print_comparison(rows)
+        if args.fail_on_regression and any(row['regression'] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""Seeded synthetic data: transactions, receipt texts and receipt images
+
+The same seed always produces the same documents, texts and images, so
+benchmark runs on different machines or commits measure the same work.
+"""
+
+import io
+import math
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Tuple
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+from pymongo.database import Database
+from app.services.balance_service import BalanceLedger
+from app.services.category_classifier import DEFAULT_TAXONOMY
+from app.services.rollup_service import PeriodRollups
+
+SIZES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+
+START_DATE = datetime(2023, 1, 1)
+DAYS = 730
+PEOPLE = [
+    f'{first} {last}'
+    for first in ('Ana', 'Ben', 'Chen', 'Dara', 'Eli', 'Farah', 'Gus')
+    for last in ('Ito', 'Khan', 'Lopez', 'Moss', 'Novak', 'Okafor', 'Park')
+]
+PROJECTS = [
+    f'Project {name}'
+    for name in (
+        'Atlas',
+        'Beacon',
+        'Cedar',
+        'Delta',
+        'Ember',
+        'Falcon',
+        'Granite',
+        'Harbor',
+        'Iris',
+        'Juniper',
+    )
+]
+CATEGORIES = list(DEFAULT_TAXONOMY) + ['Miscellaneous']
+VENDORS = [
+    'Cafe Luna',
+    'Metro Taxi',
+    'Paper & Co',
+    'City Power',
+    'Tech Depot',
+    'Grand Hotel',
+    'Corner Store',
+    'Rail Express',
+]
+
+INSERT_BATCH_SIZE = 10_000
+
+
+def parse_size(size: str) -> int:
+    """'10k' / '100k' / '1m' or a plain number of transactions"""
+    return SIZES.get(size.lower()) or int(size)
+
+
+def _description(rng: random.Random, category: str) -> str:
+    keywords = DEFAULT_TAXONOMY.get(category) or ['supplies', 'sundries', 'misc']
+    vendor = rng.choice(VENDORS)
+    return f'{rng.choice(keywords).title()} - {vendor} #{rng.randrange(1, 10_000)}'
+
+
+def generate_transactions(count: int, seed: int = 42) -> Iterator[Dict[str, Any]]:
+    """Realistic transaction documents: skewed people/projects, log-normal amounts"""
+    rng = random.Random(seed)
+    # A few heavy spenders and busy projects, like real petty cash books
+    people_weights = [1 / (rank + 1) for rank in range(len(PEOPLE))]
+    project_weights = [1 / math.sqrt(rank + 1) for rank in range(len(PROJECTS))]
+    for _ in range(count):
+        receipt = rng.random() < 0.12
+        category = 'Miscellaneous' if receipt else rng.choice(CATEGORIES)
+        yield {
+            'date': START_DATE + timedelta(seconds=rng.randrange(DAYS * 86400)),
+            'description': 'Cash advance' if receipt else _description(rng, category),
+            'amount': round(
+                (
+                    rng.lognormvariate(7.5, 0.6)
+                    if receipt
+                    else rng.lognormvariate(3.3, 1.0)
+                ),
+                2,
+            ),
+            'type': 'receipt' if receipt else 'expense',
+            'category': category,
+            'person': rng.choices(PEOPLE, people_weights)[0],
+            'project': rng.choices(PROJECTS, project_weights)[0],
+        }
+
+
+def seed_database(db: Database, count: int, seed: int = 42) -> int:
+    """Replace the transactions in `db` with `count` generated ones
+
+    The balances ledger and period rollups are rebuilt afterwards so every
+    read endpoint sees consistent data.
+    """
+    db.transactions.delete_many({})
+    batch: List[dict] = []
+    for doc in generate_transactions(count, seed):
+        batch.append(doc)
+        if len(batch) == INSERT_BATCH_SIZE:
+            db.transactions.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        db.transactions.insert_many(batch, ordered=False)
+    BalanceLedger(db).rebuild()
+    PeriodRollups(db).rebuild()
+    return count
+
+
+def receipt_text(rng: random.Random) -> Tuple[str, float]:
+    """A receipt-like OCR text and its total"""
+    items = [
+        (
+            rng.choice(
+                ['Coffee', 'Sandwich', 'Paper A4', 'Toner', 'Taxi fare', 'Room']
+            ),
+            round(rng.uniform(1, 120), 2),
+        )
+        for _ in range(rng.randrange(1, 6))
+    ]
+    subtotal = round(sum(price for _, price in items), 2)
+    tax = round(subtotal * 0.08, 2)
+    total = round(subtotal + tax, 2)
+    lines = [
+        rng.choice(VENDORS),
+        f'{rng.randrange(1, 28):02d}/{rng.randrange(1, 13):02d}/2024',
+    ]
+    lines += [f'{name:<16}{price:>8.2f}' for name, price in items]
+    lines += [
+        f"{'SUBTOTAL':<16}{subtotal:>8.2f}",
+        f"{'TAX':<16}{tax:>8.2f}",
+        f"{'TOTAL':<16}{total:>8.2f}",
+        'THANK YOU',
+    ]
+    return '\n'.join(lines), total
+
+
+def receipt_texts(count: int, seed: int = 42) -> List[Tuple[str, float]]:
+    rng = random.Random(seed)
+    return [receipt_text(rng) for _ in range(count)]
+
+
+def receipt_image(text: str, seed: int = 42, skew: float = 3.0) -> bytes:
+    """Render receipt text as a noisy, slightly rotated photo-like JPEG"""
+    rng = np.random.default_rng(seed)
+    font = ImageFont.load_default()
+    lines = text.splitlines()
+    paper = Image.new('L', (420, 40 + 28 * len(lines)), 245)
+    draw = ImageDraw.Draw(paper)
+    for row, line in enumerate(lines):
+        draw.text((30, 20 + 28 * row), line, fill=20, font=font)
+    paper = paper.resize((paper.width * 2, paper.height * 2))
+
+    # Paper on a darker background, rotated a little, with sensor noise
+    photo = Image.new('L', (paper.width + 200, paper.height + 200), 90)
+    photo.paste(paper, (100, 100))
+    photo = photo.rotate(float(rng.uniform(-skew, skew)), fillcolor=90)
+    pixels = np.asarray(photo, dtype=np.int16) + rng.normal(
+        0, 8, (photo.height, photo.width)
+    )
+    photo = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+
+    buffer = io.BytesIO()
+    photo.save(buffer, format='JPEG', quality=85)
+    return buffer.getvalue()
+
+
+def receipt_images(count: int, seed: int = 42) -> List[Tuple[bytes, float]]:
+    return [
+        (receipt_image(text, seed + index), total)
+        for index, (text, total) in enumerate(receipt_texts(count, seed))
+    ]
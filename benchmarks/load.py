@@ -0,0 +1,154 @@
+"""HTTP load scenarios against the Flask app (in process) or a running server"""
+
+import random
+import shutil
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+from urllib.parse import urlencode
+from flask import Flask
+from benchmarks.data import receipt_images
+from benchmarks.micro import filter_args
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    body: Optional[bytes] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+class InProcessClient:
+    """Sends requests through Flask test clients (one per thread)"""
+
+    def __init__(self, app: Flask) -> None:
+        self.app = app
+        self._local = threading.local()
+
+    def send(self, request: Request) -> int:
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.open(
+            request.path,
+            method=request.method,
+            data=request.body,
+            headers=request.headers,
+        )
+        response.close()
+        status: int = response.status_code
+        return status
+
+
+class HttpClient:
+    """Sends requests to a running server, e.g. http://localhost:5000"""
+
+    def __init__(self, base_url: str, timeout: float = 120):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def send(self, request: Request) -> int:
+        http_request = urllib.request.Request(
+            self.base_url + request.path,
+            data=request.body,
+            headers=request.headers,
+            method=request.method,
+        )
+        try:
+            with urllib.request.urlopen(http_request, timeout=self.timeout) as response:
+                response.read()
+                status: int = response.status
+                return status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+
+def _percentile(ordered: Sequence[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def run_scenario(
+    send: Callable[[Request], int], requests: List[Request], concurrency: int
+) -> Dict[str, float]:
+    """Issue `requests` from `concurrency` threads; return latencies and throughput"""
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def issue(request: Request) -> None:
+        nonlocal errors
+        started = time.perf_counter()
+        try:
+            ok = send(request) < 400
+        except Exception:
+            ok = False
+        elapsed = (time.perf_counter() - started) * 1000
+        with lock:
+            latencies.append(elapsed)
+            errors += not ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(issue, requests))
+    wall = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    return {
+        'requests': len(ordered),
+        'errors': errors,
+        'concurrency': concurrency,
+        'p50_ms': round(_percentile(ordered, 0.50), 3),
+        'p95_ms': round(_percentile(ordered, 0.95), 3),
+        'p99_ms': round(_percentile(ordered, 0.99), 3),
+        'rps': round(len(ordered) / wall, 2),
+    }
+
+
+def scenarios(
+    requests: int, ocr_images: int, seed: int = 42
+) -> Dict[str, List[Request]]:
+    """Request lists for the list, filter, balances and OCR scenarios"""
+    rng = random.Random(seed)
+    plans = {
+        'list': [
+            Request(
+                'GET',
+                f'/api/transactions/?limit=100&skip={rng.randrange(0, 1000, 100)}',
+            )
+            for _ in range(requests)
+        ],
+        'filter': [
+            Request('GET', '/api/transactions/?' + urlencode({**args, 'limit': 50}))
+            for args in filter_args(requests, seed)
+        ],
+        'balances': [
+            Request('GET', '/api/transactions/balances') for _ in range(requests)
+        ],
+    }
+    if ocr_images and shutil.which('tesseract'):
+        # Distinct images, so each request runs the full OCR pipeline once
+        plans['ocr'] = [
+            Request(
+                'POST', '/api/ocr/analyze-bill', image, {'Content-Type': 'image/jpeg'}
+            )
+            for image, _ in receipt_images(ocr_images, seed)
+        ]
+    return plans
+
+
+def run(
+    send: Callable[[Request], int],
+    requests: int = 200,
+    concurrency: int = 8,
+    ocr_images: int = 8,
+    seed: int = 42,
+) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for name, plan in scenarios(requests, ocr_images, seed).items():
+        results[f'load.{name}'] = run_scenario(send, plan, concurrency)
+    return results
@@ -0,0 +1,77 @@
+"""Micro-benchmarks for the per-request hot paths that do not touch MongoDB"""
+
+import random
+import timeit
+from itertools import islice
+from typing import Any, Callable, Dict, List, Sequence
+from bson import ObjectId
+from app.models.transaction import TransactionSchema
+from app.services.category_classifier import CategoryClassifier, DEFAULT_TAXONOMY
+from app.services.receipt_parser import extract_fields
+from app.utils.filters import build_transaction_filters
+from app.utils.serialization import serialize_transaction
+from benchmarks.data import (
+    CATEGORIES,
+    PEOPLE,
+    PROJECTS,
+    generate_transactions,
+    receipt_texts,
+)
+
+
+def measure(
+    operation: Callable[[Any], Any], inputs: Sequence[Any], repeat: int = 5
+) -> Dict[str, float]:
+    """Best-of-`repeat` time per call of `operation` over all `inputs`"""
+
+    def batch() -> None:
+        for item in inputs:
+            operation(item)
+
+    best = min(timeit.repeat(batch, number=1, repeat=repeat))
+    return {'us_per_op': round(best / len(inputs) * 1e6, 3), 'ops': len(inputs)}
+
+
+def filter_args(count: int, seed: int = 42) -> List[Dict[str, str]]:
+    """Query strings as the list endpoints receive them"""
+    rng = random.Random(seed)
+    args = []
+    for _ in range(count):
+        params = {'sort_field': 'date', 'sort_direction': 'desc'}
+        if rng.random() < 0.5:
+            params['person'] = rng.choice(PEOPLE)
+        if rng.random() < 0.3:
+            params['project'] = rng.choice(PROJECTS)
+        if rng.random() < 0.3:
+            params['category'] = rng.choice(CATEGORIES)
+        if rng.random() < 0.4:
+            params['start_date'] = f'2023-{rng.randrange(1, 13):02d}-01'
+            params['end_date'] = '2024-12-31'
+        if rng.random() < 0.2:
+            params['search'] = rng.choice(['taxi', 'paper', 'lunch'])
+        args.append(params)
+    return args
+
+
+def run(
+    count: int = 2000, seed: int = 42, repeat: int = 5
+) -> Dict[str, Dict[str, float]]:
+    texts = [text for text, _ in receipt_texts(count, seed)]
+    docs = [
+        {'_id': ObjectId(), **doc}
+        for doc in islice(generate_transactions(count, seed), count)
+    ]
+    classifier = CategoryClassifier(DEFAULT_TAXONOMY)
+    schema = TransactionSchema()
+
+    return {
+        'micro.build_transaction_filters': measure(
+            build_transaction_filters, filter_args(count, seed), repeat
+        ),
+        'micro.extract_amount': measure(
+            lambda text: extract_fields(text)['total'], texts, repeat
+        ),
+        'micro.suggest_category': measure(classifier.classify, texts, repeat),
+        'micro.schema_dump': measure(schema.dump, docs, repeat),
+        'micro.compiled_dump': measure(serialize_transaction, docs, repeat),
+    }
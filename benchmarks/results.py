@@ -0,0 +1,90 @@
+"""Saving benchmark results as JSON and comparing them with a baseline"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, List, TextIO
+
+# Metrics where a smaller value is better; everything in HIGHER_IS_BETTER
+# is inverted, other numbers (request counts, ...) are not compared
+LOWER_IS_BETTER = ('us_per_op', 'p50_ms', 'p95_ms', 'p99_ms', 'seconds')
+HIGHER_IS_BETTER = ('rps',)
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def save(path: str, meta: Dict[str, Any], results: Dict[str, Dict[str, Any]]) -> None:
+    with open(path, 'w') as f:
+        json.dump({'meta': meta, 'results': results}, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        loaded: Dict[str, Any] = json.load(f)
+    return loaded
+
+
+def compare(
+    baseline: Dict[str, Dict[str, Any]],
+    current: Dict[str, Dict[str, Any]],
+    tolerance: float = 0.25,
+) -> List[Dict[str, Any]]:
+    """Per-metric changes between two result sets
+
+    `change` is the relative slowdown (positive = worse) whatever the
+    metric's direction; rows beyond `tolerance` are flagged as regressions.
+    """
+    rows = []
+    for name in sorted(set(baseline) & set(current)):
+        for metric in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+            before, after = baseline[name].get(metric), current[name].get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            if metric in HIGHER_IS_BETTER:
+                change = -change
+            rows.append(
+                {
+                    'benchmark': name,
+                    'metric': metric,
+                    'baseline': before,
+                    'current': after,
+                    'change': round(change, 4),
+                    'regression': change > tolerance,
+                }
+            )
+    return rows
+
+
+def print_comparison(rows: List[Dict[str, Any]], out: TextIO = sys.stdout) -> None:
+    for row in rows:
+        flag = '  REGRESSION' if row['regression'] else ''
+        print(
+            f"{row['benchmark']:<36} {row['metric']:<10} {row['baseline']:>12} -> "
+            f"{row['current']:>12} {row['change']:+8.1%}{flag}",
+            file=out,
+        )
@@ -0,0 +1,86 @@
+"""Micro-benchmark: serializing a page of transactions for a list response
+
+Compares the marshmallow `TransactionSchema.dump` + stdlib json path the
+list endpoints used with the compiled serializer + orjson path.
+
+    python -m benchmarks.serialization [--rows 1000] [--repeat 20]
+"""
+
+import argparse
+import json
+import timeit
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+from bson import ObjectId
+from app.models.transaction import TransactionSchema
+from app.utils.serialization import dumps, serialize_transaction
+
+
+def make_documents(rows: int) -> List[dict]:
+    start = datetime(2024, 1, 1)
+    return [
+        {
+            '_id': ObjectId(),
+            'date': start + timedelta(hours=i),
+            'description': f'Receipt {i} for office supplies',
+            'amount': round(i * 1.37 % 500, 2),
+            'type': 'expense' if i % 4 else 'receipt',
+            'category': ('Office Supplies', 'Travel', 'Meals')[i % 3],
+            'person': f'Person {i % 20}',
+            'project': f'Project {i % 7}',
+            'bill_image_id': str(ObjectId()) if i % 2 else None,
+        }
+        for i in range(rows)
+    ]
+
+
+def marshmallow_json(docs: List[dict]) -> bytes:
+    schema = TransactionSchema()
+    return json.dumps([schema.dump(doc) for doc in docs], sort_keys=True).encode()
+
+
+def compiled_orjson(docs: List[dict]) -> bytes:
+    return dumps([serialize_transaction(doc) for doc in docs], sort_keys=True)
+
+
+def marshmallow_dump(docs: List[dict]) -> list:
+    schema = TransactionSchema()
+    return [schema.dump(doc) for doc in docs]
+
+
+def compiled_dump(docs: List[dict]) -> list:
+    return [serialize_transaction(doc) for doc in docs]
+
+
+CASES: Dict[str, Callable[[List[dict]], object]] = {
+    'marshmallow dump': marshmallow_dump,
+    'compiled dump': compiled_dump,
+    'marshmallow + json': marshmallow_json,
+    'compiled + orjson': compiled_orjson,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    docs = make_documents(args.rows)
+    # Same output, so only the speed differs
+    assert json.loads(marshmallow_json(docs)) == json.loads(compiled_orjson(docs))
+
+    baseline = 0.0
+    for name, case in CASES.items():
+        best = (
+            min(timeit.repeat(lambda: case(docs), number=1, repeat=args.repeat)) * 1000
+        )
+        if name.startswith('marshmallow'):
+            baseline = best
+            print(f'{name:<20} {best:8.2f} ms')
+        else:
+            print(f'{name:<20} {best:8.2f} ms  ({baseline / best:.1f}x faster)')
+
+
+if __name__ == '__main__':
+    main()
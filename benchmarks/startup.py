@@ -0,0 +1,125 @@
+"""Startup benchmark: how fast a fresh worker process can serve requests
+
+Each run starts a new interpreter and times importing the Flask app,
+`create_app` with the deployed Config and, when FastAPI is installed,
+importing `app.main`. Index creation is not part of worker startup (it runs
+once per deploy via `flask ensure-indexes`), so it is not timed here. It
+also records which heavy optional modules (OCR, auth) got loaded along the
+way; they should only be imported by the first request that needs them.
+
+    python -m benchmarks.startup [--runs 10]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules a web worker should not need until an OCR or auth request arrives
+HEAVY_MODULES = ('pytesseract', 'PIL', 'numpy', 'passlib', 'jose')
+
+FLASK_PROBE = '''
+import json, sys, time
+started = time.perf_counter()
+from config import Config
+from app import create_app
+imported = time.perf_counter()
+create_app(Config)
+created = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'loaded': [name for name in %r if name in sys.modules],
+}))
+''' % (HEAVY_MODULES,)
+
+FASTAPI_PROBE = '''
+import json, sys, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'loaded': [name for name in %r if name in sys.modules],
+}))
+''' % (HEAVY_MODULES,)
+
+# The FastAPI settings refuse to load without these
+FASTAPI_ENV = {
+    'MONGODB_URL': 'mongodb://localhost:27017',
+    'DATABASE_NAME': 'petty_cash',
+    'SECRET_KEY': 'startup',
+}
+
+
+def _probe(code: str, env: Dict[str, str]) -> Dict[str, Any]:
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    measured: Dict[str, Any] = json.loads(completed.stdout.strip().splitlines()[-1])
+    measured['process_ms'] = (time.perf_counter() - started) * 1000
+    return measured
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    return {
+        'p50_ms': round(statistics.median(samples), 3),
+        'min_ms': round(min(samples), 3),
+        'runs': len(samples),
+    }
+
+
+def _fastapi_available() -> bool:
+    try:
+        import fastapi  # noqa: F401
+        import motor  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def run(runs: int = 5) -> Dict[str, Dict[str, Any]]:
+    env = {
+        **os.environ,
+        'PYTHONPATH': os.pathsep.join(
+            filter(None, [ROOT, os.environ.get('PYTHONPATH')])
+        ),
+    }
+    probes = {'flask': (FLASK_PROBE, env)}
+    if _fastapi_available():
+        probes['fastapi'] = (FASTAPI_PROBE, {**FASTAPI_ENV, **env})
+
+    results = {}
+    for name, (code, probe_env) in probes.items():
+        measured = [_probe(code, probe_env) for _ in range(runs)]
+        for metric in ('process_ms', 'import_ms', 'create_app_ms'):
+            if metric in measured[0]:
+                results[f'startup.{name}.{metric[:-3]}'] = _summary(
+                    [m[metric] for m in measured]
+                )
+        results[f'startup.{name}.import']['heavy_modules'] = measured[-1]['loaded']
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args(argv)
+    for name, values in run(args.runs).items():
+        print(f'{name:<36} ' + '  '.join(f'{k}={v}' for k, v in values.items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -3,26 +3,92 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+
 class Config:
     MONGODB_URL = os.getenv('MONGODB_URL', 'mongodb://localhost:27017')
     DATABASE_NAME = os.getenv('DATABASE_NAME', 'petty_cash_db')
+    # Connection pool for the process-wide MongoClient (one per worker)
+    MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', '50'))
+    MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', '0'))
+    MONGO_MAX_IDLE_TIME_MS = int(os.getenv('MONGO_MAX_IDLE_TIME_MS', '300000'))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', '5000'))
     SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key-here')
     DEBUG = os.getenv('FLASK_DEBUG', '0') == '1'
     TESTING = False
+    # Also create registered indexes (app.indexes) when each app starts; off
+    # by default so workers start fast, run `flask ensure-indexes` on deploy
+    MONGO_CREATE_INDEXES = os.getenv('MONGO_CREATE_INDEXES', '0') == '1'
+    # explain() generated queries and flag COLLSCAN / in-memory SORT plans
+    QUERY_GUARD = os.getenv('QUERY_GUARD', '0') == '1'
+    QUERY_GUARD_MIN_DOCS = int(os.getenv('QUERY_GUARD_MIN_DOCS', '1000'))
+    QUERY_GUARD_STRICT = False
+    # Largest bill image accepted as a multipart or raw-body upload
+    UPLOAD_MAX_BYTES = int(os.getenv('UPLOAD_MAX_BYTES', str(10 * 1024 * 1024)))
+    # Transaction list/balance result cache: in-memory LRU size, entry TTL in
+    # the optional shared `query_cache` collection
+    QUERY_CACHE = os.getenv('QUERY_CACHE', '1') == '1'
+    QUERY_CACHE_MAX_BYTES = int(
+        os.getenv('QUERY_CACHE_MAX_BYTES', str(32 * 1024 * 1024))
+    )
+    QUERY_CACHE_PERSIST = os.getenv('QUERY_CACHE_PERSIST', '0') == '1'
+    QUERY_CACHE_TTL = int(os.getenv('QUERY_CACHE_TTL', '600'))
+    # Log requests slower than this (ms) with the MongoDB commands they ran; 0 = off
+    SLOW_REQUEST_MS = float(os.getenv('SLOW_REQUEST_MS', '0'))
+    # Documents fetched per getMore when streaming exports
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '1000'))
+    # Rows validated and inserted per insert_many during bulk imports
+    IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', '1000'))
+    # Transactions per bulk_write in the batch recategorize/delete endpoints
+    BULK_BATCH_SIZE = int(os.getenv('BULK_BATCH_SIZE', '500'))
+    # OCR process pool: concurrent Tesseract runs, waiting slots, seconds
+    OCR_MAX_WORKERS = int(os.getenv('OCR_MAX_WORKERS', str(os.cpu_count() or 1)))
+    OCR_MAX_QUEUE = int(os.getenv('OCR_MAX_QUEUE', '16'))
+    OCR_TIMEOUT = float(os.getenv('OCR_TIMEOUT', '60'))
+    OCR_JOB_TTL = float(os.getenv('OCR_JOB_TTL', '600'))
+    # Batch OCR: images in the engine at once per batch, images and bytes per upload
+    OCR_BATCH_CONCURRENCY = int(
+        os.getenv('OCR_BATCH_CONCURRENCY', str(os.cpu_count() or 1))
+    )
+    OCR_BATCH_MAX_IMAGES = int(os.getenv('OCR_BATCH_MAX_IMAGES', '200'))
+    OCR_BATCH_MAX_BYTES = int(os.getenv('OCR_BATCH_MAX_BYTES', str(256 * 1024 * 1024)))
+    # Image preprocessing before Tesseract (app.services.image_pipeline)
+    OCR_MAX_SIDE = int(os.getenv('OCR_MAX_SIDE', '2000'))
+    OCR_THRESHOLD = os.getenv('OCR_THRESHOLD', 'adaptive')
+    OCR_DESKEW = os.getenv('OCR_DESKEW', '1') == '1'
+    OCR_CROP = os.getenv('OCR_CROP', '1') == '1'
+    # OCR result cache: in-memory LRU size, optional Mongo tier and its TTL
+    OCR_CACHE_MAX_BYTES = int(os.getenv('OCR_CACHE_MAX_BYTES', str(16 * 1024 * 1024)))
+    OCR_CACHE_PERSIST = os.getenv('OCR_CACHE_PERSIST', '0') == '1'
+    OCR_CACHE_TTL = int(os.getenv('OCR_CACHE_TTL', str(30 * 24 * 3600)))
+    # Category taxonomy: seconds between reloads, optional learned token scorer
+    CATEGORY_RELOAD_INTERVAL = float(os.getenv('CATEGORY_RELOAD_INTERVAL', '30'))
+    CATEGORY_LEARNED = os.getenv('CATEGORY_LEARNED', '0') == '1'
+    CATEGORY_MODEL_TTL = float(os.getenv('CATEGORY_MODEL_TTL', '3600'))
+    CATEGORY_MODEL_SAMPLE = int(os.getenv('CATEGORY_MODEL_SAMPLE', '50000'))
+
 
 class TestConfig(Config):
     TESTING = True
     DATABASE_NAME = 'test_petty_cash_db'
+    QUERY_GUARD = True
+    QUERY_GUARD_STRICT = True
+    # Tests write to the database directly; only cache tests opt in
+    QUERY_CACHE = False
+    MONGO_CREATE_INDEXES = False
+
 
 class DevelopmentConfig(Config):
     DEBUG = True
+    QUERY_GUARD = True
+
 
 class ProductionConfig(Config):
     DEBUG = False
 
+
 config = {
     'development': DevelopmentConfig,
     'testing': TestConfig,
     'production': ProductionConfig,
-    'default': DevelopmentConfig
-}
\ No newline at end of file
+    'default': DevelopmentConfig,
+}
@@ -0,0 +1,34 @@
+from itertools import islice
+from benchmarks.data import generate_transactions, parse_size
+from benchmarks.results import compare
+from benchmarks.startup import run as run_startup
+
+
+def test_generator_is_deterministic():
+    first = list(islice(generate_transactions(50, seed=7), 50))
+    assert first == list(generate_transactions(50, seed=7))
+    assert first != list(generate_transactions(50, seed=8))
+    assert {doc["type"] for doc in first} <= {"expense", "receipt"}
+
+
+def test_parse_size():
+    assert parse_size("10k") == 10_000
+    assert parse_size("1M") == 1_000_000
+    assert parse_size("2500") == 2500
+
+
+def test_compare_flags_regressions_in_either_direction():
+    baseline = {"load.list": {"p95_ms": 10.0, "rps": 100.0, "requests": 200}}
+    current = {"load.list": {"p95_ms": 14.0, "rps": 90.0, "requests": 100}}
+    rows = {row["metric"]: row for row in compare(baseline, current, tolerance=0.25)}
+    assert set(rows) == {"p95_ms", "rps"}
+    assert rows["p95_ms"]["regression"] and rows["p95_ms"]["change"] == 0.4
+    assert not rows["rps"]["regression"] and rows["rps"]["change"] == 0.1
+
+
+def test_workers_start_without_ocr_or_auth_libraries():
+    measured = run_startup(runs=1)
+    assert measured["startup.flask.import"]["heavy_modules"] == []
+    assert measured["startup.flask.create_app"]["runs"] == 1
+    if "startup.fastapi.import" in measured:
+        assert measured["startup.fastapi.import"]["heavy_modules"] == []
@@ -0,0 +1,127 @@
+import asyncio
+import threading
+from typing import Any, Iterable, List, NoReturn, Optional, Tuple
+from app.services import category_classifier
+from app.services.category_classifier import (
+    DEFAULT_TAXONOMY,
+    CategoryClassifier,
+    ClassifierRegistry,
+    TokenScorer,
+)
+
+
+def test_matches_whole_words_only():
+    classifier = CategoryClassifier(DEFAULT_TAXONOMY)
+    assert classifier.classify('Cafe Luna - lunch special')[0] == 'Meals'
+    # 'pen' inside 'expensive' and 'ink' inside 'drinks' are not keywords
+    assert classifier.classify('expensive drinks') == ('Miscellaneous', 0.0)
+
+
+def test_score_is_share_of_category_keywords():
+    classifier = CategoryClassifier({'Travel': ['taxi', 'hotel', 'train', 'flight']})
+    assert classifier.classify('TAXI to hotel, taxi back') == ('Travel', 0.5)
+
+
+def test_multi_word_keywords():
+    classifier = CategoryClassifier({'Utilities': ['water bill'], 'Meals': ['water']})
+    assert classifier.classify('Monthly water bill')[0] == 'Utilities'
+
+
+def test_learned_scorer_is_used_without_keyword_hits():
+    samples = [('Staples toner cartridge', 'Office Supplies')] * 3 + [
+        ('Shell fuel', 'Travel')
+    ] * 3
+    classifier = CategoryClassifier(DEFAULT_TAXONOMY, TokenScorer.train(samples))
+    category, confidence = classifier.classify('Shell station fuel')
+    assert category == 'Travel'
+    assert confidence > 0
+
+
+class FakeCollection:
+    def __init__(self, docs: List[dict]) -> None:
+        self.docs = docs
+
+    def find(self, query: dict) -> List[dict]:
+        return list(self.docs)
+
+
+def test_registry_recompiles_when_taxonomy_changes():
+    categories = FakeCollection([])
+    db = {'categories': categories}
+    registry = ClassifierRegistry(reload_interval=3600)
+    # An empty collection means the built-in taxonomy
+    assert registry.refresh(db).classify('lunch')[0] == 'Meals'
+
+    categories.docs = [{'_id': 'Gadgets', 'keywords': ['drone']}]
+    assert registry.refresh(db).classify('bought a drone')[0] == 'Miscellaneous'
+    registry.invalidate()
+    assert registry.refresh(db).classify('bought a drone')[0] == 'Gadgets'
+    assert registry.current().classify('lunch')[0] == 'Miscellaneous'
+
+
+def test_registry_keeps_classifier_when_database_fails():
+    from pymongo.errors import ServerSelectionTimeoutError
+
+    class DownCollection:
+        def find(self, query: dict) -> NoReturn:
+            raise ServerSelectionTimeoutError('no servers')
+
+    registry = ClassifierRegistry(reload_interval=3600)
+    classifier = registry.refresh({'categories': DownCollection()})
+    assert classifier.classify('lunch')[0] == 'Meals'
+
+
+class AsyncCursor:
+    def __init__(self, docs: List[dict]) -> None:
+        self.docs = docs
+
+    def sort(self, *args: Any) -> 'AsyncCursor':
+        return self
+
+    def limit(self, count: int) -> 'AsyncCursor':
+        return self
+
+    async def to_list(self, length: Optional[int]) -> List[dict]:
+        await asyncio.sleep(0)
+        return list(self.docs)
+
+
+class AsyncCollection:
+    def __init__(self, docs: List[dict]) -> None:
+        self.docs = docs
+
+    def find(self, *args: Any) -> AsyncCursor:
+        return AsyncCursor(self.docs)
+
+
+class AsyncDatabase(dict):
+    def __init__(self, categories: List[dict], transactions: List[dict]) -> None:
+        super().__init__(categories=AsyncCollection(categories))
+        self.transactions = AsyncCollection(transactions)
+
+
+def test_concurrent_async_refreshes_train_once_off_the_loop(monkeypatch):
+    training_threads = []
+    train = TokenScorer.train.__func__
+
+    def recording_train(
+        cls: type, samples: Iterable[Tuple[str, str]], min_count: int = 3
+    ) -> TokenScorer:
+        training_threads.append(threading.current_thread())
+        return train(cls, samples, min_count)
+
+    monkeypatch.setattr(
+        category_classifier.TokenScorer, 'train', classmethod(recording_train)
+    )
+    samples = [{'description': 'Shell fuel', 'category': 'Travel'}] * 3
+    db = AsyncDatabase([], samples)
+    registry = ClassifierRegistry(reload_interval=3600, learned=True)
+
+    async def scenario() -> threading.Thread:
+        await asyncio.gather(*(registry.refresh_async(db) for _ in range(5)))
+        return threading.current_thread()
+
+    loop_thread = asyncio.run(scenario())
+    assert len(training_threads) == 1
+    assert training_threads[0] is not loop_thread
+    assert registry.current().classify('Shell station fuel')[0] == 'Travel'
@@ -0,0 +1,60 @@
+from datetime import datetime
+import pytest
+from bson import ObjectId
+from app.utils.cursor import (
+    encode_cursor,
+    decode_cursor,
+    build_keyset_query,
+    InvalidCursorError,
+)
+
+
+def test_cursor_round_trip():
+    doc = {'_id': ObjectId(), 'date': datetime(2024, 3, 14, 12, 30)}
+    token = encode_cursor('date', -1, doc)
+    assert decode_cursor(token) == ('date', -1, doc['date'], doc['_id'])
+
+
+@pytest.mark.parametrize(
+    'token', ['', 'not-a-cursor', encode_cursor('bill_image', 1, {'_id': ObjectId()})]
+)
+def test_invalid_cursor(token):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(token)
+
+
+def test_keyset_query_combines_filters():
+    last_id = ObjectId()
+    query = build_keyset_query({'person': 'Jane'}, 'amount', 1, 10.0, last_id)
+    assert query == {
+        '$and': [
+            {'person': 'Jane'},
+            {
+                '$or': [
+                    {'amount': {'$gt': 10.0}},
+                    {'amount': 10.0, '_id': {'$gt': last_id}},
+                ]
+            },
+        ]
+    }
+
+
+@pytest.mark.parametrize(
+    'direction,value,expected',
+    [
+        (1, None, [{'project': {'$ne': None}}, {'project': None, '_id': {'$gt': 'X'}}]),
+        (
+            -1,
+            'P',
+            [
+                {'project': {'$lt': 'P'}},
+                {'project': 'P', '_id': {'$lt': 'X'}},
+                {'project': None},
+            ],
+        ),
+    ],
+)
+def test_keyset_query_steps_across_nulls(direction, value, expected):
+    assert build_keyset_query(None, 'project', direction, value, 'X') == {
+        '$or': expected
+    }
@@ -0,0 +1,43 @@
+import json
+from app.database import get_client, get_db, close_db, _reset_after_fork
+
+
+def test_client_is_shared_across_app_contexts(app):
+    with app.app_context():
+        first = get_db()
+    with app.app_context():
+        second = get_db()
+    assert first.client is second.client
+
+
+def test_close_db_keeps_pooled_client_open(app):
+    with app.app_context():
+        client = get_db().client
+        close_db()
+        assert get_client() is client
+
+
+def test_client_is_recreated_after_fork(app):
+    with app.app_context():
+        parent_client = get_client()
+        _reset_after_fork()
+        try:
+            assert get_client() is not parent_client
+        finally:
+            parent_client.close()
+
+
+def test_clients_follow_the_connection_config(app):
+    config = dict(app.config)
+    assert get_client(config) is get_client(dict(config, DATABASE_NAME='other'))
+    small_pool = get_client(dict(config, MONGO_MAX_POOL_SIZE=5))
+    assert small_pool is not get_client(config)
+    assert small_pool.options.pool_options.max_pool_size == 5
+
+
+def test_pool_stats_endpoint(client):
+    response = client.get('/api/health/db-pool')
+    assert response.status_code == 200
+    stats = json.loads(response.data)
+    assert 'avg_wait_ms' in stats
+    assert 'checkouts' in stats
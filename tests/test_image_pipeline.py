@@ -0,0 +1,70 @@
+import io
+from typing import Tuple
+import numpy as np
+from PIL import Image, ImageDraw
+from app.services.image_pipeline import (
+    adaptive_threshold,
+    crop_to_paper,
+    estimate_skew,
+    pipeline_settings,
+    preprocess,
+)
+from app.services.ocr_service import ocr_settings_fingerprint
+
+
+def receipt(size: Tuple[int, int] = (800, 1200)) -> Image.Image:
+    paper = Image.new('L', size, 255)
+    draw = ImageDraw.Draw(paper)
+    for y in range(60, size[1] - 50, 40):
+        draw.rectangle([60, y, size[0] - 100, y + 12], fill=0)
+    return paper
+
+
+def on_table(paper: Image.Image, angle: float = 0.0) -> Image.Image:
+    table = Image.new('L', (paper.width + 600, paper.height + 600), 60)
+    table.paste(paper, (300, 300))
+    return table.rotate(angle, resample=Image.Resampling.BILINEAR, fillcolor=60)
+
+
+def test_estimates_skew_in_both_directions():
+    for angle in (6, -3.4):
+        gray = np.asarray(on_table(receipt(), angle))
+        assert abs(estimate_skew(gray, 10) + angle) <= 0.3
+
+
+def test_crops_to_paper():
+    gray = np.asarray(on_table(receipt()))
+    cropped = crop_to_paper(gray)
+    assert cropped.shape[0] < 1300 and cropped.shape[1] < 900
+    assert cropped.mean() > gray.mean()
+
+
+def test_adaptive_threshold_handles_uneven_lighting():
+    paper = np.asarray(receipt()).astype(np.float64)
+    # Light falls off from 100% to 40% across the page
+    shade = np.linspace(1.0, 0.4, paper.shape[1])[None, :]
+    gray = (paper * shade + 20 * (paper == 0)).astype(np.uint8)
+    ink = paper == 0
+
+    adaptive = adaptive_threshold(gray, 31, 10) == 0
+    global_ = gray < 128
+    assert (adaptive == ink).mean() > 0.97
+    assert (global_ == ink).mean() < 0.9
+
+
+def test_preprocess_caps_resolution_and_reports_timings():
+    buffer = io.BytesIO()
+    on_table(receipt(), 4).convert('RGB').resize((2800, 3600)).save(buffer, 'JPEG')
+    image, timings = preprocess(
+        Image.open(io.BytesIO(buffer.getvalue())), pipeline_settings(max_side=1000)
+    )
+    assert max(image.size) <= 1100  # deskew may expand the rotated image a little
+    assert set(np.unique(np.asarray(image))) <= {0, 255}
+    assert set(timings) == {'decode', 'downscale', 'crop', 'deskew', 'threshold'}
+
+
+def test_pipeline_settings_change_cache_fingerprint():
+    assert ocr_settings_fingerprint() == ocr_settings_fingerprint(pipeline_settings())
+    assert ocr_settings_fingerprint() != ocr_settings_fingerprint(
+        pipeline_settings(deskew=False)
+    )
@@ -0,0 +1,27 @@
+import io
+import json
+import pytest
+from app.utils import importers
+from app.utils.importers import ImportFormatError, iter_csv_rows, iter_json_array
+
+
+def test_json_array_is_read_incrementally(monkeypatch):
+    monkeypatch.setattr(importers, 'READ_SIZE', 5)
+    items = [
+        {'description': 'Café', 'amount': 12.5},
+        {'description': 'Taxi', 'amount': 100},
+    ]
+    stream = io.BytesIO(json.dumps(items).encode())
+    assert list(iter_json_array(stream)) == items
+
+
+def test_json_array_rejects_other_documents():
+    with pytest.raises(ImportFormatError):
+        list(iter_json_array(io.BytesIO(b'{"description": "Taxi"}')))
+
+
+def test_csv_rows_are_normalized():
+    data = b'date,description,amount,bill_image\n2024-03-01,Paper,12.50,\n'
+    assert list(iter_csv_rows(io.BytesIO(data))) == [
+        {'date': '2024-03-01T00:00:00', 'description': 'Paper', 'amount': '12.50'}
+    ]
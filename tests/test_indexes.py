@@ -0,0 +1,60 @@
+from typing import Any, Dict, List, Tuple
+import pytest
+from app.indexes import INDEXES, guard_query, SlowQueryError
+from app.utils.cursor import SORTABLE_FIELDS
+
+
+class FakeCursor:
+    def __init__(self, explain: Dict[str, Any]) -> None:
+        self._explain = explain
+
+    def sort(self, sort: List[Tuple[str, int]]) -> 'FakeCursor':
+        return self
+
+    def explain(self) -> Dict[str, Any]:
+        return self._explain
+
+
+class FakeCollection:
+    name = 'transactions'
+
+    def __init__(self, stage: str, docs_examined: int) -> None:
+        self._explain = {
+            'queryPlanner': {
+                'winningPlan': {'stage': 'FETCH', 'inputStage': {'stage': stage}}
+            },
+            'executionStats': {'totalDocsExamined': docs_examined},
+        }
+
+    def find(self, query: Dict[str, Any]) -> FakeCursor:
+        return FakeCursor(self._explain)
+
+
+def test_transaction_filter_fields_are_indexed():
+    prefixes = {next(iter(index.document['key'])) for index in INDEXES['transactions']}
+    assert {'date', 'amount', 'person', 'project', 'category', 'type'} <= prefixes
+
+
+def test_sortable_fields_are_indexed():
+    prefixes = {next(iter(index.document['key'])) for index in INDEXES['transactions']}
+    assert SORTABLE_FIELDS <= prefixes
+
+
+def test_guard_flags_large_collscan():
+    with pytest.raises(SlowQueryError):
+        guard_query(
+            FakeCollection('COLLSCAN', 5000), {}, None, min_docs=1000, strict=True
+        )
+
+
+def test_guard_ignores_small_or_indexed_scans():
+    assert guard_query(FakeCollection('COLLSCAN', 10), {}, None, min_docs=1000) is None
+    assert guard_query(FakeCollection('IXSCAN', 5000), {}, None, min_docs=1000) is None
+
+
+def test_ensure_indexes_command(app, db):
+    result = app.test_cli_runner().invoke(args=['ensure-indexes'])
+    assert result.exit_code == 0
+    assert 'person_date_id' in db.transactions.index_information()
+    # Indexes of modules only the FastAPI app imports are included
+    assert 'email' in db.users.index_information()
@@ -0,0 +1,126 @@
+import logging
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, Tuple
+import pytest
+from app import metrics
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics() -> Iterator[None]:
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def command_events(
+    name: str, command: Dict[str, Any], request_id: int = 1, micros: int = 2500
+) -> Tuple[SimpleNamespace, SimpleNamespace]:
+    common = dict(
+        command_name=name, connection_id=("localhost", 27017), request_id=request_id
+    )
+    return (
+        SimpleNamespace(command=command, **common),
+        SimpleNamespace(duration_micros=micros, **common),
+    )
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = metrics.Histogram(
+        "demo_seconds", "Demo.", ("route",), buckets=(0.1, 1.0)
+    )
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, route="/a")
+    lines = histogram.collect()
+    assert 'demo_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{route="/a",le="1.0"} 2' in lines
+    assert 'demo_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'demo_seconds_count{route="/a"} 3' in lines
+    assert 'demo_seconds_sum{route="/a"} 5.55' in lines
+
+
+def test_metrics_endpoint_reports_route_templates(client, db):
+    client.get("/api/transactions/")
+    client.get("/api/transactions/000000000000000000000000")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain")
+    body = response.get_data(as_text=True)
+    assert (
+        'http_request_duration_seconds_count{app="flask",method="GET",'
+        'route="/api/transactions/",status="200"} 1'
+    ) in body
+    assert 'route="/api/transactions/<transaction_id>",status="404"} 1' in body
+
+
+def test_command_listener_times_and_traces_commands():
+    listener = metrics.CommandMetrics()
+    token = metrics.start_trace()
+    started, succeeded = command_events(
+        "find",
+        {"find": "transactions", "filter": {"person": "Ana"}, "sort": {"date": -1}},
+    )
+    listener.started(started)
+    listener.succeeded(succeeded)
+    trace = metrics.end_trace(token)
+
+    assert trace == [
+        {
+            "command": "find",
+            "collection": "transactions",
+            "filter": {"person": "Ana"},
+            "sort": {"date": -1},
+            "ms": 2.5,
+        }
+    ]
+    assert (
+        'mongodb_command_duration_seconds_count{command="find",'
+        'collection="transactions",outcome="ok"} 1'
+    ) in metrics.render()
+
+    # Outside a trace only the histogram is recorded
+    started, failed = command_events(
+        "insert", {"insert": "transactions", "documents": [{}]}, 2
+    )
+    listener.started(started)
+    listener.failed(failed)
+    assert (
+        'command="insert",collection="transactions",outcome="error"} 1'
+        in metrics.render()
+    )
+
+
+def test_slow_requests_are_logged_with_their_commands(caplog):
+    trace = [
+        {"command": "find", "collection": "transactions", "filter": {"person": "Ana"}}
+    ]
+    with caplog.at_level(logging.WARNING, logger="app.slow_requests"):
+        metrics.record_request(
+            "flask", "GET", "/api/transactions/", 200, time.perf_counter(), trace, 0
+        )
+        metrics.record_request(
+            "flask",
+            "GET",
+            "/api/transactions/",
+            200,
+            time.perf_counter() - 1,
+            trace,
+            500,
+            "/api/transactions/?person=Ana",
+        )
+    assert len(caplog.records) == 1
+    message = caplog.records[0].getMessage()
+    assert "/api/transactions/?person=Ana" in message and '"person": "Ana"' in message
+
+
+def test_requests_that_raise_are_recorded(app):
+    def broken() -> str:
+        raise RuntimeError("boom")
+
+    app.add_url_rule("/broken", "broken", broken)
+    app.config["SLOW_REQUEST_MS"] = 1
+    with pytest.raises(RuntimeError):
+        app.test_client().get("/broken")
+    assert 'route="/broken",status="500"} 1' in metrics.render()
+    # The slow-request trace was ended too
+    assert metrics._trace.get() is None
@@ -0,0 +1,39 @@
+from typing import Any, Dict
+from app.services.ocr_cache import OCRResultCache, cache_key
+
+
+def result(text: str) -> Dict[str, Any]:
+    return {
+        'extracted_text': text,
+        'suggested_category': 'Meals',
+        'confidence': 0.2,
+        'suggested_amount': 9.5,
+    }
+
+
+def test_key_depends_on_image_and_settings():
+    assert cache_key(b'image', 'v1') == cache_key(b'image', 'v1')
+    assert cache_key(b'image', 'v1') != cache_key(b'image', 'v2')
+    assert cache_key(b'image', 'v1') != cache_key(b'other', 'v1')
+
+
+def test_hit_and_miss_counters():
+    cache = OCRResultCache(max_bytes=10_000, ttl_seconds=60)
+    assert cache.get('a') is None
+    cache.put('a', result('lunch'))
+    assert cache.get('a') == result('lunch')
+    stats = cache.stats()
+    assert (stats['memory_hits'], stats['misses']) == (1, 1)
+    assert stats['hit_rate'] == 0.5
+
+
+def test_evicts_least_recently_used_by_size():
+    cache = OCRResultCache(max_bytes=1_500, ttl_seconds=60)
+    cache.put('a', result('a' * 200))
+    cache.put('b', result('b' * 200))
+    cache.get('a')
+    cache.put('c', result('c' * 200))
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    assert cache.stats()['bytes'] <= 1_500
+    assert cache.stats()['evictions'] == 1
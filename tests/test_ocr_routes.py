@@ -1,20 +1,150 @@
 import json
 import base64
+from typing import Any, Dict, List, NoReturn
+import pytest
+from werkzeug.test import TestResponse
+
 
 def test_analyze_bill_no_image(client):
     response = client.post(
-        '/api/ocr/analyze-bill',
-        data=json.dumps({}),
-        content_type='application/json'
+        '/api/ocr/analyze-bill', data=json.dumps({}), content_type='application/json'
     )
     assert response.status_code == 400
     assert b'No image data provided' in response.data
 
+
 def test_analyze_bill_invalid_image(client):
-    data = {'image': 'invalid_base64'}
+    for image in ('invalid_base64', 'data:image/png;base64,a*b='):
+        response = client.post(
+            '/api/ocr/analyze-bill',
+            data=json.dumps({'image': image}),
+            content_type='application/json',
+        )
+        assert response.status_code == 400
+        assert b'not valid base64' in response.data
+
+
+def test_analyze_bill_undecodable_image(client):
+    data = {'image': base64.b64encode(b'not an image').decode()}
+    response = client.post(
+        '/api/ocr/analyze-bill', data=json.dumps(data), content_type='application/json'
+    )
+    assert response.status_code == 500
+
+
+def test_analyze_bill_saturated(client, monkeypatch):
+    from app.services import ocr_engine
+
+    def saturated(self: ocr_engine.OCREngine, image_data: Any) -> NoReturn:
+        raise ocr_engine.OCRSaturatedError('OCR queue is full, retry later')
+
+    monkeypatch.setattr(ocr_engine.OCREngine, 'submit', saturated)
+    response = client.post(
+        '/api/ocr/analyze-bill',
+        data=json.dumps({'image': 'aGVsbG8='}),
+        content_type='application/json',
+    )
+    assert response.status_code == 503
+    assert response.headers['Retry-After']
+
+
+def test_ocr_job_not_found(client):
+    response = client.get('/api/ocr/jobs/unknown')
+    assert response.status_code == 404
+
+
+def test_analyze_bill_upload_too_large(client, app):
+    app.config['UPLOAD_MAX_BYTES'] = 1024
     response = client.post(
         '/api/ocr/analyze-bill',
-        data=json.dumps(data),
-        content_type='application/json'
+        data=b'\xff\xd8\xff' + b'\x00' * 2048,
+        content_type='image/jpeg',
+    )
+    assert response.status_code == 413
+
+
+def test_analyze_bill_multipart_without_image(client):
+    response = client.post(
+        '/api/ocr/analyze-bill',
+        data={'note': 'no file'},
+        content_type='multipart/form-data',
+    )
+    assert response.status_code == 400
+
+
+def fake_ocr(monkeypatch: pytest.MonkeyPatch) -> None:
+    from concurrent.futures import Future
+    from app.services import ocr_engine
+
+    def submit(self: ocr_engine.OCREngine, image_data: bytes) -> Future:
+        future: Future = Future()
+        if image_data.startswith(b'bad'):
+            future.set_exception(ocr_engine.OCRError('cannot identify image file'))
+        else:
+            text = f"Cafe Luna\nTOTAL {len(image_data)}.00"
+            future.set_result((text, {'decode': 1.0, 'tesseract': 9.0}))
+        return future
+
+    monkeypatch.setattr(ocr_engine.OCREngine, 'submit', submit)
+
+
+def ndjson(response: TestResponse) -> List[Dict[str, Any]]:
+    return [json.loads(line) for line in response.data.splitlines()]
+
+
+def test_analyze_batch_streams_results_and_summary(client, monkeypatch):
+    import io
+    import zipfile
+
+    fake_ocr(monkeypatch)
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w') as zf:
+        zf.writestr('march/receipt-1.jpg', b'batch-a' * 3)
+        zf.writestr('march/notes.txt', b'not an image')
+        zf.writestr('march/receipt-2.png', b'bad image')
+
+    response = client.post(
+        '/api/ocr/batch',
+        data={
+            'images': [
+                (io.BytesIO(b'batch-b' * 4), 'loose.jpg'),
+                (io.BytesIO(archive.getvalue()), 'march.zip'),
+            ]
+        },
+        content_type='multipart/form-data',
     )
-    assert response.status_code == 500
\ No newline at end of file
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+
+    *lines, summary = ndjson(response)
+    results = {line['name']: line for line in lines}
+    assert set(results) == {'loose.jpg', 'march/receipt-1.jpg', 'march/receipt-2.png'}
+    assert results['loose.jpg']['suggested_amount'] == 28.0
+    assert results['march/receipt-1.jpg']['status'] == 'ok'
+    assert results['march/receipt-2.png'] == {
+        'index': 2,
+        'name': 'march/receipt-2.png',
+        'status': 'error',
+        'error': 'cannot identify image file',
+    }
+    assert summary['summary']['images'] == 3
+    assert (summary['summary']['succeeded'], summary['summary']['failed']) == (2, 1)
+    assert summary['summary']['stage_ms'] == {'decode': 1.0, 'tesseract': 9.0}
+
+    # A zip body works too, and known images come from the OCR cache
+    response = client.post(
+        '/api/ocr/batch', data=archive.getvalue(), content_type='application/zip'
+    )
+    *lines, summary = ndjson(response)
+    assert summary['summary']['cached'] == 1
+
+
+def test_analyze_batch_rejects_bad_uploads(client, app):
+    response = client.post(
+        '/api/ocr/batch', data=b'not a zip', content_type='application/zip'
+    )
+    assert response.status_code == 400
+    response = client.post(
+        '/api/ocr/batch', data={'note': 'no files'}, content_type='multipart/form-data'
+    )
+    assert response.status_code == 400
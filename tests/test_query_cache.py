@@ -0,0 +1,92 @@
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterator, Tuple
+import pytest
+from flask.testing import FlaskClient
+from pymongo.database import Database
+from app import create_app
+from app.database import get_db
+from app.services.query_cache import (
+    bump_version,
+    get_query_cache,
+    get_version,
+    query_key,
+)
+from config import TestConfig
+
+
+class CachedConfig(TestConfig):
+    QUERY_CACHE = True
+
+
+@pytest.fixture
+def cached_client() -> Iterator[Tuple[FlaskClient, Database]]:
+    app = create_app(CachedConfig)
+    get_query_cache().clear()
+    with app.app_context():
+        db = get_db()
+        db.client.drop_database(TestConfig.DATABASE_NAME)
+        yield app.test_client(), db
+        db.client.drop_database(TestConfig.DATABASE_NAME)
+    get_query_cache().clear()
+
+
+def transaction(**overrides: Any) -> Dict[str, Any]:
+    return {
+        "date": "2024-03-14T00:00:00",
+        "description": "Paper",
+        "amount": 10.0,
+        "type": "expense",
+        "category": "Office Supplies",
+        "person": "John Doe",
+        "project": "Test Project",
+        **overrides,
+    }
+
+
+def test_key_is_canonical_and_versioned():
+    params = {"filters": {"person": "a", "type": "expense"}, "limit": 10}
+    reordered = {"limit": 10, "filters": {"type": "expense", "person": "a"}}
+    assert query_key("transactions", "e.1", params) == query_key(
+        "transactions", "e.1", reordered
+    )
+    assert query_key("transactions", "e.1", params) != query_key(
+        "transactions", "e.2", params
+    )
+    assert query_key("transactions", "e.1", params) != query_key(
+        "balances", "e.1", params
+    )
+
+
+def test_version_changes_on_bump_and_reset(db):
+    first = get_version(db, "transactions")
+    assert get_version(db, "transactions") == first
+    bump_version(db, "transactions")
+    bumped = get_version(db, "transactions")
+    assert bumped != first
+
+    # A recreated counter starts a new epoch instead of reusing old tokens
+    db.collection_versions.delete_many({})
+    assert get_version(db, "transactions") not in (first, bumped)
+
+
+def test_writes_invalidate_cached_lists_and_balances(cached_client):
+    client, db = cached_client
+    client.post('/api/transactions/', json=transaction())
+    assert len(client.get('/api/transactions/').get_json()) == 1
+    assert client.get('/api/transactions/balances').get_json()[0]['balance'] == -10
+
+    # Direct writes skip the version counter, so cached results are served
+    db.transactions.insert_one({**transaction(), "date": datetime(2024, 3, 15)})
+    assert len(client.get('/api/transactions/').get_json()) == 1
+
+    created = client.post('/api/transactions/', json=transaction(amount=5.0)).get_json()
+    assert len(client.get('/api/transactions/').get_json()) == 3
+    client.put(f"/api/transactions/{created['id']}", json={"amount": 20.0})
+    assert client.get('/api/transactions/balances').get_json()[0]['balance'] == -30
+    client.delete(f"/api/transactions/{created['id']}")
+    assert len(client.get('/api/transactions/').get_json()) == 2
+
+    stats = json.loads(client.get('/api/health/query-cache').data)
+    assert stats['memory_hits'] == 1
+    assert stats['misses'] == 5
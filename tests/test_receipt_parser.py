@@ -0,0 +1,35 @@
+import json
+import os
+import pytest
+from app.services.receipt_parser import extract_fields, parse_amount
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), 'data', 'receipts.json')
+
+with open(CORPUS_PATH, encoding='utf-8') as f:
+    CORPUS = json.load(f)
+
+
+@pytest.mark.parametrize(
+    'value,expected',
+    [
+        ('12.50', 12.5),
+        ('12,50', 12.5),
+        ('1,249.00', 1249.0),
+        ('1.050,00', 1050.0),
+        ('1,234,567.89', 1234567.89),
+    ],
+)
+def test_parse_amount(value, expected):
+    assert parse_amount(value) == expected
+
+
+@pytest.mark.parametrize('receipt', CORPUS, ids=[r['name'] for r in CORPUS])
+def test_corpus_receipt(receipt):
+    assert extract_fields(receipt['text']) == receipt['expected']
+
+
+@pytest.mark.parametrize(
+    'symbol,expected', [('$', '2024-05-06'), ('₹', '2024-06-05'), ('€', '2024-06-05')]
+)
+def test_ambiguous_dates_follow_the_currency(symbol, expected):
+    assert extract_fields(f'Shop\n05/06/2024\nTotal {symbol} 9.99')['date'] == expected
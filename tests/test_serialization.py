@@ -0,0 +1,44 @@
+import json
+from typing import List
+from datetime import datetime, timezone
+from bson import ObjectId
+from flask import jsonify
+from app.models.transaction import TransactionSchema
+from app.utils.serialization import serialize_transaction
+
+
+def documents() -> List[dict]:
+    base = {
+        "_id": ObjectId(),
+        "date": datetime(2024, 3, 14, 9, 30),
+        "description": "Paper",
+        "amount": 12,
+        "type": "expense",
+        "category": "Office Supplies",
+        "person": "John Doe",
+        "project": "Test Project",
+    }
+    return [
+        base,
+        {**base, "bill_image_id": str(ObjectId()), "bill_image": None},
+        {**base, "date": datetime(2024, 3, 14, tzinfo=timezone.utc), "amount": 7.5},
+        {**base, "unknown": "ignored"},
+        {"_id": ObjectId(), "description": "Partial"},
+    ]
+
+
+def test_compiled_serializer_matches_schema():
+    schema = TransactionSchema()
+    for doc in documents():
+        assert serialize_transaction(doc) == schema.dump(doc)
+
+
+def test_jsonify_encodes_object_ids_and_datetimes(app):
+    object_id = ObjectId()
+    with app.app_context():
+        response = jsonify({"id": object_id, "date": datetime(2024, 3, 14), 1: "x"})
+    assert json.loads(response.data) == {
+        "id": str(object_id),
+        "date": "2024-03-14T00:00:00",
+        "1": "x",
+    }
@@ -0,0 +1,75 @@
+import asyncio
+from typing import Any, Awaitable, Callable, TypeVar
+import pytest
+from config import TestConfig
+from app.models.thresholds import ThresholdUpdate
+
+motor_asyncio = pytest.importorskip('motor.motor_asyncio')
+
+from app.services.threshold_service import (  # noqa: E402
+    ThresholdCache,
+    ThresholdService,
+)
+
+T = TypeVar('T')
+
+
+def run(scenario: Callable[[Any], Awaitable[T]]) -> T:
+    """Run `scenario(db)` against a fresh test database on its own loop"""
+
+    async def main() -> T:
+        client = motor_asyncio.AsyncIOMotorClient(TestConfig.MONGODB_URL)
+        await client.drop_database(TestConfig.DATABASE_NAME)
+        try:
+            return await scenario(client[TestConfig.DATABASE_NAME])
+        finally:
+            await client.drop_database(TestConfig.DATABASE_NAME)
+            client.close()
+
+    return asyncio.run(main())
+
+
+def test_statuses_join_balances_with_thresholds():
+    async def scenario(db: Any) -> None:
+        await db.balances.insert_many(
+            [
+                {'_id': 'Ann', 'receipts': 1000.0, 'expenses': 800.0, 'balance': 200.0},
+                {'_id': 'Bob', 'receipts': 4000.0, 'expenses': 0.0, 'balance': 4000.0},
+                {'_id': 'Cy', 'receipts': 1000.0, 'expenses': 0.0, 'balance': 1000.0},
+            ]
+        )
+        service = ThresholdService(db)
+        await service.update_threshold(
+            'Bob', ThresholdUpdate(low_threshold=100, medium_threshold=5000)
+        )
+
+        statuses = await service.get_statuses()
+        assert [(s['person'], s['status']) for s in statuses] == [
+            ('Ann', 'low'),
+            ('Bob', 'medium'),
+            ('Cy', 'medium'),
+        ]
+        assert statuses[0]['thresholds'] == {'low': 500.0, 'medium': 3500.0}
+        assert statuses[1]['thresholds'] == {'low': 100.0, 'medium': 5000.0}
+
+    run(scenario)
+
+
+def test_cached_thresholds_reload_after_update():
+    async def scenario(db: Any) -> None:
+        service = ThresholdService(db, ThresholdCache(ttl=3600))
+        assert await service.get_threshold('Ann') is None
+
+        # Changes from elsewhere wait for the TTL...
+        await db.thresholds.insert_one(
+            {'person': 'Ann', 'low_threshold': 1.0, 'medium_threshold': 2.0}
+        )
+        assert await service.get_threshold('Ann') is None
+
+        # ...while this worker's own writes are visible immediately
+        await service.update_threshold(
+            'Ann', ThresholdUpdate(low_threshold=10, medium_threshold=20)
+        )
+        assert (await service.get_threshold('Ann')).medium_threshold == 20
+
+    run(scenario)
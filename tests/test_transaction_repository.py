@@ -0,0 +1,118 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+import pytest
+from pydantic import ValidationError
+from config import TestConfig
+from app.models.filters import TransactionFilter
+from app.models.transaction import TransactionCreate, TransactionUpdate
+
+motor_asyncio = pytest.importorskip('motor.motor_asyncio')
+
+from app.services.transaction_repository import TransactionRepository  # noqa: E402
+
+T = TypeVar('T')
+
+
+def run(scenario: Callable[[TransactionRepository], Awaitable[T]]) -> T:
+    """Run `scenario(repository)` against a fresh test database on its own loop"""
+
+    async def main() -> T:
+        client = motor_asyncio.AsyncIOMotorClient(TestConfig.MONGODB_URL)
+        await client.drop_database(TestConfig.DATABASE_NAME)
+        try:
+            return await scenario(
+                TransactionRepository(client[TestConfig.DATABASE_NAME])
+            )
+        finally:
+            await client.drop_database(TestConfig.DATABASE_NAME)
+            client.close()
+
+    return asyncio.run(main())
+
+
+def transaction(**overrides: Any) -> TransactionCreate:
+    data: Dict[str, Any] = {
+        "date": datetime(2024, 3, 14),
+        "description": "Test transaction",
+        "amount": 100.0,
+        "type": "expense",
+        "category": "Office Supplies",
+        "person": "John Doe",
+        "project": "Test Project",
+    }
+    data.update(overrides)
+    return TransactionCreate(**data)
+
+
+def test_writes_keep_balances_in_step():
+    async def scenario(repository: TransactionRepository) -> None:
+        created = await repository.create_transaction(transaction(amount=40))
+        await repository.create_transaction(transaction(type="receipt", amount=100))
+        updated = await repository.update_transaction(
+            created["id"], TransactionUpdate(amount=25)
+        )
+        assert updated["amount"] == 25
+        assert (await repository.get_transaction(created["id"]))["amount"] == 25
+
+        [balance] = await repository.get_person_balances()
+        assert balance["person"] == "John Doe"
+        assert balance["balance"] == 75
+
+        assert await repository.delete_transaction(created["id"])
+        assert not await repository.delete_transaction(created["id"])
+        [balance] = await repository.get_person_balances()
+        assert balance["balance"] == 100
+
+        [row] = await repository.get_report(["type"], "month")
+        assert (row["period"], row["type"], row["receipts"], row["count"]) == (
+            "2024-03-01",
+            "receipt",
+            100,
+            1,
+        )
+
+    run(scenario)
+
+
+def test_list_filters_and_cursor_pages():
+    async def scenario(repository: TransactionRepository) -> None:
+        for amount in range(5):
+            await repository.create_transaction(transaction(amount=amount))
+        await repository.create_transaction(transaction(person="Jane Roe"))
+
+        filters = TransactionFilter(
+            person="John Doe", sort_field="amount", sort_direction="asc"
+        )
+        listed = await repository.get_transactions(0, 10, filters)
+        assert [t["amount"] for t in listed] == [0, 1, 2, 3, 4]
+
+        page, cursor = await repository.get_transactions_page(3, filters)
+        rest, end = await repository.get_transactions_page(3, filters, cursor)
+        assert [t["amount"] for t in page + rest] == [0, 1, 2, 3, 4]
+        assert end is None
+
+    run(scenario)
+
+
+def test_unknown_ids():
+    async def scenario(repository: TransactionRepository) -> None:
+        assert await repository.get_transaction("not-an-id") is None
+        assert (
+            await repository.update_transaction(
+                "65f000000000000000000000", TransactionUpdate(amount=1)
+            )
+            is None
+        )
+
+    run(scenario)
+
+
+def test_update_rejects_null_for_required_fields():
+    with pytest.raises(ValidationError):
+        TransactionUpdate(amount=None)
+    with pytest.raises(ValidationError):
+        TransactionUpdate.model_validate({"person": None})
+    assert TransactionUpdate(bill_image=None).model_dump(exclude_unset=True) == {
+        "bill_image": None
+    }
@@ -1,5 +1,13 @@
+import csv
+import io
 import json
+import base64
+from datetime import datetime
+from typing import Any, Dict, List, NoReturn, Optional
+import pytest
 from bson import ObjectId
+from werkzeug.test import TestResponse
+
 
 def test_create_transaction(client, db):
     data = {
@@ -9,25 +17,751 @@ def test_create_transaction(client, db):
         "type": "expense",
         "category": "Office Supplies",
         "person": "John Doe",
-        "project": "Test Project"
+        "project": "Test Project",
     }
-    
+
     response = client.post(
-        '/api/transactions/',
-        data=json.dumps(data),
-        content_type='application/json'
+        '/api/transactions/', data=json.dumps(data), content_type='application/json'
     )
-    
+
     assert response.status_code == 201
     result = json.loads(response.data)
     assert result['description'] == data['description']
     assert result['amount'] == data['amount']
 
+
 def test_get_transactions(client, db):
     response = client.get('/api/transactions/')
     assert response.status_code == 200
     assert isinstance(json.loads(response.data), list)
 
+
 def test_get_transaction_not_found(client, db):
     response = client.get(f'/api/transactions/{str(ObjectId())}')
-    assert response.status_code == 404
\ No newline at end of file
+    assert response.status_code == 404
+
+
+def test_get_transactions_cursor_pagination(client, db):
+    for i in range(5):
+        db.transactions.insert_one(
+            {
+                "date": datetime(2024, 3, 1 + i % 2),
+                "description": f"Item {i}",
+                "amount": 10.0,
+                "type": "expense",
+                "category": "Office Supplies",
+                "person": "John Doe",
+                "project": "Test Project",
+            }
+        )
+
+    seen: List[str] = []
+    cursor = ''
+    while cursor is not None:
+        response = client.get(f'/api/transactions/?limit=2&cursor={cursor}')
+        assert response.status_code == 200
+        page = json.loads(response.data)
+        seen.extend(t['id'] for t in page['items'])
+        cursor = page['next_cursor']
+
+    assert len(seen) == 5
+    assert len(set(seen)) == 5
+
+
+@pytest.mark.parametrize('direction', ['asc', 'desc'])
+def test_cursor_pagination_crosses_null_sort_values(client, db, direction):
+    db.transactions.insert_many(
+        [
+            {
+                "date": datetime(2024, 3, 1),
+                "description": f"Item {i}",
+                "amount": 10.0,
+                "type": "expense",
+                "category": "Office Supplies",
+                "person": "John Doe",
+                "project": None if i < 3 else f"Project {i}",
+            }
+            for i in range(6)
+        ]
+    )
+
+    seen: List[str] = []
+    cursor = ''
+    while cursor is not None:
+        response = client.get(
+            f'/api/transactions/?limit=2&sort_field=project'
+            f'&sort_direction={direction}&cursor={cursor}'
+        )
+        page = json.loads(response.data)
+        seen.extend(t['id'] for t in page['items'])
+        cursor = page['next_cursor']
+
+    assert len(set(seen)) == 6
+
+
+def test_get_transactions_invalid_cursor(client, db):
+    response = client.get('/api/transactions/?cursor=garbage')
+    assert response.status_code == 400
+
+
+def test_balances_follow_transaction_writes(client, db):
+    data = {
+        "date": "2024-03-14T00:00:00",
+        "description": "Float top-up",
+        "amount": 100.00,
+        "type": "receipt",
+        "category": "Float",
+        "person": "John Doe",
+        "project": "Test Project",
+    }
+    created = json.loads(
+        client.post(
+            '/api/transactions/', data=json.dumps(data), content_type='application/json'
+        ).data
+    )
+
+    client.put(
+        f"/api/transactions/{created['id']}",
+        data=json.dumps({"person": "Jane Doe", "amount": 40.0}),
+        content_type='application/json',
+    )
+
+    balances = {
+        b['person']: b
+        for b in json.loads(client.get('/api/transactions/balances').data)
+    }
+    assert balances['Jane Doe']['balance'] == 40.0
+    assert balances['John Doe']['balance'] == 0.0
+
+    client.delete(f"/api/transactions/{created['id']}")
+    balances = {
+        b['person']: b
+        for b in json.loads(client.get('/api/transactions/balances').data)
+    }
+    assert balances['Jane Doe']['balance'] == 0.0
+
+
+def test_rebuild_balances_overwrites_the_ledger_in_place(db):
+    from app.services.balance_service import BalanceLedger
+
+    db.transactions.insert_many(
+        [
+            {
+                "date": datetime(2024, 3, 1),
+                "amount": 50.0,
+                "type": "receipt",
+                "person": "John Doe",
+            },
+            {
+                "date": datetime(2024, 3, 2),
+                "amount": 20.0,
+                "type": "expense",
+                "person": "John Doe",
+            },
+        ]
+    )
+    db.balances.insert_many(
+        [
+            {"_id": "John Doe", "receipts": 1.0, "expenses": 0.0, "balance": 1.0},
+            {"_id": "Gone", "receipts": 5.0, "expenses": 0.0, "balance": 5.0},
+        ]
+    )
+    ledger = BalanceLedger(db)
+    assert ledger.rebuild() == 1
+    assert [(b['person'], b['balance']) for b in ledger.get_balances()] == [
+        ("John Doe", 30.0)
+    ]
+    assert ledger.verify() == []
+
+
+def test_invalid_update_is_rejected_before_it_is_written(client, db):
+    created = json.loads(
+        client.post(
+            '/api/transactions/',
+            data=json.dumps(
+                {
+                    "date": "2024-03-14T00:00:00",
+                    "description": "Float top-up",
+                    "amount": 100.00,
+                    "type": "receipt",
+                    "category": "Float",
+                    "person": "John Doe",
+                    "project": "Test Project",
+                }
+            ),
+            content_type='application/json',
+        ).data
+    )
+
+    for change in (
+        {"amount": "abc"},
+        {"amount": -5},
+        {"type": "gift"},
+        {"date": "soon"},
+    ):
+        response = client.put(
+            f"/api/transactions/{created['id']}",
+            data=json.dumps(change),
+            content_type='application/json',
+        )
+        assert response.status_code == 400
+    assert db.transactions.find_one()['amount'] == 100.0
+    assert client.get('/api/transactions/').status_code == 200
+
+    response = client.put(
+        f"/api/transactions/{created['id']}",
+        data=json.dumps({"amount": "60", "date": "2024-03-15T00:00:00"}),
+        content_type='application/json',
+    )
+    assert json.loads(response.data)['amount'] == 60.0
+    assert isinstance(db.transactions.find_one()['date'], datetime)
+    balances = {
+        b['person']: b
+        for b in json.loads(client.get('/api/transactions/balances').data)
+    }
+    assert balances['John Doe']['balance'] == 60.0
+
+
+def test_update_errors_after_the_write_are_not_reported_as_not_found(
+    client, db, monkeypatch
+):
+    from app.services.balance_service import BalanceLedger
+
+    created = json.loads(
+        client.post(
+            '/api/transactions/',
+            data=json.dumps(
+                {
+                    "date": "2024-03-14T00:00:00",
+                    "description": "Float top-up",
+                    "amount": 100.00,
+                    "type": "receipt",
+                    "category": "Float",
+                    "person": "John Doe",
+                    "project": "Test Project",
+                }
+            ),
+            content_type='application/json',
+        ).data
+    )
+    assert (
+        client.put(
+            '/api/transactions/not-an-id',
+            data=json.dumps({"amount": 5}),
+            content_type='application/json',
+        ).status_code
+        == 404
+    )
+
+    def broken(
+        self: BalanceLedger, previous: Optional[dict], current: Optional[dict]
+    ) -> NoReturn:
+        raise RuntimeError('ledger unavailable')
+
+    monkeypatch.setattr(BalanceLedger, 'apply', broken)
+    with pytest.raises(RuntimeError):
+        client.put(
+            f"/api/transactions/{created['id']}",
+            data=json.dumps({"amount": 5}),
+            content_type='application/json',
+        )
+    assert db.transactions.find_one()['amount'] == 5.0
+
+
+def test_bill_image_is_stored_separately(client, db):
+    image = b'\x89PNG\r\n\x1a\n' + b'\x00' * 64
+    data = {
+        "date": "2024-03-14T00:00:00",
+        "description": "Printer ink",
+        "amount": 25.00,
+        "type": "expense",
+        "category": "Office Supplies",
+        "person": "John Doe",
+        "project": "Test Project",
+        "bill_image": "data:image/png;base64," + base64.b64encode(image).decode(),
+    }
+    created = json.loads(
+        client.post(
+            '/api/transactions/', data=json.dumps(data), content_type='application/json'
+        ).data
+    )
+    assert created['bill_image_id']
+    assert 'bill_image' not in db.transactions.find_one()
+
+    listed = json.loads(client.get('/api/transactions/').data)
+    assert 'bill_image' not in listed[0]
+
+    response = client.get(f"/api/transactions/{created['id']}/bill-image")
+    assert response.status_code == 200
+    assert response.mimetype == 'image/png'
+    assert response.data == image
+
+
+def test_sweep_deletes_unreferenced_bill_images(app, client, db):
+    def create(image: bytes) -> Dict[str, Any]:
+        return json.loads(
+            client.post(
+                '/api/transactions/',
+                data=json.dumps(
+                    {
+                        "date": "2024-03-14T00:00:00",
+                        "description": "Printer ink",
+                        "amount": 25.00,
+                        "type": "expense",
+                        "category": "Office Supplies",
+                        "person": "John Doe",
+                        "project": "Test Project",
+                        "bill_image": base64.b64encode(image).decode(),
+                    }
+                ),
+                content_type='application/json',
+            ).data
+        )
+
+    kept = create(b'\x89PNG\r\n\x1a\n' + b'\x01' * 64)
+    replaced = create(b'\x89PNG\r\n\x1a\n' + b'\x02' * 64)
+    deleted = create(b'\x89PNG\r\n\x1a\n' + b'\x03' * 64)
+    client.put(
+        f"/api/transactions/{replaced['id']}/bill-image",
+        data=b'\xff\xd8\xff' + b'\x00' * 64,
+        content_type='image/jpeg',
+    )
+    client.delete(f"/api/transactions/{deleted['id']}")
+    assert db['bill_images.files'].count_documents({}) == 4
+
+    runner = app.test_cli_runner()
+    assert 'Deleted 0 ' in runner.invoke(args=['sweep-bill-images']).output
+    assert (
+        'Deleted 2 '
+        in runner.invoke(args=['sweep-bill-images', '--min-age', '-1']).output
+    )
+    referenced = {t['bill_image_id'] for t in db.transactions.find()}
+    assert {f['filename'] for f in db['bill_images.files'].find()} == referenced
+    assert client.get(f"/api/transactions/{kept['id']}/bill-image").status_code == 200
+
+
+def test_create_transaction_with_uploaded_bill_image(client, db):
+    image = b'\x89PNG\r\n\x1a\n' + b'\x00' * 64
+    data = {
+        "date": "2024-03-14T00:00:00",
+        "description": "Printer ink",
+        "amount": "25.00",
+        "type": "expense",
+        "category": "Office Supplies",
+        "person": "John Doe",
+        "project": "Test Project",
+        "bill_image": (io.BytesIO(image), 'receipt.png', 'image/png'),
+    }
+    response = client.post(
+        '/api/transactions/', data=data, content_type='multipart/form-data'
+    )
+    assert response.status_code == 201
+    created = json.loads(response.data)
+    assert created['amount'] == 25.0
+
+    response = client.get(f"/api/transactions/{created['id']}/bill-image")
+    assert response.mimetype == 'image/png'
+    assert response.data == image
+
+
+def test_attach_raw_bill_image(client, db):
+    created = json.loads(
+        client.post(
+            '/api/transactions/',
+            data=json.dumps(
+                {
+                    "date": "2024-03-14T00:00:00",
+                    "description": "Taxi",
+                    "amount": 12.00,
+                    "type": "expense",
+                    "category": "Travel",
+                    "person": "John Doe",
+                    "project": "Test Project",
+                }
+            ),
+            content_type='application/json',
+        ).data
+    )
+    image = b'\xff\xd8\xff' + b'\x00' * 64
+
+    response = client.put(
+        f"/api/transactions/{created['id']}/bill-image",
+        data=image,
+        content_type='image/jpeg',
+    )
+    assert response.status_code == 200
+    assert json.loads(response.data)['bill_image_id']
+    assert client.get(f"/api/transactions/{created['id']}/bill-image").data == image
+
+
+def test_bill_image_type_is_never_taken_from_untrusted_headers(client, db):
+    page = b'<html><script>alert(1)</script></html>'
+    created = json.loads(
+        client.post(
+            '/api/transactions/',
+            data=json.dumps(
+                {
+                    "date": "2024-03-14T00:00:00",
+                    "description": "Taxi",
+                    "amount": 12.00,
+                    "type": "expense",
+                    "category": "Travel",
+                    "person": "John Doe",
+                    "project": "Test Project",
+                    "bill_image": "data:text/html;base64,"
+                    + base64.b64encode(page).decode(),
+                }
+            ),
+            content_type='application/json',
+        ).data
+    )
+
+    response = client.get(f"/api/transactions/{created['id']}/bill-image")
+    assert response.mimetype == 'application/octet-stream'
+    assert response.headers['X-Content-Type-Options'] == 'nosniff'
+
+    # A declared image type is kept; nosniff stops browsers reading it as HTML
+    png = b'\x89PNG\r\n\x1a\n' + b'\x00' * 16
+    client.put(
+        f"/api/transactions/{created['id']}/bill-image",
+        data=png,
+        content_type='image/png',
+    )
+    response = client.get(f"/api/transactions/{created['id']}/bill-image")
+    assert response.mimetype == 'image/png'
+    assert response.headers['X-Content-Type-Options'] == 'nosniff'
+
+
+def test_uploads_ignore_declared_types_outside_the_whitelist(client, db):
+    png = b'\x89PNG\r\n\x1a\n' + b'\x00' * 16
+    created = json.loads(
+        client.post(
+            '/api/transactions/',
+            data={
+                "date": "2024-03-14T00:00:00",
+                "description": "Taxi",
+                "amount": "12.00",
+                "type": "expense",
+                "category": "Travel",
+                "person": "John Doe",
+                "project": "Test Project",
+                "bill_image": (io.BytesIO(png), 'receipt.html', 'text/html'),
+            },
+            content_type='multipart/form-data',
+        ).data
+    )
+    assert (
+        client.get(f"/api/transactions/{created['id']}/bill-image").mimetype
+        == 'image/png'
+    )
+
+    svg = b'<svg xmlns="http://www.w3.org/2000/svg" onload="alert(1)"/>'
+    response = client.put(
+        f"/api/transactions/{created['id']}/bill-image",
+        data=svg,
+        content_type='image/svg+xml',
+    )
+    assert response.status_code == 400
+
+
+def test_malformed_base64_bill_image_is_rejected(client, db):
+    data = {
+        "date": "2024-03-14T00:00:00",
+        "description": "Taxi",
+        "amount": 12.00,
+        "type": "expense",
+        "category": "Travel",
+        "person": "John Doe",
+        "project": "Test Project",
+    }
+    response = client.post(
+        '/api/transactions/',
+        data=json.dumps({**data, "bill_image": "abc"}),
+        content_type='application/json',
+    )
+    assert response.status_code == 400
+    assert db.transactions.count_documents({}) == 0
+
+    created = json.loads(
+        client.post(
+            '/api/transactions/', data=json.dumps(data), content_type='application/json'
+        ).data
+    )
+    response = client.put(
+        f"/api/transactions/{created['id']}",
+        data=json.dumps({"bill_image": "a*b="}),
+        content_type='application/json',
+    )
+    assert response.status_code == 400
+
+
+def test_export_transactions_csv(client, db):
+    db.transactions.insert_many(
+        [
+            {
+                "date": datetime(2024, 3, 1),
+                "description": f"Item {i}",
+                "amount": 5.0,
+                "type": "expense",
+                "category": "Office Supplies",
+                "person": "John Doe" if i % 2 else "Jane Doe",
+                "project": "Test Project",
+                "bill_image": "aGVsbG8=",
+            }
+            for i in range(10)
+        ]
+    )
+
+    response = client.get('/api/transactions/export?format=csv&person=John Doe')
+    assert response.status_code == 200
+    lines = response.data.decode().strip().splitlines()
+    assert lines[0].startswith('id,date,description')
+    assert len(lines) == 6
+    assert 'aGVsbG8=' not in response.data.decode()
+
+
+def test_export_csv_neutralizes_formulas(client, db):
+    db.transactions.insert_one(
+        {
+            "date": datetime(2024, 3, 1),
+            "description": "=HYPERLINK(\"http://evil\",\"x\")",
+            "amount": 5.0,
+            "type": "expense",
+            "category": "@SUM(A1)",
+            "person": "-2+3",
+            "project": "Test Project",
+        }
+    )
+
+    response = client.get('/api/transactions/export?format=csv')
+    row = next(csv.DictReader(io.StringIO(response.data.decode())))
+    assert row['description'] == "'=HYPERLINK(\"http://evil\",\"x\")"
+    assert (row['category'], row['person'], row['project']) == (
+        "'@SUM(A1)",
+        "'-2+3",
+        'Test Project',
+    )
+    assert row['amount'] == '5.0'
+
+
+def test_import_transactions_reports_row_errors(client, db):
+    data = (
+        "date,description,amount,type,category,person,project\n"
+        "2024-03-01,Paper,12.50,expense,Office Supplies,John Doe,Test Project\n"
+        "2024-03-02,Refund,-5,expense,Office Supplies,John Doe,Test Project\n"
+    )
+    response = client.post(
+        '/api/transactions/import', data=data, content_type='text/csv'
+    )
+    assert response.status_code == 200
+    summary = json.loads(response.data)
+    assert summary['inserted'] == 1
+    assert summary['failed'] == 1
+    assert summary['errors'][0]['row'] == 2
+    assert db.transactions.count_documents({}) == 1
+
+
+def test_report_follows_writes(client, db):
+    def post(**overrides: Any) -> Dict[str, Any]:
+        data = {
+            "date": "2024-03-14T09:30:00",
+            "description": "Paper",
+            "amount": 10.0,
+            "type": "expense",
+            "category": "Office Supplies",
+            "person": "John Doe",
+            "project": "Test Project",
+            **overrides,
+        }
+        response = client.post(
+            '/api/transactions/', data=json.dumps(data), content_type='application/json'
+        )
+        return json.loads(response.data)
+
+    first = post()
+    post(date="2024-03-18T00:00:00", category="Travel", amount=30.0)
+    post(date="2024-04-02T00:00:00", type="receipt", amount=100.0)
+    client.put(
+        f"/api/transactions/{first['id']}",
+        data=json.dumps({"amount": 15.0}),
+        content_type='application/json',
+    )
+
+    response = client.get(
+        '/api/transactions/report?granularity=month&group_by=category'
+    )
+    assert response.status_code == 200
+    rows = [
+        (r['period'], r['category'], r['expenses'], r['receipts'], r['count'])
+        for r in json.loads(response.data)
+    ]
+    assert rows == [
+        ('2024-03-01', 'Office Supplies', 15.0, 0, 1),
+        ('2024-03-01', 'Travel', 30.0, 0, 1),
+        ('2024-04-01', 'Office Supplies', 0, 100.0, 1),
+    ]
+
+    client.delete(f"/api/transactions/{first['id']}")
+    response = client.get(
+        '/api/transactions/report?granularity=week&end_date=2024-03-31'
+    )
+    assert [
+        (r['period'], r['amount'], r['count']) for r in json.loads(response.data)
+    ] == [('2024-03-18', 30.0, 1)]
+
+    response = client.get('/api/transactions/report?group_by=vendor')
+    assert response.status_code == 400
+
+
+def test_rebuild_rollups_for_a_range(app, db):
+    from app.services.rollup_service import PeriodRollups
+
+    db.transactions.insert_many(
+        [
+            {
+                "date": datetime(2024, 3, day),
+                "description": "Taxi",
+                "amount": 5.0,
+                "type": "expense",
+                "category": "Travel",
+                "person": "John Doe",
+                "project": "Test Project",
+            }
+            for day in (1, 2, 2, 20)
+        ]
+    )
+    rollups = PeriodRollups(db)
+    assert rollups.report() == []
+
+    assert rollups.rebuild(datetime(2024, 3, 1), datetime(2024, 3, 2)) == 3
+    [row] = rollups.report(granularity='month')
+    assert (row['amount'], row['count']) == (15.0, 3)
+
+    # Rebuilding again replaces the range instead of adding to it
+    assert rollups.rebuild() == 4
+    assert [r['count'] for r in rollups.report(granularity='day')] == [1, 2, 1]
+
+    # Rows whose transactions are gone are deleted, the rest kept in place
+    kept = db.rollups.find_one({'day': datetime(2024, 3, 20)})['_id']
+    db.transactions.delete_many({'date': datetime(2024, 3, 1)})
+    assert rollups.rebuild() == 3
+    assert [r['count'] for r in rollups.report(granularity='day')] == [2, 1]
+    assert db.rollups.find_one({'day': datetime(2024, 3, 20)})['_id'] == kept
+
+
+def test_bulk_recategorize_and_delete(client, db):
+    def post(**overrides: Any) -> Dict[str, Any]:
+        data = {
+            "date": "2024-03-14T00:00:00",
+            "description": "Taxi",
+            "amount": 10.0,
+            "type": "expense",
+            "category": "Travel",
+            "person": "John Doe",
+            "project": "Test Project",
+            **overrides,
+        }
+        response = client.post(
+            '/api/transactions/', data=json.dumps(data), content_type='application/json'
+        )
+        return json.loads(response.data)
+
+    ids = [post()['id'] for _ in range(3)]
+    post(person="Jane Doe", amount=20.0)
+
+    def bulk(action: str, body: Dict[str, Any]) -> TestResponse:
+        return client.post(
+            f'/api/transactions/bulk/{action}',
+            data=json.dumps(body),
+            content_type='application/json',
+        )
+
+    response = bulk('recategorize', {"ids": ids[:2], "category": "Meals"})
+    assert json.loads(response.data) == {"matched": 2, "modified": 2}
+    response = bulk(
+        'recategorize', {"filter": {"person": "John Doe"}, "category": "Meals"}
+    )
+    assert json.loads(response.data) == {"matched": 3, "modified": 1}
+    rows = json.loads(client.get('/api/transactions/report?group_by=category').data)
+    assert [(r['category'], r['count']) for r in rows] == [('Meals', 3), ('Travel', 1)]
+
+    response = bulk('delete', {"filter": {"category": "Meals", "person": "John Doe"}})
+    assert json.loads(response.data) == {"matched": 3, "deleted": 3}
+    balances = {
+        b['person']: b['balance']
+        for b in json.loads(client.get('/api/transactions/balances').data)
+    }
+    assert balances == {"John Doe": 0.0, "Jane Doe": -20.0}
+
+    assert bulk('delete', {"filter": {}}).status_code == 400
+    assert bulk('delete', {"ids": ["not-an-id"]}).status_code == 400
+    assert bulk('recategorize', {"ids": ids}).status_code == 400
+
+
+def test_bulk_changes_skip_documents_edited_concurrently():
+    from app.services.transaction_service import applied_changes
+
+    kept, edited, gone = (
+        {"_id": ObjectId(), "category": "Travel", "amount": 5.0} for _ in range(3)
+    )
+    recategorized = lambda doc: {**doc, "category": "Meals"}
+    current = [recategorized(kept), {**recategorized(edited), "amount": 7.0}]
+    changes = applied_changes([kept, edited, gone], 1, recategorized, lambda: current)
+    assert changes == [(kept, recategorized(kept))]
+
+    changes = applied_changes([kept, gone], 1, lambda doc: None, lambda: [kept])
+    assert changes == [(gone, None)]
+
+
+def test_transactions_envelope_has_totals(client, db):
+    for person, kind, amount in [
+        ("John Doe", "receipt", 100.0),
+        ("John Doe", "expense", 12.5),
+        ("John Doe", "expense", 7.5),
+        ("Jane Doe", "expense", 30.0),
+    ]:
+        client.post(
+            '/api/transactions/',
+            data=json.dumps(
+                {
+                    "date": "2024-03-14T00:00:00",
+                    "description": "Petty cash",
+                    "amount": amount,
+                    "type": kind,
+                    "category": "Office Supplies",
+                    "person": person,
+                    "project": "Test Project",
+                }
+            ),
+            content_type='application/json',
+        )
+
+    page = json.loads(
+        client.get('/api/transactions/?envelope=1&person=John%20Doe&limit=2').data
+    )
+    assert len(page['items']) == 2
+    assert {k: page[k] for k in ('total', 'estimated', 'receipts', 'expenses')} == {
+        'total': 3,
+        'estimated': False,
+        'receipts': 100.0,
+        'expenses': 20.0,
+    }
+
+    # Unfiltered: metadata count; the sums include rows the balances ledger skips
+    db.transactions.insert_one(
+        {
+            "date": datetime(2024, 3, 15),
+            "description": "Float top-up",
+            "amount": 40.0,
+            "type": "receipt",
+            "category": "Office Supplies",
+        }
+    )
+    page = json.loads(client.get('/api/transactions/?envelope=1&limit=1&skip=1').data)
+    assert len(page['items']) == 1
+    assert {k: page[k] for k in ('total', 'estimated', 'receipts', 'expenses')} == {
+        'total': 5,
+        'estimated': True,
+        'receipts': 140.0,
+        'expenses': 50.0,
+    }
@@ -0,0 +1,109 @@
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, TypeVar
+import pytest
+from passlib.context import CryptContext
+from config import TestConfig
+from app.models.user import UserCreate, UserDB
+from app.services import user_service
+from app.services.token_service import TokenService
+
+motor_asyncio = pytest.importorskip('motor.motor_asyncio')
+
+T = TypeVar('T')
+
+
+def run(scenario: Callable[[Any], Awaitable[T]]) -> T:
+    """Run `scenario(db)` against a fresh test database on its own loop"""
+
+    async def main() -> T:
+        client = motor_asyncio.AsyncIOMotorClient(TestConfig.MONGODB_URL)
+        await client.drop_database(TestConfig.DATABASE_NAME)
+        try:
+            return await scenario(client[TestConfig.DATABASE_NAME])
+        finally:
+            await client.drop_database(TestConfig.DATABASE_NAME)
+            client.close()
+
+    return asyncio.run(main())
+
+
+@pytest.fixture
+def fast_hashing(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(
+        user_service, '_pwd_context', CryptContext(schemes=['bcrypt'], bcrypt__rounds=4)
+    )
+    monkeypatch.setattr(user_service, '_dummy_hash', None)
+
+
+def test_signup_and_login_hash_off_the_event_loop(fast_hashing):
+    hashing_threads = []
+    verify = user_service.password_context().verify
+
+    def recording_verify(*args: Any, **kwargs: Any) -> bool:
+        hashing_threads.append(threading.current_thread().name)
+        return bool(verify(*args, **kwargs))
+
+    async def scenario(db: Any) -> None:
+        service = user_service.UserService(db, user_service.get_password_executor())
+        user = await service.create_user(
+            UserCreate(email='ann@example.com', full_name='Ann', password='s3cret')
+        )
+        assert user.hashed_password != 's3cret'
+        assert 'password' not in await db.users.find_one({'email': 'ann@example.com'})
+
+        user_service.password_context().verify = recording_verify
+        assert (await service.authenticate('ann@example.com', 's3cret')).id == user.id
+        assert await service.authenticate('ann@example.com', 'wrong') is None
+        # Unknown emails still pay for a bcrypt check
+        assert await service.authenticate('nobody@example.com', 's3cret') is None
+
+    run(scenario)
+    assert len(hashing_threads) == 3
+    assert all(name.startswith('bcrypt') for name in hashing_threads)
+
+
+def test_signup_refuses_a_registered_email_without_the_index(fast_hashing):
+    async def scenario(db: Any) -> int:
+        service = user_service.UserService(db, user_service.get_password_executor())
+        await service.create_user(
+            UserCreate(email='ann@example.com', full_name='Ann', password='s3cret')
+        )
+        with pytest.raises(user_service.EmailTakenError):
+            await service.create_user(
+                UserCreate(email='ann@example.com', full_name='Ann', password='other')
+            )
+        count: int = await db.users.count_documents({})
+        return count
+
+    assert run(scenario) == 1
+
+
+def test_verified_tokens_are_cached_until_they_expire():
+    tokens = TokenService('secret', expire_minutes=1, cache_size=2)
+    user = UserDB(
+        id='64b000000000000000000001',
+        email='ann@example.com',
+        full_name='Ann',
+        hashed_password='x',
+    )
+    token = tokens.issue(user)
+
+    claims = tokens.verify(token)
+    assert (claims['sub'], claims['email'], claims['name']) == (
+        user.id,
+        'ann@example.com',
+        'Ann',
+    )
+    assert tokens.verify(token) is claims
+    assert tokens.stats() == {'cached': 1, 'hits': 1, 'misses': 1}
+
+    assert tokens.verify(token[:-2] + 'xx') is None
+    assert TokenService('other').verify(token) is None
+
+    # Cached entries still honour the expiry
+    tokens._verified[token] = (time.time() - 1, {**claims, 'sub': 'stale'})
+    assert tokens.verify(token)['sub'] == user.id
+    expired = TokenService('secret', expire_minutes=-1)
+    assert expired.verify(expired.issue(user)) is None